@@ -8,7 +8,7 @@ class PengumumanAdmin(admin.ModelAdmin):
     """
     Customizes the display of the Pengumuman model in the Django admin.
     """
-    list_display = ('judul', 'tanggal_mulai', 'tanggal_selesai', 'created_at')
+    list_display = ('judul', 'tanggal_mulai', 'tanggal_selesai', 'audience', 'created_at')
     list_filter = ('tanggal_mulai', 'tanggal_selesai')
     search_fields = ('judul', 'deskripsi')
     ordering = ('-tanggal_mulai',)
@@ -1,42 +1,82 @@
 # announcements/api_views.py
 
+from functools import partial
+
 from django.http import JsonResponse
+from django.utils import timezone
 from django.views import View
+from rest_framework import generics, permissions
 
+from core.conditional import collection_validators, conditional_response
+from core.renderers import FastJSONRenderer
 from .models import Pengumuman
 
-class PengumumanAPIListView(View):
+# Columns of an announcement in list payloads (the list view and core.sync).
+PENGUMUMAN_LIST_FIELDS = ('id', 'judul', 'deskripsi', 'tanggal_mulai', 'tanggal_selesai', 'lampiran', 'lampiran_name')
+
+
+def active_announcements(queryset=None):
+    """Narrows `queryset` (all announcements by default) to those shown today."""
+    today = timezone.localdate()
+    queryset = Pengumuman.objects.all() if queryset is None else queryset
+    return queryset.filter(tanggal_mulai__lte=today, tanggal_selesai__gte=today)
+
+
+def add_lampiran_urls(request, rows):
     """
-    API view to get a list of all announcements for the mobile app.
+    Adds `lampiran_url` to announcement rows read with `.values()`, built
+    from the stored key without a query per row.
     """
-    def get(self, request, *args, **kwargs):
-        # Using .order_by('-tanggal_mulai') to ensure the newest come first
-        announcements = Pengumuman.objects.order_by('-tanggal_mulai').values(
-            'id',
-            'judul',
-            'deskripsi',
-            'tanggal_mulai',
-            'tanggal_selesai',
-            'lampiran'
-        )
-        data = list(announcements)
+    storage = Pengumuman._meta.get_field('lampiran').storage
+    for announcement_data in rows:
+        key = announcement_data['lampiran']
+        announcement_data['lampiran_url'] = request.build_absolute_uri(storage.url(key)) if key else None
+    return rows
 
-        for announcement_data in data:
-            if announcement_data['lampiran']:
-                # Retrieve the full object to get the correct URL
-                pengumuman_obj = Pengumuman.objects.get(id=announcement_data['id'])
-                announcement_data['lampiran_url'] = request.build_absolute_uri(pengumuman_obj.lampiran.url)
-            else:
-                announcement_data['lampiran_url'] = None
 
-        return JsonResponse(data, safe=False)
+class PengumumanAPIListView(generics.ListAPIView):
+    """
+    API view to get the currently active announcements
+    (tanggal_mulai <= today <= tanggal_selesai) for the mobile app, newest
+    first, cursor-paginated.
+
+    Rows are read with `.values()` and attachment URLs are built from the
+    stored key, so a page costs one query however many announcements have
+    an attachment. Clients revalidate with ETag/Last-Modified and get an
+    empty 304, without the page being serialized, while nothing changed.
+    """
+    authentication_classes = []  # Public: shown on the mobile home screen before login
+    permission_classes = [permissions.AllowAny]
+    renderer_classes = [FastJSONRenderer]
+    cursor_ordering = ('-tanggal_mulai', '-id')
+
+    def get_queryset(self):
+        return active_announcements().values(*PENGUMUMAN_LIST_FIELDS)
+
+    def list(self, request, *args, **kwargs):
+        # The active set also changes at midnight, without any row being edited.
+        etag, last_modified, _ = collection_validators(
+            self.get_queryset(), timezone.localdate(), request.get_full_path()
+        )
+        return conditional_response(request, etag, last_modified, partial(self.render_page, request))
+
+    def render_page(self, request):
+        page = self.paginate_queryset(self.get_queryset())
+        return self.get_paginated_response(add_lampiran_urls(request, page))
 
 
 class PengumumanAPIDetailView(View):
     """
     API view to get the details of a single announcement for the mobile app.
+    Supports conditional GET like the list view.
     """
     def get(self, request, pk, *args, **kwargs):
+        etag, last_modified, found = collection_validators(Pengumuman.objects.filter(pk=pk), request.get_full_path())
+        if not found:
+            return JsonResponse({'error': 'Pengumuman not found'}, status=404)
+        return conditional_response(request, etag, last_modified, partial(self.render_announcement, request, pk))
+
+    def render_announcement(self, request, pk):
         try:
             announcement = Pengumuman.objects.get(pk=pk)
             data = {
@@ -46,6 +86,7 @@ class PengumumanAPIDetailView(View):
                 'tanggal_mulai': announcement.tanggal_mulai,
                 'tanggal_selesai': announcement.tanggal_selesai,
                 'lampiran_url': request.build_absolute_uri(announcement.lampiran.url) if announcement.lampiran else None,
+                'lampiran_name': announcement.lampiran_name,
                 'created_at': announcement.created_at,
                 'updated_at': announcement.updated_at,
             }
@@ -6,6 +6,7 @@ from django.contrib.auth import get_user_model
 
 from .models import Pengumuman
 from core.models import ActivityLog
+from core.storage import uploaded_file_name
 from core.utils import calculate_file_hash
 
 User = get_user_model()
@@ -19,16 +20,21 @@ class PengumumanForm(forms.ModelForm):
         # Pop the user from kwargs to store it. We'll need it for the actor.
         self.user = kwargs.pop('user', None)
         super().__init__(*args, **kwargs)
+        # Older clients do not send an audience; treat that as 'all'.
+        self.fields['audience'].required = False
 
     class Meta:
         model = Pengumuman #
-        fields = ['judul', 'deskripsi', 'tanggal_mulai', 'tanggal_selesai', 'lampiran'] #
+        fields = ['judul', 'deskripsi', 'tanggal_mulai', 'tanggal_selesai', 'lampiran', 'audience', 'target_prodi', 'target_jurusan'] #
         widgets = {
             'judul': forms.TextInput(attrs={'class': 'form-control', 'id': 'ann-title'}), #
             'deskripsi': forms.Textarea(attrs={'class': 'form-control', 'rows': 5, 'id': 'ann-desc'}), #
             'tanggal_mulai': forms.DateInput(attrs={'class': 'form-control', 'type': 'date', 'id': 'ann-start-date'}), #
             'tanggal_selesai': forms.DateInput(attrs={'class': 'form-control', 'type': 'date', 'id': 'ann-end-date'}), #
             'lampiran': forms.FileInput(attrs={'class': 'file-input', 'id': 'ann-attachment'}), #
+            'audience': forms.Select(attrs={'class': 'form-control', 'id': 'ann-audience'}),
+            'target_prodi': forms.Select(attrs={'class': 'form-control', 'id': 'ann-target-prodi'}),
+            'target_jurusan': forms.Select(attrs={'class': 'form-control', 'id': 'ann-target-jurusan'}),
         }
 
     def clean(self):
@@ -40,6 +46,18 @@ class PengumumanForm(forms.ModelForm):
             if tanggal_selesai < tanggal_mulai:
                 self.add_error('tanggal_selesai', "Tanggal selesai tidak boleh sebelum tanggal mulai.")
 
+        # Only keep the target that matches the chosen audience.
+        audience = cleaned_data.get("audience") or 'all'
+        cleaned_data['audience'] = audience
+        if audience == 'prodi' and not cleaned_data.get("target_prodi"):
+            self.add_error('target_prodi', "Program studi wajib dipilih untuk audiens ini.")
+        if audience == 'jurusan' and not cleaned_data.get("target_jurusan"):
+            self.add_error('target_jurusan', "Jurusan wajib dipilih untuk audiens ini.")
+        if audience != 'prodi':
+            cleaned_data['target_prodi'] = None
+        if audience != 'jurusan':
+            cleaned_data['target_jurusan'] = None
+
         return cleaned_data
 
 
@@ -89,8 +107,8 @@ class PengumumanForm(forms.ModelForm):
                 changed_fields.append(f"Tanggal Selesai: '{old_instance.tanggal_selesai}' -> '{instance.tanggal_selesai}'")
 
             if old_instance.lampiran_hash != instance.lampiran_hash:
-                old_file = old_instance.lampiran.name.split('/')[-1] if old_instance.lampiran else "Tidak ada"
-                new_file = instance.lampiran.name.split('/')[-1] if instance.lampiran else "Tidak ada"
+                old_file = uploaded_file_name(old_instance.lampiran, old_instance.lampiran_name) or "Tidak ada"
+                new_file = uploaded_file_name(instance.lampiran, instance.lampiran_name) or "Tidak ada"
                 if old_file != new_file or old_instance.lampiran_hash != instance.lampiran_hash:
                     changed_fields.append(f"Lampiran: '{old_file}' -> '{new_file}'")
 
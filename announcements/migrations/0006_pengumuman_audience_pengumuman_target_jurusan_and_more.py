@@ -0,0 +1,30 @@
+# Generated by Django 5.2 on 2026-10-18 16:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('announcements', '0005_alter_pengumuman_lampiran'),
+        ('users', '0004_remove_historicalmahasiswa_dosen_pembimbing_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pengumuman',
+            name='audience',
+            field=models.CharField(choices=[('all', 'Semua Pengguna'), ('mahasiswa', 'Semua Mahasiswa'), ('dosen', 'Semua Dosen'), ('prodi', 'Program Studi Tertentu'), ('jurusan', 'Jurusan Tertentu')], default='all', help_text='Penerima notifikasi pengumuman', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='pengumuman',
+            name='target_jurusan',
+            field=models.ForeignKey(blank=True, help_text='Wajib diisi jika audiens adalah jurusan tertentu', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='pengumuman', to='users.jurusan'),
+        ),
+        migrations.AddField(
+            model_name='pengumuman',
+            name='target_prodi',
+            field=models.ForeignKey(blank=True, help_text='Wajib diisi jika audiens adalah program studi tertentu', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='pengumuman', to='users.programstudi'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2 on 2026-10-18 16:51
+
+import core.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('announcements', '0006_pengumuman_audience_pengumuman_target_jurusan_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='pengumuman',
+            name='lampiran',
+            field=models.FileField(blank=True, db_index=True, help_text='File lampiran opsional', null=True, storage=core.storage.ContentAddressedS3Storage(), upload_to='attachments/announcements/'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-18 17:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('announcements', '0007_content_addressed_storage'),
+        ('users', '0004_remove_historicalmahasiswa_dosen_pembimbing_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='pengumuman',
+            index=models.Index(fields=['tanggal_mulai', 'tanggal_selesai'], name='pengumuman_active_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-18 17:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('announcements', '0008_pengumuman_active_idx'),
+        ('users', '0005_lookup_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='pengumuman',
+            index=models.Index(fields=['updated_at'], name='pengumuman_sync_idx'),
+        ),
+    ]
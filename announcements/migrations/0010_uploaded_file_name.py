@@ -0,0 +1,35 @@
+# Generated by Django 5.2 on 2026-10-18 18:29
+
+import os
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_lampiran_name(apps, schema_editor):
+    # Keys from before the blob store still end in the uploaded name; blob keys
+    # only hold the hash, so those fall back to a generic name.
+    Pengumuman = apps.get_model('announcements', 'Pengumuman')
+    prefix = getattr(settings, 'BLOB_STORE_PREFIX', 'blobs/')
+    for announcement in Pengumuman.objects.exclude(lampiran='').exclude(lampiran__isnull=True).only('pk', 'lampiran').iterator():
+        key = announcement.lampiran.name
+        name = os.path.basename(key)
+        if key.startswith(prefix):
+            name = f"lampiran{os.path.splitext(key)[1]}"
+        Pengumuman.objects.filter(pk=announcement.pk).update(lampiran_name=name)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('announcements', '0009_pengumuman_sync_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pengumuman',
+            name='lampiran_name',
+            field=models.CharField(blank=True, editable=False, help_text='Nama asli file lampiran; kunci penyimpanan hanya berisi hash-nya', max_length=255),
+        ),
+        migrations.RunPython(backfill_lampiran_name, migrations.RunPython.noop),
+    ]
@@ -2,12 +2,20 @@
 
 from django.db import models
 from django.conf import settings
-from storages.backends.s3boto3 import S3Boto3Storage
+from core.storage import ContentAddressedS3Storage
 
 class Pengumuman(models.Model):
     """
     Represents an announcement in the system.
     """
+    AUDIENCE_CHOICES = [
+        ('all', 'Semua Pengguna'),
+        ('mahasiswa', 'Semua Mahasiswa'),
+        ('dosen', 'Semua Dosen'),
+        ('prodi', 'Program Studi Tertentu'),
+        ('jurusan', 'Jurusan Tertentu'),
+    ]
+
     judul = models.CharField(max_length=255, help_text="Judul pengumuman")
     deskripsi = models.TextField(help_text="Isi lengkap dari pengumuman")
     tanggal_mulai = models.DateField(help_text="Tanggal pengumuman mulai ditampilkan")
@@ -16,9 +24,26 @@ class Pengumuman(models.Model):
         upload_to='attachments/announcements/',
         blank=True, null=True,
         help_text="File lampiran opsional",
-        storage=S3Boto3Storage()
+        storage=ContentAddressedS3Storage(),
+        db_index=True,  # Blob reference counting looks announcements up by key
+    )
+    lampiran_name = models.CharField(
+        max_length=255, blank=True, editable=False,
+        help_text="Nama asli file lampiran; kunci penyimpanan hanya berisi hash-nya"
     )
     lampiran_hash = models.CharField(max_length=64, blank=True, editable=False)
+    audience = models.CharField(
+        max_length=20, choices=AUDIENCE_CHOICES, default='all',
+        help_text="Penerima notifikasi pengumuman"
+    )
+    target_prodi = models.ForeignKey(
+        'users.ProgramStudi', on_delete=models.SET_NULL, null=True, blank=True,
+        related_name='pengumuman', help_text="Wajib diisi jika audiens adalah program studi tertentu"
+    )
+    target_jurusan = models.ForeignKey(
+        'users.Jurusan', on_delete=models.SET_NULL, null=True, blank=True,
+        related_name='pengumuman', help_text="Wajib diisi jika audiens adalah jurusan tertentu"
+    )
     # Optional: Track who created the announcement if you have an admin/staff role
     # author = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True)
 
@@ -29,6 +54,22 @@ class Pengumuman(models.Model):
         verbose_name = "Pengumuman"
         verbose_name_plural = "Pengumuman"
         ordering = ['-tanggal_mulai'] # Show the newest announcements first
+        indexes = [
+            # Active announcements: tanggal_mulai <= today <= tanggal_selesai, newest first.
+            models.Index(fields=['tanggal_mulai', 'tanggal_selesai'], name='pengumuman_active_idx'),
+            # Delta sync (core.sync): announcements changed since a watermark.
+            models.Index(fields=['updated_at'], name='pengumuman_sync_idx'),
+        ]
 
     def __str__(self):
-        return self.judul
\ No newline at end of file
+        return self.judul
+
+    def audience_topic(self):
+        """Returns the FCM audience key for this announcement, e.g. 'all' or 'prodi-3'."""
+        if self.audience == 'prodi' and self.target_prodi_id:
+            return f"prodi-{self.target_prodi_id}"
+        if self.audience == 'jurusan' and self.target_jurusan_id:
+            return f"jurusan-{self.target_jurusan_id}"
+        if self.audience in ('mahasiswa', 'dosen'):
+            return self.audience
+        return 'all'
@@ -6,6 +6,9 @@ from rest_framework import status
 from .models import Pengumuman
 from django.utils import timezone
 from django.core.files.uploadedfile import SimpleUploadedFile
+from datetime import timedelta
+from unittest.mock import patch
+from core.storage import ContentAddressedS3Storage
 
 # Mark all tests in this module as needing database access
 pytestmark = pytest.mark.django_db
@@ -61,8 +64,8 @@ class TestPengumumanAPI:
         response = api_client.get(url)
 
         assert response.status_code == status.HTTP_200_OK
-        assert len(response.json()) == 2
-        titles = [item['judul'] for item in response.json()]
+        assert len(response.json()['results']) == 2
+        titles = [item['judul'] for item in response.json()['results']]
         assert pengumuman_tanpa_lampiran.judul in titles
         assert pengumuman_dengan_lampiran.judul in titles
 
@@ -76,7 +79,7 @@ class TestPengumumanAPI:
         assert response.status_code == status.HTTP_200_OK
         # Find the specific announcement in the response
         announcement_data = next(
-            (item for item in response.json() if item['id'] == pengumuman_dengan_lampiran.id),
+            (item for item in response.json()['results'] if item['id'] == pengumuman_dengan_lampiran.id),
             None
         )
         assert announcement_data is not None
@@ -93,13 +96,97 @@ class TestPengumumanAPI:
 
         assert response.status_code == status.HTTP_200_OK
         announcement_data = next(
-            (item for item in response.json() if item['id'] == pengumuman_tanpa_lampiran.id),
+            (item for item in response.json()['results'] if item['id'] == pengumuman_tanpa_lampiran.id),
             None
         )
         assert announcement_data is not None
         assert 'lampiran_url' in announcement_data
         assert announcement_data['lampiran_url'] is None
 
+    def test_list_returns_only_active_announcements(self, api_client, pengumuman_tanpa_lampiran):
+        """
+        Test that announcements that have ended or not started yet are filtered out.
+        """
+        today = timezone.localdate()
+        Pengumuman.objects.create(
+            judul="Sudah Berakhir", deskripsi="-",
+            tanggal_mulai=today - timedelta(days=10), tanggal_selesai=today - timedelta(days=1),
+        )
+        Pengumuman.objects.create(
+            judul="Belum Dimulai", deskripsi="-",
+            tanggal_mulai=today + timedelta(days=1), tanggal_selesai=today + timedelta(days=5),
+        )
+        ends_today = Pengumuman.objects.create(
+            judul="Berakhir Hari Ini", deskripsi="-",
+            tanggal_mulai=today - timedelta(days=3), tanggal_selesai=today,
+        )
+
+        response = api_client.get(reverse('api-list'))
+
+        assert [item['id'] for item in response.json()['results']] == [pengumuman_tanpa_lampiran.id, ends_today.id]
+
+    def test_list_builds_attachment_urls_in_one_query(self, api_client, django_assert_num_queries):
+        """
+        Test that a page costs one query (plus the conditional GET validators)
+        however many announcements have attachments, and that pages follow the cursor.
+        """
+        today = timezone.localdate()
+        for index in range(5):
+            Pengumuman.objects.create(
+                judul=f"Pengumuman {index}", deskripsi="-",
+                tanggal_mulai=today - timedelta(days=index), tanggal_selesai=today + timedelta(days=7),
+                lampiran=f"blobs/{index:02d}/lampiran{index}.pdf",
+            )
+
+        with patch.object(ContentAddressedS3Storage, 'url', lambda self, name: f"https://cdn.example.com/{name}"):
+            with django_assert_num_queries(2):
+                response = api_client.get(reverse('api-list'), {'page_size': 3})
+            data = response.json()
+            next_page = api_client.get(data['next']).json()
+
+        assert response['Content-Type'] == 'application/json'
+        assert [item['judul'] for item in data['results']] == ['Pengumuman 0', 'Pengumuman 1', 'Pengumuman 2']
+        assert data['results'][0]['lampiran_url'] == 'https://cdn.example.com/blobs/00/lampiran0.pdf'
+        assert data['results'][0]['tanggal_mulai'] == today.isoformat()
+        assert [item['judul'] for item in next_page['results']] == ['Pengumuman 3', 'Pengumuman 4']
+
+    def test_list_answers_conditional_get_with_304(self, api_client, pengumuman_tanpa_lampiran, django_assert_num_queries):
+        """
+        Test that a revalidation with the ETag or Last-Modified date costs one
+        query and returns no body, until an announcement changes.
+        """
+        url = reverse('api-list')
+        response = api_client.get(url)
+        assert 'max-age=60' in response['Cache-Control']
+
+        with django_assert_num_queries(1):
+            not_modified = api_client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        assert not_modified.status_code == status.HTTP_304_NOT_MODIFIED
+        assert not_modified.content == b''
+        assert not_modified['ETag'] == response['ETag']
+        assert api_client.get(url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']).status_code == 304
+
+        pengumuman_tanpa_lampiran.judul = "Judul Baru"
+        pengumuman_tanpa_lampiran.save()
+        changed = api_client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        assert changed.status_code == status.HTTP_200_OK
+        assert changed.json()['results'][0]['judul'] == "Judul Baru"
+
+        pengumuman_tanpa_lampiran.delete()
+        assert api_client.get(url, HTTP_IF_NONE_MATCH=changed['ETag']).status_code == status.HTTP_200_OK
+
+    def test_detail_answers_conditional_get_with_304(self, api_client, pengumuman_tanpa_lampiran):
+        """
+        Test that the detail view returns 304 for a matching ETag.
+        """
+        url = reverse('api-detail', kwargs={'pk': pengumuman_tanpa_lampiran.pk})
+        response = api_client.get(url)
+
+        not_modified = api_client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+
+        assert not_modified.status_code == status.HTTP_304_NOT_MODIFIED
+        assert 'Last-Modified' in not_modified
+
     def test_get_pengumuman_detail_success(self, api_client, pengumuman_dengan_lampiran):
         """
         Test successfully retrieving the detail of a single announcement.
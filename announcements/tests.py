@@ -63,7 +63,9 @@ class TestPengumumanModel:
         pengumuman = form.save()
 
         assert pengumuman.lampiran is not None
-        assert 'lampiran_test' in pengumuman.lampiran.name
+        # Stored under its content hash; the uploaded name is kept alongside.
+        assert pengumuman.lampiran.name.startswith('blobs/')
+        assert pengumuman.lampiran_name == 'lampiran_test.txt'
         assert pengumuman.lampiran_hash != ''
         # Check if the hash is a valid SHA256 hash (64 hex characters)
         assert len(pengumuman.lampiran_hash) == 64
@@ -122,6 +124,24 @@ class TestPengumumanForm:
         assert instance.lampiran is not None
         assert instance.lampiran_hash != ''
 
+    def test_pengumuman_form_audience_prodi_requires_target(self, pengumuman_data, user):
+        """
+        Test that a prodi audience needs a target prodi and maps to its topic.
+        """
+        from users.models import Jurusan, ProgramStudi
+        prodi = ProgramStudi.objects.create(
+            nama_prodi='D4 Teknik Informatika', jurusan=Jurusan.objects.create(nama_jurusan='Teknik Elektro')
+        )
+
+        form = PengumumanForm(data={**pengumuman_data, 'audience': 'prodi'})
+        assert not form.is_valid()
+        assert 'target_prodi' in form.errors
+
+        form = PengumumanForm(data={**pengumuman_data, 'audience': 'prodi', 'target_prodi': prodi.pk}, user=user)
+        assert form.is_valid(), form.errors
+        instance = form.save()
+        assert instance.audience_topic() == f'prodi-{prodi.pk}'
+
     def test_pengumuman_form_invalid_missing_data(self):
         """
         Test that the form is invalid if required fields are missing.
@@ -148,36 +168,54 @@ class TestPengumumanForm:
 
 from django.urls import reverse
 from unittest.mock import patch
+from core.models import BroadcastJob
 
 class TestAnnouncementViews:
     """
     Tests for the views in the announcements app.
     """
 
-    @patch('announcements.views.send_notification_to_all_users')
-    def test_announcement_creation_sends_notification(self, mock_send_notification, client, user, pengumuman_data):
+    @patch('core.broadcast.start_broadcast')
+    def test_announcement_creation_sends_notification(self, mock_start_broadcast, client, user, pengumuman_data, django_capture_on_commit_callbacks):
         """
-        Test that creating an announcement triggers a notification.
+        Test that creating an announcement schedules a background broadcast job
+        and returns its id without waiting for delivery.
         """
         client.login(username='testuser', password='password123')
         url = reverse('announcements:create')
-        response = client.post(url, pengumuman_data)
+        with django_capture_on_commit_callbacks(execute=True):
+            response = client.post(url, pengumuman_data)
 
         assert response.status_code == 200
         assert response.json()['status'] == 'success'
-        
-        # Check that the notification function was called
-        mock_send_notification.assert_called_once()
-        
-        # Check the arguments passed to the notification function
+
+        # Check that the broadcast was started for the recorded job
+        job = BroadcastJob.objects.get(pk=response.json()['broadcast_job_id'])
+        mock_start_broadcast.assert_called_once_with(job.pk)
+
+        # Check the payload stored on the job
         announcement = Pengumuman.objects.latest('created_at')
         expected_data = {
             'announcement_id': str(announcement.id),
             'click_action': 'FLUTTER_NOTIFICATION_CLICK',
             'screen': 'announcement_detail',
         }
-        mock_send_notification.assert_called_with(
-            title=pengumuman_data['judul'],
-            body=pengumuman_data['deskripsi'],
-            data=expected_data
-        )
\ No newline at end of file
+        assert job.title == pengumuman_data['judul']
+        assert job.body == pengumuman_data['deskripsi']
+        assert job.data == expected_data
+        assert job.status == 'PENDING'
+        assert job.topic == 'all'
+
+    def test_broadcast_status_view(self, client, user):
+        """
+        Test that the status endpoint reports the counters of a broadcast job.
+        """
+        job = BroadcastJob.objects.create(title='Info', body='Isi', status='RUNNING', total_tokens=10, sent_count=4, failed_count=1)
+        client.login(username='testuser', password='password123')
+        url = reverse('announcements:broadcast-status', kwargs={'job_id': job.pk})
+        response = client.get(url)
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data['status'] == 'RUNNING'
+        assert (data['total'], data['sent'], data['failed'], data['pruned']) == (10, 4, 1, 0)
@@ -15,6 +15,9 @@ urlpatterns = [
     # URLs for the AJAX update functionality (GET to fetch, POST to save)
     path('<int:pk>/update/', views.AnnouncementUpdateView.as_view(), name='update'),
 
+    # URL for polling the progress of the notification broadcast of a new announcement
+    path('broadcast/<int:job_id>/status/', views.BroadcastStatusView.as_view(), name='broadcast-status'),
+
     # URL for deleting an announcement
     path('<int:pk>/delete/', views.AnnouncementDeleteView.as_view(), name='delete'),
 ]
\ No newline at end of file
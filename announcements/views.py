@@ -4,10 +4,12 @@ from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib import messages
 from django.http import JsonResponse
 from django.shortcuts import get_object_or_404, redirect
+from django.urls import reverse
 from django.views.generic import ListView, View
 from .models import Pengumuman
 from .forms import PengumumanForm
-from core.firebase_utils import send_notification_to_all_users
+from core.broadcast import create_broadcast_job
+from core.models import BroadcastJob
 
 
 class AnnouncementListView(LoginRequiredMixin, ListView):
@@ -29,6 +31,9 @@ class AnnouncementCreateView(LoginRequiredMixin, View):
             announcement = form.save()
 
             # --- TRIGGER NOTIFICATION ---
+            # The broadcast runs in the background; the admin can poll its progress
+            # through the broadcast status endpoint using the returned job id.
+            job_id = None
             try:
                 title = announcement.judul
                 body = announcement.deskripsi
@@ -37,17 +42,34 @@ class AnnouncementCreateView(LoginRequiredMixin, View):
                     'click_action': 'FLUTTER_NOTIFICATION_CLICK',
                     'screen': 'announcement_detail', # Custom key to tell Flutter where to navigate
                 }
-                send_notification_to_all_users(title=title, body=body, data=data)
+                job = create_broadcast_job(
+                    title=title, body=body, data=data, user=request.user,
+                    topic=announcement.audience_topic(),
+                )
+                job_id = job.pk
             except Exception as e:
                 # Log the error, but don't let it crash the main request
-                print(f"Failed to send notification for new announcement: {e}")
+                print(f"Failed to schedule notification for new announcement: {e}")
 
             messages.success(request, f"Pengumuman '{announcement.judul}' berhasil dibuat.")
-            return JsonResponse({'status': 'success'})
+            return JsonResponse({
+                'status': 'success',
+                'broadcast_job_id': job_id,
+                'broadcast_status_url': reverse('announcements:broadcast-status', kwargs={'job_id': job_id}) if job_id else None,
+            })
         else:
             return JsonResponse({'status': 'error', 'errors': form.errors}, status=400)
 
 
+class BroadcastStatusView(LoginRequiredMixin, View):
+    """
+    Returns the progress of a broadcast job (sent/failed/pruned counts) as JSON.
+    """
+    def get(self, request, job_id):
+        job = get_object_or_404(BroadcastJob, pk=job_id)
+        return JsonResponse(job.as_dict())
+
+
 class AnnouncementUpdateView(LoginRequiredMixin, View):
     def get(self, request, pk):
         announcement = get_object_or_404(Pengumuman, pk=pk)
@@ -56,6 +78,9 @@ class AnnouncementUpdateView(LoginRequiredMixin, View):
             'deskripsi': announcement.deskripsi,
             'tanggal_mulai': announcement.tanggal_mulai,
             'tanggal_selesai': announcement.tanggal_selesai,
+            'audience': announcement.audience,
+            'target_prodi': announcement.target_prodi_id,
+            'target_jurusan': announcement.target_jurusan_id,
             'lampiran_url': announcement.lampiran.url if announcement.lampiran else ''
         }
         return JsonResponse(data)
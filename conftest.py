@@ -0,0 +1,14 @@
+# conftest.py
+import pytest
+from django.core.cache import cache
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """
+    Tests run on the cache configured in settings (LocMemCache without
+    REDIS_URL), emptied after each test so cached entries do not leak
+    between tests.
+    """
+    yield
+    cache.clear()
@@ -1,4 +1,43 @@
 from django.contrib import admin
-from .models import ActivityLog
+from .models import ActivityLog, BroadcastJob, DashboardStats, DeletionLog, ExportJob, NotificationOutbox
 
-admin.site.register(ActivityLog)
\ No newline at end of file
+admin.site.register(ActivityLog)
+
+
+@admin.register(NotificationOutbox)
+class NotificationOutboxAdmin(admin.ModelAdmin):
+    list_display = ('title', 'user', 'status', 'attempts', 'next_attempt_at', 'created_at')
+    list_filter = ('status',)
+    search_fields = ('title', 'user__username')
+    readonly_fields = ('attempts', 'last_error', 'delivered_at', 'created_at', 'updated_at')
+
+
+@admin.register(BroadcastJob)
+class BroadcastJobAdmin(admin.ModelAdmin):
+    list_display = ('title', 'topic', 'mode', 'status', 'total_tokens', 'sent_count', 'failed_count', 'pruned_count', 'created_at')
+    list_filter = ('status', 'mode')
+    readonly_fields = (
+        'total_tokens', 'sent_count', 'failed_count', 'pruned_count', 'resume_after', 'error',
+        'started_at', 'heartbeat_at', 'finished_at',
+    )
+
+
+@admin.register(ExportJob)
+class ExportJobAdmin(admin.ModelAdmin):
+    list_display = ('kind', 'file_format', 'status', 'processed_rows', 'total_rows', 'created_by', 'created_at')
+    list_filter = ('status', 'kind', 'file_format')
+    readonly_fields = (
+        'params_hash', 'total_rows', 'processed_rows', 'file_key', 'error', 'started_at', 'heartbeat_at', 'finished_at',
+    )
+
+
+@admin.register(DeletionLog)
+class DeletionLogAdmin(admin.ModelAdmin):
+    list_display = ('resource', 'object_id', 'mahasiswa_id', 'dosen_id', 'deleted_at')
+    list_filter = ('resource',)
+
+
+@admin.register(DashboardStats)
+class DashboardStatsAdmin(admin.ModelAdmin):
+    list_display = ('date', 'total_mahasiswa', 'total_dosen', 'total_dokumen', 'active_tugas_akhir', 'reconciled_at')
+    readonly_fields = ('updated_at', 'reconciled_at')
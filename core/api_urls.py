@@ -1,8 +1,10 @@
 # core/api_urls.py
 
 from django.urls import path
-from .api_views import RegisterFCMDeviceView
+from .api_views import MeOverviewView, RegisterFCMDeviceView, SyncView
 
 urlpatterns = [
     path('register-fcm-device/', RegisterFCMDeviceView.as_view(), name='core-api-register-fcm'),
+    path('sync/', SyncView.as_view(), name='core-api-sync'),
+    path('me/overview/', MeOverviewView.as_view(), name='core-api-me-overview'),
 ]
@@ -4,7 +4,12 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
+from tugas_akhir.permissions import IsMahasiswaOrDosen
 from .models import FCMDevice
+from .firebase_utils import sync_device_topics
+from .overview import build_overview
+from .renderers import FastJSONRenderer
+from .sync import SYNC_RESOURCES, build_sync_payload, parse_watermark
 
 class RegisterFCMDeviceView(APIView):
     """
@@ -27,6 +32,13 @@ class RegisterFCMDeviceView(APIView):
             defaults={'user': request.user}
         )
 
+        # Subscribe the token to its role topics so announcements can be sent
+        # as a single topic message. A failure here must not block registration.
+        try:
+            sync_device_topics(device)
+        except Exception as e:
+            print(f"Failed to subscribe device {device.pk} to topics: {e}")
+
         if created:
             return Response(
                 {'status': 'New device registered successfully.'},
@@ -36,4 +48,44 @@ class RegisterFCMDeviceView(APIView):
             return Response(
                 {'status': 'Existing device re-associated with user.'},
                 status=status.HTTP_200_OK
-            )
\ No newline at end of file
+            )
+
+
+class SyncView(APIView):
+    """
+    Delta sync for the mobile app: documents, guidance schedules,
+    supervision requests and announcements created, updated or deleted
+    since a watermark (see core.sync).
+
+    GET ?since=<watermark> applies one watermark to every resource;
+    ?dokumen=, ?jadwal_bimbingan=, ?request_dosen= and ?pengumuman= override
+    it per resource. Pass back the `watermark` of the previous response.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        watermarks = {}
+        for name in SYNC_RESOURCES:
+            value = request.query_params.get(name) or request.query_params.get('since')
+            try:
+                watermarks[name] = parse_watermark(value)
+            except ValueError:
+                return Response(
+                    {'error': f"Format watermark untuk '{name}' tidak valid."},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        return Response(build_sync_payload(request, watermarks))
+
+
+class MeOverviewView(APIView):
+    """
+    Everything the mobile home screen needs in one round trip: profile, tugas
+    akhir, chapter checklist, upcoming guidance schedules, supervision
+    requests and active announcements, role-aware (see core.overview).
+    Replaces the app's launch-time chain of requests.
+    """
+    permission_classes = [IsAuthenticated, IsMahasiswaOrDosen]
+    renderer_classes = [FastJSONRenderer]
+
+    def get(self, request, *args, **kwargs):
+        return Response(build_overview(request))
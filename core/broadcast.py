@@ -0,0 +1,187 @@
+# core/broadcast.py
+
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import BroadcastJob, FCMDevice
+
+
+def create_broadcast_job(title, body, data=None, user=None, topic='all', mode=None):
+    """
+    Records a new broadcast to the `topic` audience and schedules it to
+    start in a background thread once the current transaction commits.
+    `mode` defaults to settings.ANNOUNCEMENT_BROADCAST_MODE.
+    Returns immediately with the PENDING job.
+    """
+    job = BroadcastJob.objects.create(
+        title=title,
+        body=body,
+        data={key: str(value) for key, value in (data or {}).items()},
+        topic=topic,
+        mode=mode or getattr(settings, 'ANNOUNCEMENT_BROADCAST_MODE', 'topic'),
+        created_by=user,
+    )
+    transaction.on_commit(lambda: start_broadcast(job.pk))
+    return job
+
+
+def start_broadcast(job_id):
+    """Runs the job on a daemon thread so the calling request is not blocked."""
+    thread = threading.Thread(target=_run_in_thread, args=(job_id,), daemon=True, name=f"broadcast-{job_id}")
+    thread.start()
+    return thread
+
+
+def _run_in_thread(job_id):
+    try:
+        run_broadcast_job(job_id)
+    finally:
+        connection.close()
+
+
+def _lease():
+    return timedelta(seconds=getattr(settings, 'BROADCAST_LEASE', 300))
+
+
+def _iter_token_chunks(chunk_size, devices=None, after=0):
+    """
+    Streams the token table with a server-side cursor (`.iterator()`),
+    yielding (tokens, last_pk) with at most `chunk_size` tokens, starting
+    after the device with pk `after`.
+    """
+    chunk = []
+    devices = FCMDevice.objects.all() if devices is None else devices
+    rows = devices.filter(pk__gt=after).order_by('pk').values_list('pk', 'fcm_token')
+    for pk, token in rows.iterator(chunk_size=chunk_size):
+        chunk.append(token)
+        if len(chunk) == chunk_size:
+            yield chunk, pk
+            chunk = []
+    if chunk:
+        yield chunk, pk
+
+
+def _send_chunk(job, tokens, transport):
+    """Delivers one chunk and adds its outcome to the job's counters."""
+    from .firebase_utils import deliver_notification
+
+    report = deliver_notification(tokens, job.title, job.body, data=job.data, transport=transport)
+    BroadcastJob.objects.filter(pk=job.pk).update(
+        sent_count=F('sent_count') + report.success_count,
+        failed_count=F('failed_count') + report.failure_count,
+        pruned_count=F('pruned_count') + len(report.pruned_tokens),
+        heartbeat_at=timezone.now(),
+    )
+    return report
+
+
+def _send_chunk_in_thread(job, tokens, transport):
+    """Pool wrapper: each worker thread owns its DB connection and closes it afterwards."""
+    try:
+        return _send_chunk(job, tokens, transport)
+    finally:
+        connection.close()
+
+
+def _record_progress(job_id, last_pk):
+    """Every token up to `last_pk` has been sent; a reclaimed job starts after it."""
+    BroadcastJob.objects.filter(pk=job_id).update(resume_after=last_pk, heartbeat_at=timezone.now())
+
+
+def _claim(job_id):
+    """
+    Moves a PENDING job to RUNNING, or takes over a RUNNING job whose
+    runner has shown no sign of life for BROADCAST_LEASE seconds (e.g. the
+    web worker running its thread was restarted).
+    """
+    now = timezone.now()
+    claimed = BroadcastJob.objects.filter(pk=job_id, status='PENDING').update(
+        status='RUNNING', started_at=now, heartbeat_at=now
+    )
+    if not claimed:
+        claimed = BroadcastJob.objects.filter(
+            pk=job_id, status='RUNNING', heartbeat_at__lt=now - _lease()
+        ).update(heartbeat_at=now)
+    return bool(claimed)
+
+
+def run_broadcast_job(job_id, transport=None, max_workers=None):
+    """
+    Executes a PENDING (or abandoned RUNNING) broadcast job: claims it, then
+    either sends a single topic message or streams the audience's tokens in
+    chunks of FCM_BATCH_SIZE and sends the chunks concurrently on a thread
+    pool. Progress is recorded as chunks complete in order, so a reclaimed
+    job only sends the tokens after `resume_after`.
+    Returns False if the job was already claimed by another runner.
+    """
+    from .firebase_utils import FCM_MAX_BATCH_SIZE, devices_for_topic, get_transport, send_notification_to_topic
+
+    if not _claim(job_id):
+        return False
+
+    job = BroadcastJob.objects.get(pk=job_id)
+    transport = transport or get_transport()
+    chunk_size = min(getattr(settings, 'FCM_BATCH_SIZE', FCM_MAX_BATCH_SIZE), FCM_MAX_BATCH_SIZE)
+    max_workers = max_workers or getattr(settings, 'BROADCAST_MAX_WORKERS', 4)
+
+    try:
+        if not transport.is_available():
+            raise RuntimeError("Firebase app not initialized. Cannot send notification.")
+
+        devices = devices_for_topic(job.topic)
+        BroadcastJob.objects.filter(pk=job_id).update(total_tokens=devices.count())
+        chunks = _iter_token_chunks(chunk_size, devices, after=job.resume_after)
+
+        if job.mode == 'topic':
+            # FCM fans the message out to every subscribed device itself.
+            send_notification_to_topic(job.topic, job.title, job.body, data=job.data, transport=transport)
+        elif max_workers == 1:
+            for chunk, last_pk in chunks:
+                _send_chunk(job, chunk, transport)
+                _record_progress(job_id, last_pk)
+        else:
+            # Keep a bounded number of chunks in flight so memory stays flat,
+            # and only advance the progress past chunks that completed in order.
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                in_flight = deque()
+                for chunk, last_pk in chunks:
+                    if len(in_flight) >= max_workers * 2:
+                        future, done_pk = in_flight.popleft()
+                        future.result()
+                        _record_progress(job_id, done_pk)
+                    in_flight.append((executor.submit(_send_chunk_in_thread, job, chunk, transport), last_pk))
+                while in_flight:
+                    future, done_pk = in_flight.popleft()
+                    future.result()
+                    _record_progress(job_id, done_pk)
+    except Exception as e:
+        print(f"Broadcast job {job_id} failed: {e}")
+        BroadcastJob.objects.filter(pk=job_id).update(status='FAILED', error=str(e), finished_at=timezone.now())
+        return True
+
+    BroadcastJob.objects.filter(pk=job_id).update(status='DONE', finished_at=timezone.now())
+    return True
+
+
+def run_pending_broadcasts(stale_after=60):
+    """
+    Picks up broadcast jobs whose background thread never started (e.g. the
+    web process restarted right after the job was created), and RUNNING
+    jobs whose runner died (no heartbeat for BROADCAST_LEASE seconds).
+    Returns the number of jobs executed.
+    """
+    now = timezone.now()
+    job_ids = list(
+        BroadcastJob.objects.filter(
+            Q(status='PENDING', created_at__lt=now - timedelta(seconds=stale_after)) |
+            Q(status='RUNNING', heartbeat_at__lt=now - _lease())
+        ).values_list('pk', flat=True)
+    )
+    return sum(1 for job_id in job_ids if run_broadcast_job(job_id))
@@ -0,0 +1,76 @@
+# core/conditional.py
+
+import hashlib
+from functools import partial
+
+from django.conf import settings
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+
+def collection_validators(queryset, *parts):
+    """
+    Returns (etag, last_modified, count) for `queryset` from one aggregate
+    query: max(updated_at) changes on every insert or edit, the row count on
+    every deletion. `parts` (e.g. the request path, so each page and filter
+    has its own ETag) are mixed into the ETag.
+    """
+    stats = queryset.order_by().aggregate(last_modified=Max('updated_at'), count=Count('pk'))
+    last_modified = stats['last_modified']
+    raw = ':'.join([str(stats['count']), last_modified.isoformat() if last_modified else '', *map(str, parts)])
+    return quote_etag(hashlib.md5(raw.encode()).hexdigest()), last_modified, stats['count']
+
+
+def conditional_response(request, etag, last_modified, render, private=False):
+    """
+    Answers 304 Not Modified when the client's If-None-Match/If-Modified-Since
+    match the validators; only otherwise is `render()` called to build (and
+    serialize) the full response. Both carry ETag, Last-Modified and a
+    Cache-Control that lets clients reuse the body for
+    CONDITIONAL_GET_MAX_AGE seconds before revalidating.
+    """
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    if response is None:
+        response = render()
+    if response.status_code in (200, 304):
+        response['ETag'] = etag
+        if timestamp is not None:
+            response['Last-Modified'] = http_date(timestamp)
+        visibility = {'private': True} if private else {'public': True}
+        patch_cache_control(
+            response, max_age=getattr(settings, 'CONDITIONAL_GET_MAX_AGE', 60), must_revalidate=True, **visibility
+        )
+    return response
+
+
+class ConditionalGetMixin:
+    """
+    Conditional GET for DRF list/retrieve views over models with an
+    `updated_at` field (see `collection_validators`). Set
+    `conditional_private = True` on endpoints that require authentication,
+    so shared caches do not store them.
+    """
+    conditional_private = False
+
+    def get_validator_parts(self):
+        """Extra values mixed into the ETag; the full path covers query parameters."""
+        return [self.request.get_full_path()]
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        etag, last_modified, _ = collection_validators(queryset, *self.get_validator_parts())
+        return conditional_response(
+            request, etag, last_modified, partial(super().list, request, *args, **kwargs),
+            private=self.conditional_private,
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        queryset = self.filter_queryset(self.get_queryset()).filter(**{self.lookup_field: kwargs[lookup_url_kwarg]})
+        etag, last_modified, count = collection_validators(queryset, *self.get_validator_parts())
+        render = partial(super().retrieve, request, *args, **kwargs)
+        if not count:
+            return render()  # Let the view produce its usual 404
+        return conditional_response(request, etag, last_modified, render, private=self.conditional_private)
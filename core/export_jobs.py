@@ -0,0 +1,238 @@
+# core/export_jobs.py
+
+import hashlib
+import json
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .exports import (
+    CSV_CONTENT_TYPE, EXPORT_CHUNK_SIZE, NDJSON_CONTENT_TYPE, XLSX_CONTENT_TYPE,
+    iter_csv, iter_ndjson, write_text, write_xlsx,
+)
+from .models import ExportJob
+from .s3 import get_presigned_url, get_s3_client
+
+
+@dataclass(frozen=True)
+class ExportSource:
+    """
+    Where an export kind gets its data. `queryset`, `columns` and `rows` are
+    dotted paths (resolved lazily, since the app views import core) to the
+    same helpers the synchronous export views use, so both produce identical
+    files. `params` lists the filters accepted from the list page.
+    """
+    queryset: str
+    columns: str
+    rows: str
+    title: str
+    filename: str
+    params: tuple = ('q',)
+    max_width: int = None
+
+
+EXPORT_SOURCES = {
+    'users': ExportSource(
+        'users.views.user_export_queryset', 'users.views.USER_EXPORT_COLUMNS', 'users.views.user_export_rows',
+        "User Data Export", 'users_export', params=('q', 'role'),
+    ),
+    'documents': ExportSource(
+        'tugas_akhir.views.document_export_queryset', 'tugas_akhir.views.DOCUMENT_EXPORT_COLUMNS',
+        'tugas_akhir.views.document_export_rows', "Documents Export", 'documents_export', max_width=40,
+    ),
+    'tugas_akhir': ExportSource(
+        'tugas_akhir.views.tugas_akhir_export_queryset', 'tugas_akhir.views.TUGAS_AKHIR_EXPORT_COLUMNS',
+        'tugas_akhir.views.tugas_akhir_export_rows', "Tugas Akhir Export", 'tugas_akhir_export', max_width=50,
+    ),
+    'jadwal_bimbingan': ExportSource(
+        'tugas_akhir.views.jadwal_export_queryset', 'tugas_akhir.views.JADWAL_EXPORT_COLUMNS',
+        'tugas_akhir.views.jadwal_export_rows', "Jadwal Bimbingan Export", 'jadwal_bimbingan_export',
+        params=('q', 'status'), max_width=50,
+    ),
+}
+
+CONTENT_TYPES = {'xlsx': XLSX_CONTENT_TYPE, 'csv': CSV_CONTENT_TYPE, 'ndjson': NDJSON_CONTENT_TYPE}
+
+
+def normalize_params(kind, params):
+    """Keeps only the filters the export kind understands, stripped and non-empty."""
+    normalized = {}
+    for name in EXPORT_SOURCES[kind].params:
+        value = (params.get(name) or '').strip()
+        if value:
+            normalized[name] = value
+    return normalized
+
+
+def params_hash(kind, file_format, params):
+    payload = json.dumps([kind, file_format, params], sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def create_export_job(kind, file_format='xlsx', params=None, user=None):
+    """
+    Queues an export for `run_export_worker`, or returns the job that is
+    already building (or recently built) the same export. Artifacts are
+    reused for EXPORT_ARTIFACT_REUSE_SECONDS after the job was created;
+    failed jobs and RUNNING jobs whose worker died are never reused.
+    Returns (job, created).
+    """
+    if kind not in EXPORT_SOURCES:
+        raise ValueError(f"Unknown export kind: {kind}")
+    if file_format not in CONTENT_TYPES:
+        raise ValueError(f"Unknown export format: {file_format}")
+
+    params = normalize_params(kind, params or {})
+    digest = params_hash(kind, file_format, params)
+    now = timezone.now()
+    cutoff = now - timedelta(seconds=getattr(settings, 'EXPORT_ARTIFACT_REUSE_SECONDS', 600))
+    recent = (
+        ExportJob.objects
+        .filter(params_hash=digest, created_at__gte=cutoff)
+        .exclude(status='FAILED')
+        .exclude(status='RUNNING', heartbeat_at__lt=now - _lease())
+        .order_by('-created_at')
+        .first()
+    )
+    if recent:
+        return recent, False
+
+    job = ExportJob.objects.create(
+        kind=kind, file_format=file_format, params=params, params_hash=digest, created_by=user,
+    )
+    return job, True
+
+
+def _lease():
+    return timedelta(seconds=getattr(settings, 'EXPORT_LEASE', 300))
+
+
+def artifact_key(job):
+    prefix = getattr(settings, 'EXPORT_STORAGE_PREFIX', 'exports/')
+    return f"{prefix}{job.kind}/{job.pk}-{job.params_hash[:12]}.{job.file_format}"
+
+
+def download_url(job):
+    """Presigned download link for a finished job's artifact, named like the synchronous export."""
+    file_name = f"{EXPORT_SOURCES[job.kind].filename}.{job.file_format}"
+    return get_presigned_url(
+        job.file_key, disposition=f'attachment; filename="{file_name}"', site='web.export_download',
+    )
+
+
+def _track_progress(job_id, rows):
+    """Passes rows through, recording the count (and a heartbeat) on the job once per chunk."""
+    processed = 0
+    for row in rows:
+        yield row
+        processed += 1
+        if processed % EXPORT_CHUNK_SIZE == 0:
+            ExportJob.objects.filter(pk=job_id).update(processed_rows=processed, heartbeat_at=timezone.now())
+    ExportJob.objects.filter(pk=job_id).update(processed_rows=processed, heartbeat_at=timezone.now())
+
+
+class _UploadHeartbeat:
+    """boto3 upload callback that keeps a job's heartbeat fresh while a large file is uploaded."""
+
+    def __init__(self, job_id, interval=30):
+        self.job_id = job_id
+        self.interval = timedelta(seconds=interval)
+        self.last = timezone.now()
+
+    def __call__(self, bytes_transferred):
+        now = timezone.now()
+        if now - self.last >= self.interval:
+            ExportJob.objects.filter(pk=self.job_id).update(heartbeat_at=now)
+            self.last = now
+
+
+def _claim(job_id):
+    """
+    Moves a PENDING job to RUNNING, or takes over a RUNNING job whose worker
+    has shown no sign of life for EXPORT_LEASE seconds. A reclaimed export
+    is rebuilt from the start.
+    """
+    now = timezone.now()
+    return bool(ExportJob.objects.filter(
+        Q(status='PENDING') | Q(status='RUNNING', heartbeat_at__lt=now - _lease()), pk=job_id,
+    ).update(status='RUNNING', started_at=now, heartbeat_at=now, processed_rows=0))
+
+
+def run_export_job(job_id):
+    """
+    Executes a PENDING (or abandoned RUNNING) export job: claims it, builds
+    the file in constant memory (see core.exports) and uploads it to S3.
+    Returns False if the job was already claimed by another worker.
+    """
+    if not _claim(job_id):
+        return False
+
+    job = ExportJob.objects.get(pk=job_id)
+    source = EXPORT_SOURCES[job.kind]
+    try:
+        queryset = import_string(source.queryset)(job.params)
+        ExportJob.objects.filter(pk=job_id).update(total_rows=queryset.count())
+
+        build_rows = import_string(source.rows)
+        columns = import_string(source.columns)
+        headers = [header for _, header in columns]
+        rows = _track_progress(job_id, build_rows(queryset.iterator(chunk_size=EXPORT_CHUNK_SIZE)))
+        if job.file_format == 'csv':
+            output = write_text(iter_csv(rows, headers))
+        elif job.file_format == 'ndjson':
+            output = write_text(iter_ndjson(rows, [key for key, _ in columns]))
+        else:
+            output = write_xlsx(rows, headers, source.title, max_width=source.max_width)
+
+        key = artifact_key(job)
+        with output:
+            get_s3_client().upload_fileobj(
+                output, settings.AWS_STORAGE_BUCKET_NAME, key,
+                ExtraArgs={'ContentType': CONTENT_TYPES[job.file_format]}, Callback=_UploadHeartbeat(job_id),
+            )
+    except Exception as e:
+        print(f"Export job {job_id} failed: {e}")
+        ExportJob.objects.filter(pk=job_id).update(status='FAILED', error=str(e), finished_at=timezone.now())
+        return True
+
+    ExportJob.objects.filter(pk=job_id).update(status='DONE', file_key=key, finished_at=timezone.now())
+    return True
+
+
+def run_pending_exports(limit=None):
+    """
+    Runs queued export jobs, and RUNNING jobs whose worker died (no
+    heartbeat for EXPORT_LEASE seconds), oldest first.
+    Returns the number of jobs executed.
+    """
+    job_ids = ExportJob.objects.filter(
+        Q(status='PENDING') | Q(status='RUNNING', heartbeat_at__lt=timezone.now() - _lease())
+    ).order_by('created_at').values_list('pk', flat=True)
+    if limit:
+        job_ids = job_ids[:limit]
+    return sum(1 for job_id in list(job_ids) if run_export_job(job_id))
+
+
+def prune_export_jobs(retention_seconds=None):
+    """
+    Deletes finished and failed jobs older than EXPORT_RETENTION_SECONDS
+    together with their artifacts, 1000 keys per S3 request.
+    Returns the number of jobs deleted.
+    """
+    retention = retention_seconds if retention_seconds is not None else getattr(settings, 'EXPORT_RETENTION_SECONDS', 86400)
+    old_jobs = ExportJob.objects.filter(
+        status__in=['DONE', 'FAILED'], created_at__lt=timezone.now() - timedelta(seconds=retention)
+    )
+    keys = [key for key in old_jobs.values_list('file_key', flat=True) if key]
+    client = get_s3_client() if keys else None
+    for start in range(0, len(keys), 1000):
+        client.delete_objects(
+            Bucket=settings.AWS_STORAGE_BUCKET_NAME,
+            Delete={'Objects': [{'Key': key} for key in keys[start:start + 1000]], 'Quiet': True},
+        )
+    deleted, _ = old_jobs.delete()
+    return deleted
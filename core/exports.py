@@ -0,0 +1,154 @@
+# core/exports.py
+
+import csv
+import io
+import json
+import pickle
+import tempfile
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import FileResponse, StreamingHttpResponse
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Font
+from openpyxl.utils import get_column_letter
+
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+CSV_CONTENT_TYPE = 'text/csv; charset=utf-8'
+NDJSON_CONTENT_TYPE = 'application/x-ndjson'
+
+# Formats accepted by the export views' `format` parameter.
+EXPORT_FORMATS = ('xlsx', 'csv', 'ndjson')
+
+# Rows fetched per database round trip by the export querysets.
+EXPORT_CHUNK_SIZE = 2000
+# Rows encoded per chunk of a streamed CSV/NDJSON response.
+STREAM_BATCH_ROWS = 500
+
+
+def full_name(first_name, last_name):
+    """User.get_full_name() for rows read with `.values()`."""
+    return f"{first_name or ''} {last_name or ''}".strip()
+
+
+def write_xlsx(rows, headers, title, max_width=None):
+    """
+    Writes `rows` (an iterable of value lists, e.g. a generator over
+    `queryset.iterator()`) to an .xlsx file in constant memory and returns
+    the open temporary file, positioned at the start.
+
+    openpyxl's write-only mode streams rows to disk, but column widths must
+    be known before the first row is written. Rows are therefore spooled to
+    a temporary file while the widths are measured (a single pass over the
+    queryset), then replayed into the workbook.
+    """
+    widths = [len(str(header)) for header in headers]
+    with tempfile.TemporaryFile() as spool:
+        for row in rows:
+            for index, value in enumerate(row):
+                widths[index] = max(widths[index], len('' if value is None else str(value)))
+            pickle.dump(row, spool, protocol=pickle.HIGHEST_PROTOCOL)
+        spool.seek(0)
+
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet(title)
+        for index, width in enumerate(widths, 1):
+            width += 2
+            sheet.column_dimensions[get_column_letter(index)].width = min(width, max_width) if max_width else width
+        sheet.freeze_panes = 'A2'
+        sheet.append([_header_cell(sheet, header) for header in headers])
+
+        while True:
+            try:
+                sheet.append(pickle.load(spool))
+            except EOFError:
+                break
+
+        output = tempfile.TemporaryFile()
+        workbook.save(output)
+    output.seek(0)
+    return output
+
+
+def iter_csv(rows, headers):
+    """
+    Encodes `rows` as CSV text, yielding one string per STREAM_BATCH_ROWS
+    rows (the header row comes first).
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(headers)
+    for count, row in enumerate(rows, 1):
+        writer.writerow(row)
+        if count % STREAM_BATCH_ROWS == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def iter_ndjson(rows, keys):
+    """
+    Encodes `rows` as newline-delimited JSON objects keyed by `keys`,
+    yielding one string per STREAM_BATCH_ROWS rows.
+    """
+    lines = []
+    for row in rows:
+        lines.append(json.dumps(dict(zip(keys, row)), cls=DjangoJSONEncoder, ensure_ascii=False))
+        if len(lines) == STREAM_BATCH_ROWS:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+    if lines:
+        yield '\n'.join(lines) + '\n'
+
+
+def write_text(chunks):
+    """Writes text chunks (e.g. from `iter_csv`) UTF-8 encoded to a temporary file, positioned at the start."""
+    output = tempfile.TemporaryFile()
+    for chunk in chunks:
+        output.write(chunk.encode('utf-8'))
+    output.seek(0)
+    return output
+
+
+def xlsx_response(rows, headers, title, filename, max_width=None):
+    """
+    Builds the workbook with `write_xlsx` and streams it to the client in
+    chunks (FileResponse is a StreamingHttpResponse); the temporary file is
+    closed once the response has been sent.
+    """
+    return FileResponse(
+        write_xlsx(rows, headers, title, max_width=max_width),
+        as_attachment=True,
+        filename=filename,
+        content_type=XLSX_CONTENT_TYPE,
+    )
+
+
+def export_response(file_format, rows, columns, title, filename, max_width=None):
+    """
+    Returns an export download in `file_format` (one of EXPORT_FORMATS).
+    `columns` is a list of (key, header) pairs: XLSX and CSV use the headers,
+    NDJSON uses the keys, so every format has the same columns. CSV and
+    NDJSON are encoded while the client downloads; `filename` has no extension.
+    """
+    headers = [header for _, header in columns]
+    if file_format == 'csv':
+        return _streaming_response(iter_csv(rows, headers), CSV_CONTENT_TYPE, f"{filename}.csv")
+    if file_format == 'ndjson':
+        keys = [key for key, _ in columns]
+        return _streaming_response(iter_ndjson(rows, keys), NDJSON_CONTENT_TYPE, f"{filename}.ndjson")
+    return xlsx_response(rows, headers, title, f"{filename}.xlsx", max_width=max_width)
+
+
+def _streaming_response(chunks, content_type, filename):
+    response = StreamingHttpResponse(chunks, content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+def _header_cell(sheet, value):
+    cell = WriteOnlyCell(sheet, value=value)
+    cell.font = Font(bold=True)
+    cell.alignment = Alignment(horizontal='center')
+    return cell
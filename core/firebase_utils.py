@@ -1,9 +1,13 @@
 # core/firebase_utils.py
 
 import os
+from dataclasses import dataclass, field
+
 import firebase_admin
 from firebase_admin import credentials, messaging
 from django.conf import settings
+from django.db.models import Q
+from django.utils.module_loading import import_string
 from .models import FCMDevice
 
 # --- Firebase Admin SDK Initialization ---
@@ -27,81 +31,403 @@ except Exception as e:
     print(f"Error initializing Firebase Admin SDK: {e}")
 
 
-def send_notification_to_all_users(title, body, data=None):
+# --- Batched Delivery Engine ---
+
+# FCM accepts at most 500 tokens in a single multicast request.
+FCM_MAX_BATCH_SIZE = 500
+
+
+@dataclass
+class TokenResult:
     """
-    Sends a data-only push notification to all devices, one by one.
+    The outcome of delivering a message to a single FCM token.
     """
-    if not firebase_admin._apps:
-        print("Firebase app not initialized. Cannot send notification.")
-        return
+    token: str
+    success: bool
+    unregistered: bool = False
+    error: str = ''
 
-    fcm_tokens = list(FCMDevice.objects.values_list('fcm_token', flat=True).distinct())
 
-    if not fcm_tokens:
-        print("No FCM tokens found in the database.")
-        return
+@dataclass
+class DeliveryReport:
+    """
+    Aggregated outcome of a (possibly multi-batch) notification delivery.
+    """
+    success_count: int = 0
+    failure_count: int = 0
+    batch_count: int = 0
+    pruned_tokens: list = field(default_factory=list)
+    results: list = field(default_factory=list)
+
+    @property
+    def total(self):
+        return self.success_count + self.failure_count
+
+    def merge(self, other):
+        """Folds another report into this one (used by chunked/concurrent senders)."""
+        self.success_count += other.success_count
+        self.failure_count += other.failure_count
+        self.batch_count += other.batch_count
+        self.pruned_tokens.extend(other.pruned_tokens)
+        self.results.extend(other.results)
+        return self
+
+    def as_dict(self):
+        return {
+            'success': self.success_count,
+            'failure': self.failure_count,
+            'batches': self.batch_count,
+            'pruned': len(self.pruned_tokens),
+        }
+
+
+class FirebaseTransport:
+    """
+    Default transport: sends each batch with one `send_each_for_multicast` call
+    through the Firebase Admin SDK.
+    """
+    def is_available(self):
+        return bool(firebase_admin._apps)
+
+    def send_batch(self, tokens, data):
+        message = messaging.MulticastMessage(data=data, tokens=tokens)
+        batch_response = messaging.send_each_for_multicast(message)
+
+        results = []
+        for token, response in zip(tokens, batch_response.responses):
+            if response.success:
+                results.append(TokenResult(token=token, success=True))
+            else:
+                results.append(TokenResult(
+                    token=token,
+                    success=False,
+                    unregistered=isinstance(response.exception, messaging.UnregisteredError),
+                    error=str(response.exception),
+                ))
+        return results
+
+    def send_topic(self, topic, data):
+        messaging.send(messaging.Message(data=data, topic=topic))
+
+    def subscribe(self, tokens, topic):
+        response = messaging.subscribe_to_topic(tokens, topic)
+        return [tokens[error.index] for error in response.errors]
+
+    def unsubscribe(self, tokens, topic):
+        response = messaging.unsubscribe_from_topic(tokens, topic)
+        return [tokens[error.index] for error in response.errors]
+
+
+_transport = None
+
+
+def get_transport():
+    """
+    Returns the process-wide FCM transport configured by `settings.FCM_TRANSPORT`.
+    Any class exposing `is_available()`, `send_batch(tokens, data)` and the
+    topic methods (`send_topic`, `subscribe`, `unsubscribe`) can be plugged
+    in, e.g. a client for a local fake FCM endpoint when benchmarking.
+    """
+    global _transport
+    if _transport is None:
+        transport_path = getattr(settings, 'FCM_TRANSPORT', 'core.firebase_utils.FirebaseTransport')
+        _transport = import_string(transport_path)()
+    return _transport
+
+
+def _chunked(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def deliver_notification(tokens, title, body, data=None, transport=None, prune=True):
+    """
+    Sends one data-only message to many tokens in multicast batches of up to
+    FCM_MAX_BATCH_SIZE, collecting per-token results. Tokens reported as
+    unregistered are removed from FCMDevice with a single bulk delete.
+    Returns a DeliveryReport.
+    """
+    transport = transport or get_transport()
+    report = DeliveryReport()
 
     message_data = {'title': title, 'body': body}
     if data:
         message_data.update(data)
 
-    success_count = 0
-    failure_count = 0
-    tokens_to_delete = []
+    batch_size = min(getattr(settings, 'FCM_BATCH_SIZE', FCM_MAX_BATCH_SIZE), FCM_MAX_BATCH_SIZE)
 
-    for token in fcm_tokens:
-        message = messaging.Message(data=message_data, token=token)
+    for batch in _chunked(list(tokens), batch_size):
+        report.batch_count += 1
         try:
-            messaging.send(message)
-            success_count += 1
-        except messaging.UnregisteredError:
-            tokens_to_delete.append(token)
-            failure_count += 1
+            batch_results = transport.send_batch(batch, message_data)
         except Exception as e:
-            print(f"Failed to send to token {token[:15]}... Error: {e}")
-            failure_count += 1
+            # The whole request failed (network, auth, ...); count every token as failed.
+            print(f"Failed to send batch of {len(batch)} tokens. Error: {e}")
+            batch_results = [TokenResult(token=token, success=False, error=str(e)) for token in batch]
+
+        for result in batch_results:
+            report.results.append(result)
+            if result.success:
+                report.success_count += 1
+            else:
+                report.failure_count += 1
+                if result.unregistered:
+                    report.pruned_tokens.append(result.token)
+
+    if prune and report.pruned_tokens:
+        # FCM drops unregistered tokens from their topics itself; clearing the
+        # topics first spares the post_delete receiver an unsubscribe per token.
+        pruned = FCMDevice.objects.filter(fcm_token__in=report.pruned_tokens)
+        pruned.update(topics=[])
+        pruned.delete()
 
-    if tokens_to_delete:
-        FCMDevice.objects.filter(fcm_token__in=tokens_to_delete).delete()
+    return report
 
-    print(f"--- Sending Complete (All Users) --- Success: {success_count}, Failure: {failure_count}")
+
+def send_notification_to_all_users(title, body, data=None):
+    """
+    Sends a data-only push notification to all devices in multicast batches.
+    """
+    transport = get_transport()
+    if not transport.is_available():
+        print("Firebase app not initialized. Cannot send notification.")
+        return DeliveryReport()
+
+    fcm_tokens = list(FCMDevice.objects.values_list('fcm_token', flat=True).distinct())
+
+    if not fcm_tokens:
+        print("No FCM tokens found in the database.")
+        return DeliveryReport()
+
+    report = deliver_notification(fcm_tokens, title, body, data=data, transport=transport)
+
+    print(f"--- Sending Complete (All Users) --- Success: {report.success_count}, Failure: {report.failure_count}")
+    return report
 
 
 def send_notification_to_user(user, title, body, data=None):
     """
-    Sends a data-only push notification to all devices for a specific user, one by one.
+    Sends a data-only push notification to all devices for a specific user in one batch.
     """
-    if not firebase_admin._apps:
+    transport = get_transport()
+    if not transport.is_available():
         print("Firebase app not initialized. Cannot send notification.")
-        return
+        return DeliveryReport()
 
     fcm_tokens = list(user.fcm_devices.values_list('fcm_token', flat=True))
 
     if not fcm_tokens:
         print(f"User {user.username} has no registered FCM tokens.")
+        return DeliveryReport()
+
+    report = deliver_notification(fcm_tokens, title, body, data=data, transport=transport)
+
+    print(f"--- Sending Complete (User: {user.username}) --- Success: {report.success_count}, Failure: {report.failure_count}")
+    return report
+
+
+# --- Topic Messaging ---
+
+# FCM accepts at most 1000 tokens per subscribe/unsubscribe request.
+FCM_MAX_TOPIC_BATCH_SIZE = 1000
+TOPIC_ALL = 'all'
+
+
+def topic_name(key):
+    """Returns the FCM topic for an audience key, e.g. 'prodi-3' -> 'digita-prodi-3'."""
+    prefix = getattr(settings, 'FCM_TOPIC_PREFIX', '')
+    return f"{prefix}{key}"
+
+
+def role_topics_for_user(user):
+    """
+    Returns the audience keys a user's devices should be subscribed to:
+    'all', the role ('mahasiswa'/'dosen'), and their prodi and/or jurusan.
+    """
+    topics = [TOPIC_ALL]
+    mahasiswa = getattr(user, 'mahasiswa_profile', None)
+    dosen = getattr(user, 'dosen_profile', None)
+
+    if mahasiswa:
+        topics += ['mahasiswa', f"prodi-{mahasiswa.program_studi_id}", f"jurusan-{mahasiswa.program_studi.jurusan_id}"]
+    elif dosen:
+        topics += ['dosen', f"jurusan-{dosen.jurusan_id}"]
+    return topics
+
+
+def devices_for_topic(key):
+    """
+    Returns the FCMDevice queryset matching an audience key. Used by the
+    token fan-out mode so both modes reach the same audience.
+    """
+    devices = FCMDevice.objects.all()
+    if key == 'mahasiswa':
+        return devices.filter(user__mahasiswa_profile__isnull=False)
+    if key == 'dosen':
+        return devices.filter(user__dosen_profile__isnull=False)
+    if key.startswith('prodi-'):
+        return devices.filter(user__mahasiswa_profile__program_studi_id=key.split('-', 1)[1])
+    if key.startswith('jurusan-'):
+        jurusan_id = key.split('-', 1)[1]
+        return devices.filter(
+            Q(user__mahasiswa_profile__program_studi__jurusan_id=jurusan_id) |
+            Q(user__dosen_profile__jurusan_id=jurusan_id)
+        )
+    return devices
+
+
+def subscribe_tokens_to_topic(tokens, key, transport=None, unsubscribe=False):
+    """
+    (Un)subscribes tokens to an audience topic in batches of up to
+    FCM_MAX_TOPIC_BATCH_SIZE. Returns the set of tokens that failed.
+    """
+    transport = transport or get_transport()
+    method = transport.unsubscribe if unsubscribe else transport.subscribe
+    failed = set()
+    for batch in _chunked(list(tokens), FCM_MAX_TOPIC_BATCH_SIZE):
+        failed.update(method(batch, topic_name(key)))
+    return failed
+
+
+def _synced_topics(token, wanted, current, failed_subscribe, failed_unsubscribe):
+    """
+    The topics a device is actually subscribed to after a sync: a topic
+    whose subscribe failed is left out and one whose unsubscribe failed is
+    kept, so the device stays out of date and the next sync retries it.
+    """
+    topics = [key for key in wanted if key in current or token not in failed_subscribe.get(key, ())]
+    return topics + [key for key in current if key not in wanted and token in failed_unsubscribe.get(key, ())]
+
+
+def sync_device_topics(device, transport=None):
+    """
+    Brings a device's topic subscriptions in line with its user's role,
+    only calling FCM for topics that actually changed. Only the changes FCM
+    accepted are recorded. Returns True if the subscriptions were updated.
+    """
+    transport = transport or get_transport()
+    if not transport.is_available():
+        return False
+
+    wanted = role_topics_for_user(device.user)
+    current = device.topics or []
+
+    failed_unsubscribe = {
+        key: subscribe_tokens_to_topic([device.fcm_token], key, transport=transport, unsubscribe=True)
+        for key in current if key not in wanted
+    }
+    failed_subscribe = {
+        key: subscribe_tokens_to_topic([device.fcm_token], key, transport=transport)
+        for key in wanted if key not in current
+    }
+
+    topics = _synced_topics(device.fcm_token, wanted, current, failed_subscribe, failed_unsubscribe)
+    if topics != current:
+        device.topics = topics
+        device.save(update_fields=['topics', 'updated_at'])
+        return True
+    return False
+
+
+def sync_user_device_topics(user_id, transport=None):
+    """
+    Re-syncs the topic subscriptions of one user's devices, e.g. after their
+    prodi or jurusan changed. Returns the number of devices updated.
+    """
+    transport = transport or get_transport()
+    if not transport.is_available():
+        return 0
+    devices = FCMDevice.objects.filter(user_id=user_id).select_related(
+        'user__mahasiswa_profile__program_studi', 'user__dosen_profile'
+    )
+    return _sync_device_chunk(list(devices), transport)
+
+
+def unsubscribe_device_topics(token, topics, transport=None):
+    """Unsubscribes a token that is no longer registered (e.g. its device was deleted) from its topics."""
+    transport = transport or get_transport()
+    if not transport.is_available():
         return
+    for key in topics:
+        subscribe_tokens_to_topic([token], key, transport=transport, unsubscribe=True)
+
+
+def send_notification_to_topic(key, title, body, data=None, transport=None):
+    """
+    Sends a single data-only message to an audience topic; FCM performs the
+    fan-out to every subscribed device.
+    """
+    transport = transport or get_transport()
+    if not transport.is_available():
+        print("Firebase app not initialized. Cannot send notification.")
+        return False
 
     message_data = {'title': title, 'body': body}
     if data:
         message_data.update(data)
 
-    success_count = 0
-    failure_count = 0
-    tokens_to_delete = []
+    transport.send_topic(topic_name(key), message_data)
+    print(f"--- Sending Complete (Topic: {topic_name(key)}) ---")
+    return True
 
-    for token in fcm_tokens:
-        message = messaging.Message(data=message_data, token=token)
-        try:
-            messaging.send(message)
-            success_count += 1
-        except messaging.UnregisteredError:
-            tokens_to_delete.append(token)
-            failure_count += 1
-        except Exception as e:
-            print(f"Failed to send to user {user.username} with token {token[:15]}... Error: {e}")
-            failure_count += 1
 
-    if tokens_to_delete:
-        FCMDevice.objects.filter(fcm_token__in=tokens_to_delete).delete()
+def sync_all_device_topics(chunk_size=FCM_MAX_TOPIC_BATCH_SIZE, transport=None):
+    """
+    Backfills topic subscriptions for every registered device. Devices are
+    streamed in chunks and their tokens grouped per topic, so each topic costs
+    one subscribe call per 1000 tokens instead of one call per device.
+    Returns the number of devices whose subscriptions changed.
+    """
+    transport = transport or get_transport()
+    if not transport.is_available():
+        print("Firebase app not initialized. Cannot subscribe devices to topics.")
+        return 0
+
+    devices = FCMDevice.objects.select_related(
+        'user__mahasiswa_profile__program_studi', 'user__dosen_profile'
+    ).order_by('pk')
+
+    changed_total = 0
+    chunk = []
+    for device in devices.iterator(chunk_size=chunk_size):
+        chunk.append(device)
+        if len(chunk) == chunk_size:
+            changed_total += _sync_device_chunk(chunk, transport)
+            chunk = []
+    if chunk:
+        changed_total += _sync_device_chunk(chunk, transport)
+    return changed_total
+
+
+def _sync_device_chunk(devices, transport):
+    to_subscribe, to_unsubscribe, stale = {}, {}, []
+    for device in devices:
+        wanted = role_topics_for_user(device.user)
+        current = device.topics or []
+        if wanted == current:
+            continue
+        for key in current:
+            if key not in wanted:
+                to_unsubscribe.setdefault(key, []).append(device.fcm_token)
+        for key in wanted:
+            if key not in current:
+                to_subscribe.setdefault(key, []).append(device.fcm_token)
+        stale.append((device, wanted, current))
+
+    failed_unsubscribe = {
+        key: subscribe_tokens_to_topic(tokens, key, transport=transport, unsubscribe=True)
+        for key, tokens in to_unsubscribe.items()
+    }
+    failed_subscribe = {
+        key: subscribe_tokens_to_topic(tokens, key, transport=transport)
+        for key, tokens in to_subscribe.items()
+    }
 
-    print(f"--- Sending Complete (User: {user.username}) --- Success: {success_count}, Failure: {failure_count}")
\ No newline at end of file
+    changed = []
+    for device, wanted, current in stale:
+        topics = _synced_topics(device.fcm_token, wanted, current, failed_subscribe, failed_unsubscribe)
+        if topics != current:
+            device.topics = topics
+            changed.append(device)
+    FCMDevice.objects.bulk_update(changed, ['topics'])
+    return len(changed)
@@ -0,0 +1,89 @@
+# core/management/commands/benchmark_export.py
+
+import resource
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+from django.core.management.base import BaseCommand
+from openpyxl import Workbook
+
+from core.exports import iter_csv, iter_ndjson, write_text, write_xlsx
+
+BENCHMARK_HEADERS = ['BAB', 'Nama Dokumen', 'Status', 'Pemilik', 'Program Studi', 'Judul TA', 'Waktu Upload']
+
+
+def synthetic_rows(count):
+    """Yields `count` rows shaped like the document export, without touching the database."""
+    uploaded_at = datetime(2025, 1, 1, 8, 30).strftime("%d %B %Y, %H:%M")
+    for index in range(count):
+        yield [
+            f"BAB {index % 5 + 1}",
+            f"Dokumen Tugas Akhir {index}",
+            "Menunggu Review",
+            f"Mahasiswa Nomor {index}",
+            "Teknik Informatika",
+            f"Sistem Informasi Monitoring Tugas Akhir {index}",
+            uploaded_at,
+        ]
+
+
+def csv_file(rows, headers, title):
+    return write_text(iter_csv(rows, headers))
+
+
+def ndjson_file(rows, headers, title):
+    return write_text(iter_ndjson(rows, headers))
+
+
+def in_memory_xlsx(rows, headers, title):
+    """The previous export strategy: a regular workbook holding every cell in memory."""
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.title = title
+    sheet.append(headers)
+    for row in rows:
+        sheet.append(row)
+    output = tempfile.TemporaryFile()
+    workbook.save(output)
+    return output
+
+
+class Command(BaseCommand):
+    """
+    Measures wall time and peak Python heap (tracemalloc) of the export
+    engines (write-only XLSX, CSV, NDJSON) for increasing row counts. All
+    of them should stay flat as the row count grows; --compare also runs the
+    old in-memory workbook, whose peak grows linearly with the number of cells.
+    """
+    help = "Benchmarks the export engines (time and peak memory per row count)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000, 100000], help="Row counts to export.")
+        parser.add_argument('--compare', action='store_true', help="Also measure the in-memory Workbook for comparison.")
+
+    def handle(self, *args, **options):
+        engines = [('write-only', write_xlsx), ('csv', csv_file), ('ndjson', ndjson_file)]
+        if options['compare']:
+            engines.append(('in-memory', in_memory_xlsx))
+
+        for name, engine in engines:
+            self.stdout.write(f"Engine: {name}")
+            for count in options['rows']:
+                tracemalloc.start()
+                started = time.perf_counter()
+                output = engine(synthetic_rows(count), BENCHMARK_HEADERS, "Benchmark")
+                elapsed = time.perf_counter() - started
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                size = output.seek(0, 2)
+                output.close()
+                self.stdout.write(
+                    f"  {count:>8} rows  {elapsed:>7.2f} s  {count / elapsed:>9.0f} rows/sec  "
+                    f"peak heap {peak / 2 ** 20:>7.1f} MiB  file {size / 2 ** 20:>6.1f} MiB"
+                )
+
+        # ru_maxrss is in KiB on Linux; it is a process-wide high-water mark.
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        self.stdout.write(f"Process peak RSS: {max_rss / 1024:.1f} MiB")
@@ -0,0 +1,21 @@
+# core/management/commands/prune_export_jobs.py
+
+from django.core.management.base import BaseCommand
+
+from core.export_jobs import prune_export_jobs
+
+
+class Command(BaseCommand):
+    """
+    Deletes background export jobs (core.ExportJob) past the retention window,
+    along with the files they uploaded under EXPORT_STORAGE_PREFIX.
+    Meant to run daily (see periodic.sh).
+    """
+    help = "Deletes export jobs and their files older than EXPORT_RETENTION_SECONDS."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--retention-seconds', type=int, default=None, help="Retention (defaults to the setting).")
+
+    def handle(self, *args, **options):
+        deleted = prune_export_jobs(retention_seconds=options['retention_seconds'])
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} export jobs."))
@@ -0,0 +1,23 @@
+# core/management/commands/prune_orphan_blobs.py
+
+from django.core.management.base import BaseCommand
+
+from core.storage import prune_orphan_blobs
+
+
+class Command(BaseCommand):
+    """
+    Deletes content-addressed blobs (core.storage) that no Dokumen or
+    Pengumuman references any more. Blobs are never deleted when a row is,
+    since another upload of the same content may be reusing the key; a
+    blob is only removed once it has been unreferenced and untouched for
+    BLOB_GC_GRACE_SECONDS. Meant to run daily (e.g. from cron).
+    """
+    help = "Deletes unreferenced blobs older than BLOB_GC_GRACE_SECONDS."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--grace-seconds', type=int, default=None, help="Grace period (defaults to the setting).")
+
+    def handle(self, *args, **options):
+        deleted = prune_orphan_blobs(grace_seconds=options['grace_seconds'])
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} orphaned blobs."))
@@ -0,0 +1,21 @@
+# core/management/commands/prune_sync_tombstones.py
+
+from django.core.management.base import BaseCommand
+
+from core.sync import prune_tombstones
+
+
+class Command(BaseCommand):
+    """
+    Deletes sync tombstones (core.DeletionLog) past the retention window.
+    Clients with an older watermark get a full resync instead, so nothing
+    they need is lost. Meant to run daily (e.g. from cron).
+    """
+    help = "Deletes sync tombstones older than SYNC_TOMBSTONE_RETENTION_DAYS."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=None, help="Retention in days (defaults to the setting).")
+
+    def handle(self, *args, **options):
+        deleted = prune_tombstones(days=options['days'])
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} tombstones."))
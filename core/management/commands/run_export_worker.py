@@ -0,0 +1,35 @@
+# core/management/commands/run_export_worker.py
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.export_jobs import run_pending_exports
+
+
+class Command(BaseCommand):
+    """
+    Builds queued ExportJobs (XLSX/CSV) outside the web workers, so large
+    exports are not cut off by gunicorn's request timeout. Finished files
+    are uploaded to S3 and served through a presigned download link.
+    """
+    help = "Builds queued export jobs and uploads the files to storage."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--poll-interval', type=float, default=2.0, help="Seconds to sleep when no job is queued.")
+        parser.add_argument('--once', action='store_true', help="Run the queued jobs once and exit.")
+
+    def handle(self, *args, **options):
+        self.stdout.write("Export worker started.")
+        try:
+            while True:
+                # One job per poll keeps the worker responsive to new, smaller jobs.
+                processed = run_pending_exports(limit=1)
+                if processed:
+                    self.stdout.write("Finished an export job.")
+                elif options['once']:
+                    break
+                else:
+                    time.sleep(options['poll_interval'])
+        except KeyboardInterrupt:
+            self.stdout.write("Export worker stopped.")
@@ -0,0 +1,56 @@
+# core/management/commands/run_notification_worker.py
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.broadcast import run_pending_broadcasts
+from core.outbox import drain_outbox
+
+
+class Command(BaseCommand):
+    """
+    Drains the NotificationOutbox, delivering queued push notifications on a
+    thread pool. Failed deliveries are retried with exponential backoff and
+    marked DEAD after NOTIFICATION_OUTBOX_MAX_ATTEMPTS attempts. Broadcast
+    jobs whose background thread never started or died are picked up as well.
+    """
+    help = "Delivers queued push notifications from the NotificationOutbox."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100, help="Entries claimed per poll.")
+        parser.add_argument('--workers', type=int, default=None, help="Size of the delivery thread pool.")
+        parser.add_argument('--poll-interval', type=float, default=2.0, help="Seconds to sleep when the outbox is empty.")
+        parser.add_argument('--once', action='store_true', help="Drain the outbox once and exit.")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        workers = options['workers']
+        poll_interval = options['poll_interval']
+
+        self.stdout.write(f"Notification worker started (batch size: {batch_size}).")
+        try:
+            while True:
+                broadcasts = run_pending_broadcasts()
+                if broadcasts:
+                    self.stdout.write(f"Ran {broadcasts} pending broadcast jobs.")
+
+                counts = drain_outbox(batch_size=batch_size, max_workers=workers)
+                processed = sum(counts.values())
+
+                if processed:
+                    self.stdout.write(
+                        f"Processed {processed} notifications -- Delivered: {counts['DELIVERED']}, "
+                        f"Retrying: {counts['PENDING']}, Dead: {counts['DEAD']}"
+                    )
+
+                if options['once']:
+                    # Keep going while full batches are being claimed.
+                    if processed < batch_size:
+                        break
+                    continue
+
+                if processed < batch_size:
+                    time.sleep(poll_interval)
+        except KeyboardInterrupt:
+            self.stdout.write("Notification worker stopped.")
@@ -0,0 +1,25 @@
+# core/management/commands/sync_fcm_topics.py
+
+from django.core.management.base import BaseCommand
+
+from core.firebase_utils import FCM_MAX_TOPIC_BATCH_SIZE, sync_all_device_topics
+
+
+class Command(BaseCommand):
+    """
+    Subscribes every registered FCM device to its role topics ('all',
+    'mahasiswa'/'dosen', 'prodi-<id>', 'jurusan-<id>'). Run by entrypoint.sh
+    on every deploy, so devices registered before topic broadcasts are
+    subscribed; only devices whose topics are out of date call FCM.
+    """
+    help = "Backfills FCM topic subscriptions for all registered devices."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size', type=int, default=FCM_MAX_TOPIC_BATCH_SIZE,
+            help="Devices loaded per chunk (FCM accepts up to 1000 tokens per subscribe call)."
+        )
+
+    def handle(self, *args, **options):
+        changed = sync_all_device_topics(chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f"Updated topic subscriptions for {changed} devices."))
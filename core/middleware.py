@@ -1,9 +1,14 @@
 # core/middleware.py
 
+import time
+
 from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth import logout
 
+# Session key holding when an admin session was last saved (see below).
+SESSION_REFRESHED_KEY = '_session_refreshed_at'
+
 class AdminSessionTimeoutMiddleware:
     """
     Middleware to enforce session timeout specifically for admin users.
@@ -14,6 +19,10 @@ class AdminSessionTimeoutMiddleware:
       period of inactivity (defined by settings.SESSION_COOKIE_AGE).
     - If they are a regular authenticated user, it can be configured to give
       them a longer session or a session that lasts until the browser closes.
+
+    Sessions are only written when something changes: an admin session is
+    saved again (renewing its expiry) at most once per
+    SESSION_REFRESH_INTERVAL seconds, instead of on every request.
     """
     def __init__(self, get_response):
         self.get_response = get_response
@@ -26,15 +35,19 @@ class AdminSessionTimeoutMiddleware:
             # Check if the user is an admin (is_staff for admin panel access, is_superuser for all permissions)
             if request.user.is_superuser or request.user.is_staff:
                 # For admins, we enforce the inactivity timeout defined in settings.py
-                # The session expiry is reset on each request because of SESSION_SAVE_EVERY_REQUEST = True
-                # No specific action is needed here, as they will fall under the global
-                # SESSION_COOKIE_AGE setting. We just don't give them an extended session.
-                pass
+                # (SESSION_COOKIE_AGE). Marking the session as modified renews its expiry;
+                # doing so once per interval keeps the timeout accurate to within it.
+                now = int(time.time())
+                refreshed_at = request.session.get(SESSION_REFRESHED_KEY, 0)
+                if now - refreshed_at >= getattr(settings, 'SESSION_REFRESH_INTERVAL', 60):
+                    request.session[SESSION_REFRESHED_KEY] = now
             else:
                 # For regular, non-admin users, we can override the global setting.
                 # Setting expiry to 0 makes the session last until the browser is closed.
                 # Alternatively, you could set a longer duration in seconds, e.g., 86400 for 24 hours.
-                request.session.set_expiry(0)
+                # Only set it once, since set_expiry() marks the session as modified.
+                if request.session.get('_session_expiry') != 0:
+                    request.session.set_expiry(0)
 
         response = self.get_response(request)
 
@@ -0,0 +1,28 @@
+# Generated by Django 5.2 on 2026-10-18 16:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_broadcastjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='broadcastjob',
+            name='mode',
+            field=models.CharField(choices=[('topic', 'Topic message'), ('tokens', 'Token fan-out')], default='topic', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='broadcastjob',
+            name='topic',
+            field=models.CharField(default='all', help_text="Audience key, e.g. 'all', 'dosen', 'prodi-3'.", max_length=100),
+        ),
+        migrations.AddField(
+            model_name='fcmdevice',
+            name='topics',
+            field=models.JSONField(blank=True, default=list, help_text='Audience topics this token is currently subscribed to.'),
+        ),
+    ]
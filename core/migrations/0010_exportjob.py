@@ -0,0 +1,41 @@
+# Generated by Django 5.2 on 2026-10-18 17:40
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_broadcastjob_mode_broadcastjob_topic_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('users', 'Users'), ('documents', 'Documents'), ('tugas_akhir', 'Tugas Akhir')], max_length=20)),
+                ('file_format', models.CharField(choices=[('xlsx', 'Excel (.xlsx)'), ('csv', 'CSV')], default='xlsx', max_length=10)),
+                ('params', models.JSONField(blank=True, default=dict, help_text="Normalized filters, e.g. {'q': 'budi', 'role': 'dosen'}.")),
+                ('params_hash', models.CharField(help_text='SHA-256 of the kind, format and params.', max_length=64)),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('RUNNING', 'Running'), ('DONE', 'Done'), ('FAILED', 'Failed')], db_index=True, default='PENDING', max_length=20)),
+                ('total_rows', models.PositiveIntegerField(default=0)),
+                ('processed_rows', models.PositiveIntegerField(default=0)),
+                ('file_key', models.CharField(blank=True, max_length=255)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='export_jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Export Job',
+                'verbose_name_plural': 'Export Jobs',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['params_hash', '-created_at'], name='exportjob_reuse_idx')],
+            },
+        ),
+    ]
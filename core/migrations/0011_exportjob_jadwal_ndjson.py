@@ -0,0 +1,23 @@
+# Generated by Django 5.2 on 2026-10-18 17:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_exportjob'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='exportjob',
+            name='file_format',
+            field=models.CharField(choices=[('xlsx', 'Excel (.xlsx)'), ('csv', 'CSV'), ('ndjson', 'NDJSON')], default='xlsx', max_length=10),
+        ),
+        migrations.AlterField(
+            model_name='exportjob',
+            name='kind',
+            field=models.CharField(choices=[('users', 'Users'), ('documents', 'Documents'), ('tugas_akhir', 'Tugas Akhir'), ('jadwal_bimbingan', 'Jadwal Bimbingan')], max_length=20),
+        ),
+    ]
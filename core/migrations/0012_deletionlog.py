@@ -0,0 +1,30 @@
+# Generated by Django 5.2 on 2026-10-18 17:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_exportjob_jadwal_ndjson'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DeletionLog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('resource', models.CharField(choices=[('dokumen', 'Dokumen'), ('jadwal_bimbingan', 'Jadwal Bimbingan'), ('request_dosen', 'Request Dosen'), ('pengumuman', 'Pengumuman')], max_length=30)),
+                ('object_id', models.PositiveIntegerField()),
+                ('mahasiswa_id', models.PositiveIntegerField(blank=True, null=True)),
+                ('dosen_id', models.PositiveIntegerField(blank=True, null=True)),
+                ('deleted_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Deletion Log',
+                'verbose_name_plural': 'Deletion Logs',
+                'ordering': ['-deleted_at'],
+                'indexes': [models.Index(fields=['resource', 'deleted_at'], name='deletionlog_sync_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2 on 2026-10-18 18:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_deletionlog'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DashboardStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(unique=True)),
+                ('total_mahasiswa', models.IntegerField(default=0)),
+                ('total_dosen', models.IntegerField(default=0)),
+                ('total_dokumen', models.IntegerField(default=0)),
+                ('active_tugas_akhir', models.IntegerField(default=0)),
+                ('dokumen_pending', models.IntegerField(default=0)),
+                ('dokumen_revisi', models.IntegerField(default=0)),
+                ('dokumen_disetujui', models.IntegerField(default=0)),
+                ('mahasiswa_per_prodi', models.JSONField(blank=True, default=dict, help_text='Number of students per ProgramStudi id.')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('reconciled_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Dashboard Stats',
+                'verbose_name_plural': 'Dashboard Stats',
+                'ordering': ['-date'],
+            },
+        ),
+    ]
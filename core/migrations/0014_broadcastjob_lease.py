@@ -0,0 +1,30 @@
+# Generated by Django 5.2 on 2026-10-18 18:26
+
+from django.db import migrations, models
+
+
+def backfill_heartbeat_at(apps, schema_editor):
+    # Jobs already running have shown no sign of life since they started.
+    BroadcastJob = apps.get_model('core', 'BroadcastJob')
+    BroadcastJob.objects.filter(status='RUNNING').update(heartbeat_at=models.F('started_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_dashboardstats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='broadcastjob',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, help_text='Last sign of life of the runner; stale RUNNING jobs are reclaimed.', null=True),
+        ),
+        migrations.AddField(
+            model_name='broadcastjob',
+            name='resume_after',
+            field=models.PositiveBigIntegerField(default=0, help_text='FCMDevice id up to which every token has been sent; a reclaimed job resumes here.'),
+        ),
+        migrations.RunPython(backfill_heartbeat_at, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2 on 2026-10-18 19:03
+
+from django.db import migrations, models
+
+
+def backfill_heartbeat_at(apps, schema_editor):
+    # Jobs already running have shown no sign of life since they started.
+    ExportJob = apps.get_model('core', 'ExportJob')
+    ExportJob.objects.filter(status='RUNNING').update(heartbeat_at=models.F('started_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_broadcastjob_lease'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='exportjob',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, help_text='Last sign of life of the worker; stale RUNNING jobs are reclaimed.', null=True),
+        ),
+        migrations.RunPython(backfill_heartbeat_at, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2 on 2026-10-18 19:09
+
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def record_referenced_blobs(apps, schema_editor):
+    # Blobs already referenced by a row are recorded as used now.
+    StoredBlob = apps.get_model('core', 'StoredBlob')
+    prefix = getattr(settings, 'BLOB_STORE_PREFIX', 'blobs/')
+    keys = set()
+    for model_label, field_name in [('tugas_akhir.Dokumen', 'file'), ('announcements.Pengumuman', 'lampiran')]:
+        model = apps.get_model(model_label)
+        keys.update(model.objects.filter(**{f'{field_name}__startswith': prefix}).values_list(field_name, flat=True))
+    now = timezone.now()
+    StoredBlob.objects.bulk_create([StoredBlob(key=key, last_used_at=now) for key in sorted(keys)], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_exportjob_heartbeat'),
+        ('tugas_akhir', '0014_uploaded_file_name'),
+        ('announcements', '0010_uploaded_file_name'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoredBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=255, unique=True)),
+                ('last_used_at', models.DateTimeField(db_index=True)),
+            ],
+            options={
+                'verbose_name': 'Stored Blob',
+                'verbose_name_plural': 'Stored Blobs',
+            },
+        ),
+        migrations.RunPython(record_referenced_blobs, migrations.RunPython.noop),
+    ]
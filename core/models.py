@@ -3,6 +3,7 @@ from django.db import models
 from django.conf import settings
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
+from django.utils import timezone
 
 class ActivityLog(models.Model):
     """
@@ -62,6 +63,11 @@ class FCMDevice(models.Model):
         unique=True,
         help_text="Firebase Cloud Messaging device token."
     )
+    topics = models.JSONField(
+        default=list,
+        blank=True,
+        help_text="Audience topics this token is currently subscribed to."
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -72,3 +78,285 @@ class FCMDevice(models.Model):
 
     def __str__(self):
         return f"Device for {self.user.username}"
+
+class NotificationOutbox(models.Model):
+    """
+    A push notification waiting to be delivered by the background worker
+    (`manage.py run_notification_worker`). Rows are written in the same
+    transaction as the change that triggered them, so request latency no
+    longer depends on FCM.
+    """
+    STATUS_CHOICES = [
+        ('PENDING', 'Pending'),
+        ('PROCESSING', 'Processing'),
+        ('DELIVERED', 'Delivered'),
+        ('DEAD', 'Dead'),
+    ]
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='notification_outbox',
+        help_text="The recipient of the notification."
+    )
+    title = models.CharField(max_length=255)
+    body = models.TextField()
+    data = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='PENDING', db_index=True)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now, db_index=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    delivered_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Notification Outbox"
+        verbose_name_plural = "Notification Outbox"
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outbox_status_next_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.title} -> {self.user.username} ({self.status})"
+
+class BroadcastJob(models.Model):
+    """
+    Tracks a push notification sent to an audience (`topic`). In topic mode
+    it is a single FCM topic message; in token mode it is fanned out to every
+    matching device. The job runs in the background; its counters are updated
+    while it runs so the admin UI can poll its progress, and a job whose
+    runner died is reclaimed from `resume_after` (see core.broadcast).
+    """
+    MODE_CHOICES = [
+        ('topic', 'Topic message'),
+        ('tokens', 'Token fan-out'),
+    ]
+    STATUS_CHOICES = [
+        ('PENDING', 'Pending'),
+        ('RUNNING', 'Running'),
+        ('DONE', 'Done'),
+        ('FAILED', 'Failed'),
+    ]
+
+    title = models.CharField(max_length=255)
+    body = models.TextField()
+    data = models.JSONField(default=dict, blank=True)
+    topic = models.CharField(max_length=100, default='all', help_text="Audience key, e.g. 'all', 'dosen', 'prodi-3'.")
+    mode = models.CharField(max_length=10, choices=MODE_CHOICES, default='topic')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='PENDING', db_index=True)
+    total_tokens = models.PositiveIntegerField(default=0)
+    sent_count = models.PositiveIntegerField(default=0)
+    failed_count = models.PositiveIntegerField(default=0)
+    pruned_count = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True, blank=True,
+        related_name='broadcast_jobs'
+    )
+    resume_after = models.PositiveBigIntegerField(
+        default=0, help_text="FCMDevice id up to which every token has been sent; a reclaimed job resumes here."
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(
+        null=True, blank=True, help_text="Last sign of life of the runner; stale RUNNING jobs are reclaimed."
+    )
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Broadcast Job"
+        verbose_name_plural = "Broadcast Jobs"
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"Broadcast '{self.title}' ({self.status})"
+
+    def as_dict(self):
+        return {
+            'id': self.pk,
+            'status': self.status,
+            'topic': self.topic,
+            'mode': self.mode,
+            'total': self.total_tokens,
+            'sent': self.sent_count,
+            'failed': self.failed_count,
+            'pruned': self.pruned_count,
+            'error': self.error,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'heartbeat_at': self.heartbeat_at,
+            'finished_at': self.finished_at,
+        }
+
+class ExportJob(models.Model):
+    """
+    An export (XLSX, CSV or NDJSON) built in the background by `run_export_worker`
+    and stored as an S3 artifact under `file_key`. `processed_rows` is
+    updated while the job runs so the admin UI can poll its progress, and
+    `heartbeat_at` with it, so a job whose worker died is rebuilt by another.
+    Jobs with the same `params_hash` (kind, format and filters) share a
+    recent artifact instead of rebuilding it (see core.export_jobs).
+    """
+    KIND_CHOICES = [
+        ('users', 'Users'),
+        ('documents', 'Documents'),
+        ('tugas_akhir', 'Tugas Akhir'),
+        ('jadwal_bimbingan', 'Jadwal Bimbingan'),
+    ]
+    FORMAT_CHOICES = [
+        ('xlsx', 'Excel (.xlsx)'),
+        ('csv', 'CSV'),
+        ('ndjson', 'NDJSON'),
+    ]
+    STATUS_CHOICES = [
+        ('PENDING', 'Pending'),
+        ('RUNNING', 'Running'),
+        ('DONE', 'Done'),
+        ('FAILED', 'Failed'),
+    ]
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    file_format = models.CharField(max_length=10, choices=FORMAT_CHOICES, default='xlsx')
+    params = models.JSONField(default=dict, blank=True, help_text="Normalized filters, e.g. {'q': 'budi', 'role': 'dosen'}.")
+    params_hash = models.CharField(max_length=64, help_text="SHA-256 of the kind, format and params.")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='PENDING', db_index=True)
+    total_rows = models.PositiveIntegerField(default=0)
+    processed_rows = models.PositiveIntegerField(default=0)
+    file_key = models.CharField(max_length=255, blank=True)
+    error = models.TextField(blank=True)
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True, blank=True,
+        related_name='export_jobs'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(
+        null=True, blank=True, help_text="Last sign of life of the worker; stale RUNNING jobs are reclaimed."
+    )
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Export Job"
+        verbose_name_plural = "Export Jobs"
+        ordering = ['-created_at']
+        indexes = [
+            # Artifact reuse: same parameters, most recent first.
+            models.Index(fields=['params_hash', '-created_at'], name='exportjob_reuse_idx'),
+        ]
+
+    def __str__(self):
+        return f"Export {self.kind}.{self.file_format} ({self.status})"
+
+    def as_dict(self):
+        return {
+            'id': self.pk,
+            'kind': self.kind,
+            'format': self.file_format,
+            'params': self.params,
+            'status': self.status,
+            'total': self.total_rows,
+            'processed': self.processed_rows,
+            'error': self.error,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+        }
+
+
+class DeletionLog(models.Model):
+    """
+    Tombstones for rows the mobile client syncs incrementally (see core.sync),
+    written by the post_delete signals. `mahasiswa_id` and `dosen_id` (user
+    pks) record who could see the row; both are empty for rows visible to
+    everyone, such as announcements.
+    """
+    RESOURCE_CHOICES = [
+        ('dokumen', 'Dokumen'),
+        ('jadwal_bimbingan', 'Jadwal Bimbingan'),
+        ('request_dosen', 'Request Dosen'),
+        ('pengumuman', 'Pengumuman'),
+    ]
+
+    resource = models.CharField(max_length=30, choices=RESOURCE_CHOICES)
+    object_id = models.PositiveIntegerField()
+    mahasiswa_id = models.PositiveIntegerField(null=True, blank=True)
+    dosen_id = models.PositiveIntegerField(null=True, blank=True)
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Deletion Log"
+        verbose_name_plural = "Deletion Logs"
+        ordering = ['-deleted_at']
+        indexes = [
+            # Sync: tombstones of one resource since a watermark.
+            models.Index(fields=['resource', 'deleted_at'], name='deletionlog_sync_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.resource} #{self.object_id} dihapus"
+
+
+class StoredBlob(models.Model):
+    """
+    A content-addressed blob in S3 (see core.storage) and when it was last
+    written or reused. Saving identical content only refreshes `last_used_at`,
+    and `prune_orphan_blobs` deletes blobs that no row references and that
+    have not been used for BLOB_GC_GRACE_SECONDS.
+    """
+    key = models.CharField(max_length=255, unique=True)
+    last_used_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        verbose_name = "Stored Blob"
+        verbose_name_plural = "Stored Blobs"
+
+    def __str__(self):
+        return self.key
+
+
+class DashboardStats(models.Model):
+    """
+    Materialized counters for the admin dashboard (see core.stats), one row
+    per day. Today's row is kept current by signals; earlier rows are the
+    history used for trends. `manage.py reconcile_dashboard_stats`
+    recounts today's row from the source tables.
+    """
+    # Integer counters adjusted with F() expressions.
+    COUNTER_FIELDS = (
+        'total_mahasiswa', 'total_dosen', 'total_dokumen', 'active_tugas_akhir',
+        'dokumen_pending', 'dokumen_revisi', 'dokumen_disetujui',
+    )
+
+    date = models.DateField(unique=True)
+    total_mahasiswa = models.IntegerField(default=0)
+    total_dosen = models.IntegerField(default=0)
+    total_dokumen = models.IntegerField(default=0)
+    active_tugas_akhir = models.IntegerField(default=0)
+    dokumen_pending = models.IntegerField(default=0)
+    dokumen_revisi = models.IntegerField(default=0)
+    dokumen_disetujui = models.IntegerField(default=0)
+    mahasiswa_per_prodi = models.JSONField(
+        default=dict, blank=True, help_text="Number of students per ProgramStudi id."
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+    reconciled_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Dashboard Stats"
+        verbose_name_plural = "Dashboard Stats"
+        ordering = ['-date']
+
+    def __str__(self):
+        return f"Statistik {self.date}"
+
+    def counters(self):
+        """The counter values, e.g. to carry them forward into a new day's row."""
+        data = {name: getattr(self, name) for name in self.COUNTER_FIELDS}
+        data['mahasiswa_per_prodi'] = dict(self.mahasiswa_per_prodi)
+        return data
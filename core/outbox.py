@@ -0,0 +1,157 @@
+# core/outbox.py
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import NotificationOutbox
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def enqueue_notification(user, title, body, data=None):
+    """
+    Queues a push notification for `user` in the NotificationOutbox.
+
+    The row is written inside the caller's transaction, so it is only visible
+    to the worker once the surrounding change has been committed (and is
+    discarded together with it on rollback). No network call is made here.
+    """
+    entry = NotificationOutbox.objects.create(
+        user=user,
+        title=title,
+        body=body,
+        data={key: str(value) for key, value in (data or {}).items()},
+    )
+
+    # Local development without a running worker: deliver right after commit.
+    if _setting('NOTIFICATION_OUTBOX_EAGER', False):
+        transaction.on_commit(lambda: dispatch_entries([entry.pk], max_workers=1))
+
+    return entry
+
+
+def _backoff_delay(attempts):
+    """Exponential backoff: base * 2^(attempts - 1), capped at the configured maximum."""
+    base = _setting('NOTIFICATION_OUTBOX_BACKOFF_BASE', 30)
+    cap = _setting('NOTIFICATION_OUTBOX_BACKOFF_MAX', 3600)
+    return timedelta(seconds=min(base * (2 ** max(attempts - 1, 0)), cap))
+
+
+def claim_pending(batch_size):
+    """
+    Atomically claims up to `batch_size` due entries by moving them to
+    PROCESSING. Entries stuck in PROCESSING longer than the lease (e.g. a
+    crashed worker) are claimed again; the lost run counts as an attempt,
+    so an entry that crashes the worker every time still ends as DEAD.
+    Returns the claimed primary keys.
+    """
+    now = timezone.now()
+    lease_expired = now - timedelta(seconds=_setting('NOTIFICATION_OUTBOX_LEASE', 300))
+    max_attempts = _setting('NOTIFICATION_OUTBOX_MAX_ATTEMPTS', 5)
+
+    with transaction.atomic():
+        due = NotificationOutbox.objects.filter(
+            Q(status='PENDING', next_attempt_at__lte=now) |
+            Q(status='PROCESSING', updated_at__lt=lease_expired)
+        )
+        rows = list(
+            due.order_by('next_attempt_at')
+            .select_for_update(skip_locked=True)
+            .values_list('pk', 'status', 'attempts')[:batch_size]
+        )
+        ids = [pk for pk, status, attempts in rows if status == 'PENDING' or attempts + 1 < max_attempts]
+        dead = [pk for pk, _, _ in rows if pk not in ids]
+        reclaimed = [pk for pk, status, _ in rows if status == 'PROCESSING']
+
+        if reclaimed:
+            NotificationOutbox.objects.filter(pk__in=reclaimed).update(
+                attempts=F('attempts') + 1, last_error="Worker lease expired before delivery finished."
+            )
+        if dead:
+            NotificationOutbox.objects.filter(pk__in=dead).update(status='DEAD', updated_at=now)
+        if ids:
+            NotificationOutbox.objects.filter(pk__in=ids).update(status='PROCESSING', updated_at=now)
+    return ids
+
+
+def _deliver_entry(entry_id):
+    """
+    Delivers a single outbox entry and records the outcome:
+    DELIVERED on success, PENDING (with backoff) on a retryable failure,
+    DEAD once the maximum number of attempts is reached.
+    """
+    from .firebase_utils import get_transport, send_notification_to_user
+
+    entry = NotificationOutbox.objects.select_related('user').get(pk=entry_id)
+    try:
+        if not get_transport().is_available():
+            raise RuntimeError("Firebase app not initialized.")
+
+        report = send_notification_to_user(entry.user, entry.title, entry.body, data=entry.data)
+
+        # Retry only when every token failed for a reason other than being unregistered.
+        retryable_failures = report.failure_count - len(report.pruned_tokens)
+        if report.total and not report.success_count and retryable_failures:
+            errors = {result.error for result in report.results if not result.success}
+            raise RuntimeError("; ".join(sorted(errors)))
+    except Exception as e:
+        entry.attempts += 1
+        entry.last_error = str(e)
+        if entry.attempts >= _setting('NOTIFICATION_OUTBOX_MAX_ATTEMPTS', 5):
+            entry.status = 'DEAD'
+        else:
+            entry.status = 'PENDING'
+            entry.next_attempt_at = timezone.now() + _backoff_delay(entry.attempts)
+        entry.save(update_fields=['attempts', 'last_error', 'status', 'next_attempt_at', 'updated_at'])
+        return entry.status
+
+    entry.attempts += 1
+    entry.status = 'DELIVERED'
+    entry.delivered_at = timezone.now()
+    entry.last_error = ''
+    entry.save(update_fields=['attempts', 'status', 'delivered_at', 'last_error', 'updated_at'])
+    return entry.status
+
+
+def _deliver_entry_in_thread(entry_id):
+    """Pool wrapper: each worker thread owns its DB connection and closes it afterwards."""
+    try:
+        return _deliver_entry(entry_id)
+    finally:
+        connection.close()
+
+
+def dispatch_entries(entry_ids, max_workers=None):
+    """
+    Delivers the given outbox entries concurrently on a thread pool.
+    Returns a dict counting the resulting statuses.
+    """
+    max_workers = max_workers or _setting('NOTIFICATION_OUTBOX_WORKERS', 8)
+    counts = {'DELIVERED': 0, 'PENDING': 0, 'DEAD': 0}
+    if not entry_ids:
+        return counts
+
+    if max_workers == 1:
+        # Run inline and keep using the caller's DB connection.
+        outcomes = [_deliver_entry(entry_id) for entry_id in entry_ids]
+    else:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            outcomes = list(executor.map(_deliver_entry_in_thread, entry_ids))
+
+    for outcome in outcomes:
+        counts[outcome] = counts.get(outcome, 0) + 1
+    return counts
+
+
+def drain_outbox(batch_size=100, max_workers=None):
+    """
+    Claims one batch of due entries and delivers it. Returns the status counts.
+    """
+    return dispatch_entries(claim_pending(batch_size), max_workers=max_workers)
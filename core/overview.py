@@ -0,0 +1,84 @@
+# core/overview.py
+
+from django.utils import timezone
+
+from announcements.api_views import PENGUMUMAN_LIST_FIELDS, active_announcements, add_lampiran_urls
+from tugas_akhir.checklist import get_status_checklist
+from tugas_akhir.models import JadwalBimbingan, RequestDosen, TugasAkhir
+from tugas_akhir.serializers import JadwalBimbinganListSerializer, RequestDosenListSerializer
+from users.profiles import get_request_profile
+from users.serializers import DosenProfileSerializer, MahasiswaProfileSerializer
+
+# Items per list in the overview; the full lists stay on their own endpoints.
+OVERVIEW_ITEM_LIMIT = 5
+
+JADWAL_RELATED = ('mahasiswa__user', 'mahasiswa__program_studi', 'dosen_pembimbing__user', 'lokasi_ruangan')
+REQUEST_RELATED = ('mahasiswa__user', 'mahasiswa__program_studi', 'dosen__user')
+
+
+def build_overview(request):
+    """
+    Everything the mobile home screen shows, for the requesting Mahasiswa or
+    Dosen, in a fixed number of queries: the profile (with prodi, supervisor
+    and tugas akhir) in one, then one per list (the chapter checklist is
+    cached, see tugas_akhir.checklist). No list is serialized with a query
+    per row.
+    """
+    profile = get_request_profile(request)
+    context = {'request': request}
+    if profile.is_mahasiswa:
+        payload = _mahasiswa_overview(profile.mahasiswa, context)
+    else:
+        payload = _dosen_overview(profile.dosen, context)
+    payload['announcements'] = add_lampiran_urls(request, list(
+        active_announcements().values(*PENGUMUMAN_LIST_FIELDS).order_by('-tanggal_mulai', '-id')[:OVERVIEW_ITEM_LIMIT]
+    ))
+    return payload
+
+
+def _upcoming_jadwal(**filters):
+    return (
+        JadwalBimbingan.objects
+        .filter(status__in=['PENDING', 'ACCEPTED'], tanggal__gte=timezone.localdate(), **filters)
+        .select_related(*JADWAL_RELATED)
+        .order_by('tanggal', 'waktu')[:OVERVIEW_ITEM_LIMIT]
+    )
+
+
+def _mahasiswa_overview(mahasiswa, context):
+    # Loaded with the profile (users.profiles.PROFILE_RELATED), so no query.
+    tugas_akhir = getattr(mahasiswa, 'tugas_akhir', None)
+    requests = RequestDosen.objects.filter(mahasiswa_id=mahasiswa.pk).select_related(*REQUEST_RELATED)
+    return {
+        'role': 'mahasiswa',
+        'profile': MahasiswaProfileSerializer(mahasiswa, context=context).data,
+        'tugas_akhir': {
+            'id': tugas_akhir.pk,
+            'judul': tugas_akhir.judul,
+            'deskripsi': tugas_akhir.deskripsi,
+            'dosen_pembimbing': str(tugas_akhir.dosen_pembimbing) if tugas_akhir.dosen_pembimbing else None,
+        } if tugas_akhir else None,
+        'status_checklist': get_status_checklist(mahasiswa.pk, context),
+        'jadwal_bimbingan': JadwalBimbinganListSerializer(
+            _upcoming_jadwal(mahasiswa_id=mahasiswa.pk), many=True, context=context
+        ).data,
+        'supervision_requests': RequestDosenListSerializer(
+            requests[:OVERVIEW_ITEM_LIMIT], many=True, context=context
+        ).data,
+    }
+
+
+def _dosen_overview(dosen, context):
+    requests = (
+        RequestDosen.objects.filter(dosen_id=dosen.pk, status='PENDING')
+        .select_related(*REQUEST_RELATED)[:OVERVIEW_ITEM_LIMIT]
+    )
+    return {
+        'role': 'dosen',
+        'profile': DosenProfileSerializer(dosen, context=context).data,
+        'supervised_students_count': TugasAkhir.objects.filter(dosen_pembimbing_id=dosen.pk).count(),
+        'jadwal_bimbingan': JadwalBimbinganListSerializer(
+            _upcoming_jadwal(dosen_pembimbing_id=dosen.pk), many=True, context=context
+        ).data,
+        'supervision_requests': RequestDosenListSerializer(requests, many=True, context=context).data,
+    }
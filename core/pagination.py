@@ -0,0 +1,27 @@
+# core/pagination.py
+
+from django.conf import settings
+from rest_framework.pagination import CursorPagination
+
+
+class StableCursorPagination(CursorPagination):
+    """
+    Cursor (keyset) pagination used by every DRF list endpoint.
+
+    Pages are fetched with `WHERE <key> < <cursor> ORDER BY ... LIMIT n`
+    instead of OFFSET, so page cost stays flat as tables grow and rows
+    inserted between requests never shift or duplicate items.
+
+    Views declare their ordering keys with `cursor_ordering`; the first key
+    positions the cursor and the remaining keys make the order total, e.g.
+    ('-tanggal', '-waktu', '-id'). Keys must be model fields or annotations
+    (no `__` lookups). Small lookup tables opt out with `pagination_class = None`.
+    """
+    page_size = getattr(settings, 'API_PAGE_SIZE', 50)
+    page_size_query_param = 'page_size'
+    max_page_size = getattr(settings, 'API_MAX_PAGE_SIZE', 200)
+    ordering = ('-id',)
+
+    def get_ordering(self, request, queryset, view):
+        ordering = getattr(view, 'cursor_ordering', None) or self.ordering
+        return (ordering,) if isinstance(ordering, str) else tuple(ordering)
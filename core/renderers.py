@@ -0,0 +1,28 @@
+# core/renderers.py
+
+try:
+    import orjson
+except ImportError:  # Optional dependency; FastJSONRenderer falls back to DRF's encoder
+    orjson = None
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSON renderer backed by orjson, which encodes large lists several times
+    faster than the stdlib encoder. Dates, datetimes, Decimals and lazy
+    strings are still handed to DRF's encoder, so the output matches
+    JSONRenderer. Without orjson installed it is a plain JSONRenderer.
+    """
+    _encoder = JSONEncoder()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        return orjson.dumps(
+            data,
+            default=self._encoder.default,
+            option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS,
+        )
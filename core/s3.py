@@ -0,0 +1,190 @@
+# core/s3.py
+
+import base64
+import threading
+import time
+from collections import OrderedDict
+
+import boto3
+from django.conf import settings
+
+
+# --- Shared S3 Client ---
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_s3_client():
+    """
+    Returns a process-wide boto3 S3 client, created on first use.
+
+    Building a client loads the botocore session and resolves credentials,
+    which costs tens of milliseconds; boto3 clients are thread-safe, so one
+    instance is shared by every request thread.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = boto3.client('s3', region_name=settings.AWS_S3_REGION_NAME)
+    return _client
+
+
+def reset_s3_client():
+    """Drops the shared client (and cached URLs), e.g. after rotating credentials or in tests."""
+    global _client
+    with _client_lock:
+        _client = None
+    presigned_url_cache.clear()
+
+
+# --- Presigned URL Cache ---
+
+class PresignedUrlCache:
+    """
+    Thread-safe TTL cache of presigned GET URLs keyed by (object key, disposition).
+
+    A URL is reused until `refresh_margin` seconds before it expires, so a
+    client never receives a link that is about to stop working. Hits and
+    misses are counted per use site (e.g. 'api.access_file').
+    """
+
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def _record(self, site, outcome):
+        counts = self._stats.setdefault(site, {'hits': 0, 'misses': 0})
+        counts[outcome] += 1
+
+    def get(self, key, site='default'):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[1] > now:
+                self._entries.move_to_end(key)
+                self._record(site, 'hits')
+                return entry[0]
+            if entry:
+                del self._entries[key]
+            self._record(site, 'misses')
+            return None
+
+    def set(self, key, url, ttl):
+        with self._lock:
+            self._entries[key] = (url, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, object_key):
+        """Drops every cached URL for an object key (all dispositions)."""
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == object_key]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._stats.clear()
+
+    def stats(self, site=None):
+        """Returns {'hits', 'misses'} for one site, or a dict of all sites."""
+        with self._lock:
+            if site is not None:
+                return dict(self._stats.get(site, {'hits': 0, 'misses': 0}))
+            return {name: dict(counts) for name, counts in self._stats.items()}
+
+
+presigned_url_cache = PresignedUrlCache(
+    max_entries=getattr(settings, 'S3_PRESIGNED_URL_CACHE_SIZE', 10000)
+)
+
+
+def attachment_disposition(file_name):
+    """
+    Content-Disposition that forces a download under `file_name`. Pass the
+    name recorded on the row (e.g. Dokumen.file_name): blob keys only hold
+    the content hash.
+    """
+    file_name = file_name.split('/')[-1]
+    return f'attachment; filename="{file_name}"'
+
+
+def get_presigned_url(object_key, disposition='', site='default', expires_in=None):
+    """
+    Returns a presigned GET URL for `object_key`, served from the cache while
+    it is still fresh. `disposition` overrides the response Content-Disposition
+    (empty for inline viewing). Raises botocore's ClientError on signing failures.
+    """
+    expires_in = expires_in or getattr(settings, 'S3_PRESIGNED_URL_EXPIRY', 900)
+    cache_key = (object_key, disposition)
+
+    url = presigned_url_cache.get(cache_key, site=site)
+    if url:
+        return url
+
+    params = {
+        'Bucket': settings.AWS_STORAGE_BUCKET_NAME,
+        'Key': object_key,
+    }
+    if disposition:
+        params['ResponseContentDisposition'] = disposition
+
+    url = get_s3_client().generate_presigned_url('get_object', Params=params, ExpiresIn=expires_in)
+
+    ttl = expires_in - getattr(settings, 'S3_PRESIGNED_URL_REFRESH_MARGIN', 120)
+    if ttl > 0:
+        presigned_url_cache.set(cache_key, url, ttl)
+    return url
+
+
+# --- Direct Uploads ---
+
+def generate_presigned_post(object_key, content_type, max_size, checksum_sha256=None, expires_in=None):
+    """
+    Returns a presigned POST ({'url', 'fields'}) that lets a client upload one
+    object straight to S3. S3 itself enforces the key, content type, size
+    range and, when given, the SHA-256 checksum (hex digest) of the upload.
+    """
+    fields = {'Content-Type': content_type}
+    conditions = [
+        {'Content-Type': content_type},
+        ['content-length-range', 1, max_size],
+    ]
+    if checksum_sha256:
+        checksum = base64.b64encode(bytes.fromhex(checksum_sha256)).decode()
+        fields.update({'x-amz-checksum-algorithm': 'SHA256', 'x-amz-checksum-sha256': checksum})
+        conditions += [{'x-amz-checksum-algorithm': 'SHA256'}, {'x-amz-checksum-sha256': checksum}]
+
+    return get_s3_client().generate_presigned_post(
+        Bucket=settings.AWS_STORAGE_BUCKET_NAME,
+        Key=object_key,
+        Fields=fields,
+        Conditions=conditions,
+        ExpiresIn=expires_in or getattr(settings, 'S3_PRESIGNED_POST_EXPIRY', 600),
+    )
+
+
+def head_object(object_key):
+    """
+    Returns the object's metadata (HEAD), including its stored checksums.
+    Raises botocore's ClientError if the object does not exist.
+    """
+    return get_s3_client().head_object(
+        Bucket=settings.AWS_STORAGE_BUCKET_NAME,
+        Key=object_key,
+        ChecksumMode='ENABLED',
+    )
+
+
+def checksum_sha256_hex(metadata):
+    """Converts the base64 'ChecksumSHA256' of a HEAD response to a hex digest, or ''."""
+    checksum = metadata.get('ChecksumSHA256', '')
+    # Multipart objects report "<checksum>-<parts>", which is not a whole-file digest.
+    if not checksum or '-' in checksum:
+        return ''
+    return base64.b64decode(checksum).hex()
@@ -1,12 +1,20 @@
 # core/signals.py
 
-from django.db.models.signals import post_save, post_delete
+from django.db.models.signals import post_init, post_save, post_delete, pre_save
 from django.dispatch import receiver
 from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils import timezone
 
-from .models import ActivityLog
-from tugas_akhir.models import Dokumen, TugasAkhir
+from .firebase_utils import sync_user_device_topics, unsubscribe_device_topics
+from .models import ActivityLog, DeletionLog, FCMDevice
+from .stats import DOKUMEN_STATUS_FIELDS, adjust_stats
+from .storage import uploaded_file_name
+from tugas_akhir.models import Dokumen, JadwalBimbingan, RequestDosen, TugasAkhir
 from announcements.models import Pengumuman
+from tugas_akhir.checklist import forget_status_checklist
+from users.backends import forget_unknown_identifier
+from users.models import Dosen, Mahasiswa
 from crum import get_current_user
 
 User = get_user_model()
@@ -51,6 +59,240 @@ def log_user_deletion(sender, instance, **kwargs):
     )
 
 
+# --- LOGIN NEGATIVE CACHE ---
+
+@receiver(post_save, sender=Mahasiswa)
+@receiver(post_save, sender=Dosen)
+def forget_unknown_login_identifier(sender, instance, **kwargs):
+    """A newly registered NIM/NIK can log in right away, even after a failed attempt."""
+    role, identifier = ('mahasiswa', instance.nim) if sender is Mahasiswa else ('dosen', instance.nik)
+    forget_unknown_identifier(role, identifier)
+
+
+# --- FCM TOPICS ---
+# Devices are subscribed to topics for their role, prodi and jurusan (see
+# core.firebase_utils), so the subscriptions follow profile changes and are
+# dropped with the device. FCM is called after the commit, and a failure is
+# logged without undoing the change; `manage.py sync_fcm_topics` repairs it.
+
+@receiver(post_delete, sender=FCMDevice)
+def unsubscribe_deleted_device(sender, instance, **kwargs):
+    if instance.topics:
+        transaction.on_commit(
+            lambda: unsubscribe_device_topics(instance.fcm_token, instance.topics), robust=True
+        )
+
+
+@receiver(post_init, sender=Mahasiswa)
+@receiver(post_init, sender=Dosen)
+def remember_topic_scope(sender, instance, **kwargs):
+    instance._topic_scope = instance.__dict__.get('program_studi_id' if sender is Mahasiswa else 'jurusan_id')
+
+
+@receiver(post_save, sender=Mahasiswa)
+@receiver(post_save, sender=Dosen)
+def resync_topics_for_profile(sender, instance, created, **kwargs):
+    scope = instance.program_studi_id if sender is Mahasiswa else instance.jurusan_id
+    if created or scope != instance._topic_scope:
+        user_id = instance.user_id
+        transaction.on_commit(lambda: sync_user_device_topics(user_id), robust=True)
+    instance._topic_scope = scope
+
+
+# --- STATUS CHECKLIST CACHE ---
+# The cached checklist (tugas_akhir.checklist) embeds the student's documents
+# and their owner info (name, NIM, prodi). Mahasiswa and User share a pk.
+
+@receiver(post_save, sender=Dokumen)
+@receiver(post_delete, sender=Dokumen)
+def forget_checklist_for_dokumen(sender, instance, **kwargs):
+    forget_status_checklist(instance.pemilik_id)
+
+
+@receiver(post_save, sender=Mahasiswa)
+@receiver(post_save, sender=User)
+def forget_checklist_for_owner(sender, instance, **kwargs):
+    forget_status_checklist(instance.pk)
+
+
+# --- DASHBOARD STATS ---
+# Keep today's DashboardStats row current (see core.stats). The prodi of a
+# Mahasiswa and the status of a Dokumen are remembered when the instance is
+# loaded, so a change can move the count without querying the old value.
+
+@receiver(post_init, sender=Mahasiswa)
+def remember_mahasiswa_prodi(sender, instance, **kwargs):
+    instance._stats_prodi_id = instance.__dict__.get('program_studi_id')
+
+
+@receiver(post_init, sender=Dokumen)
+def remember_dokumen_status(sender, instance, **kwargs):
+    instance._stats_status = instance.__dict__.get('status')
+
+
+@receiver(post_save, sender=Mahasiswa)
+def count_mahasiswa(sender, instance, created, **kwargs):
+    previous = instance._stats_prodi_id
+    if created:
+        adjust_stats(total_mahasiswa=1, prodi_deltas={instance.program_studi_id: 1})
+    elif previous is not None and previous != instance.program_studi_id:
+        adjust_stats(prodi_deltas={previous: -1, instance.program_studi_id: 1})
+    instance._stats_prodi_id = instance.program_studi_id
+
+
+@receiver(post_delete, sender=Mahasiswa)
+def uncount_mahasiswa(sender, instance, **kwargs):
+    adjust_stats(total_mahasiswa=-1, prodi_deltas={instance.program_studi_id: -1})
+
+
+@receiver(post_save, sender=Dokumen)
+def count_dokumen(sender, instance, created, **kwargs):
+    previous = instance._stats_status
+    if created:
+        adjust_stats(total_dokumen=1, **{DOKUMEN_STATUS_FIELDS[instance.status]: 1})
+    elif previous is not None and previous != instance.status:
+        adjust_stats(**{DOKUMEN_STATUS_FIELDS[previous]: -1, DOKUMEN_STATUS_FIELDS[instance.status]: 1})
+    instance._stats_status = instance.status
+
+
+@receiver(post_delete, sender=Dokumen)
+def uncount_dokumen(sender, instance, **kwargs):
+    adjust_stats(total_dokumen=-1, **{DOKUMEN_STATUS_FIELDS[instance.status]: -1})
+
+
+@receiver(post_save, sender=Dosen)
+@receiver(post_save, sender=TugasAkhir)
+def count_created(sender, instance, created, **kwargs):
+    if created:
+        adjust_stats(**{'total_dosen' if sender is Dosen else 'active_tugas_akhir': 1})
+
+
+@receiver(post_delete, sender=Dosen)
+@receiver(post_delete, sender=TugasAkhir)
+def uncount_deleted(sender, instance, **kwargs):
+    adjust_stats(**{'total_dosen' if sender is Dosen else 'active_tugas_akhir': -1})
+
+
+# --- SYNC TOMBSTONES ---
+# Deletions are recorded so the mobile delta sync (core.sync) can tell
+# clients which rows to drop.
+
+@receiver(post_delete, sender=Dokumen)
+def record_dokumen_tombstone(sender, instance, **kwargs):
+    # Dosen see the documents of the students they supervise.
+    dosen_id = TugasAkhir.objects.filter(pk=instance.tugas_akhir_id).values_list('dosen_pembimbing_id', flat=True).first()
+    DeletionLog.objects.create(
+        resource='dokumen', object_id=instance.pk, mahasiswa_id=instance.pemilik_id, dosen_id=dosen_id
+    )
+
+
+@receiver(post_delete, sender=JadwalBimbingan)
+def record_jadwal_tombstone(sender, instance, **kwargs):
+    DeletionLog.objects.create(
+        resource='jadwal_bimbingan', object_id=instance.pk,
+        mahasiswa_id=instance.mahasiswa_id, dosen_id=instance.dosen_pembimbing_id,
+    )
+
+
+@receiver(post_delete, sender=RequestDosen)
+def record_request_dosen_tombstone(sender, instance, **kwargs):
+    DeletionLog.objects.create(
+        resource='request_dosen', object_id=instance.pk,
+        mahasiswa_id=instance.mahasiswa_id, dosen_id=instance.dosen_id,
+    )
+
+
+@receiver(post_delete, sender=Pengumuman)
+def record_pengumuman_tombstone(sender, instance, **kwargs):
+    DeletionLog.objects.create(resource='pengumuman', object_id=instance.pk)
+
+
+# Reassigning a row to another student or supervisor removes it from the old
+# party's view without deleting it, so the old party gets a tombstone of its
+# own (the other id left empty). The parties are remembered when the instance
+# is loaded, as for the dashboard stats above; Dosen see documents through
+# the thesis they supervise, so a document's thesis stands in for its Dosen.
+SYNC_PARTIES = {
+    Dokumen: ('dokumen', 'pemilik_id', 'tugas_akhir_id'),
+    JadwalBimbingan: ('jadwal_bimbingan', 'mahasiswa_id', 'dosen_pembimbing_id'),
+    RequestDosen: ('request_dosen', 'mahasiswa_id', 'dosen_id'),
+}
+
+
+@receiver(post_init, sender=Dokumen)
+@receiver(post_init, sender=JadwalBimbingan)
+@receiver(post_init, sender=RequestDosen)
+def remember_sync_parties(sender, instance, **kwargs):
+    _, *fields = SYNC_PARTIES[sender]
+    # Deferred fields are left out, so a partially loaded row is never compared.
+    instance._sync_parties = {name: instance.__dict__[name] for name in fields if name in instance.__dict__}
+
+
+@receiver(post_save, sender=Dokumen)
+@receiver(post_save, sender=JadwalBimbingan)
+@receiver(post_save, sender=RequestDosen)
+def record_reassignment_tombstone(sender, instance, created, **kwargs):
+    resource, mahasiswa_field, dosen_field = SYNC_PARTIES[sender]
+    previous = instance._sync_parties
+    remember_sync_parties(sender, instance)
+    if created:
+        return
+    old_mahasiswa, old_dosen = previous.get(mahasiswa_field), previous.get(dosen_field)
+    new_mahasiswa, new_dosen = getattr(instance, mahasiswa_field), getattr(instance, dosen_field)
+    if sender is Dokumen and old_dosen not in (None, new_dosen):
+        supervisors = dict(
+            TugasAkhir.objects.filter(pk__in=[old_dosen, new_dosen]).values_list('pk', 'dosen_pembimbing_id')
+        )
+        old_dosen, new_dosen = supervisors.get(old_dosen), supervisors.get(new_dosen)
+    mahasiswa_id = old_mahasiswa if old_mahasiswa not in (None, new_mahasiswa) else None
+    dosen_id = old_dosen if old_dosen not in (None, new_dosen) else None
+    if mahasiswa_id or dosen_id:
+        DeletionLog.objects.create(
+            resource=resource, object_id=instance.pk, mahasiswa_id=mahasiswa_id, dosen_id=dosen_id
+        )
+
+
+@receiver(post_init, sender=TugasAkhir)
+def remember_supervisor(sender, instance, **kwargs):
+    # Left unset when the field is deferred, so a partial load is never compared.
+    if 'dosen_pembimbing_id' in instance.__dict__:
+        instance._sync_dosen_id = instance.dosen_pembimbing_id
+
+
+@receiver(post_save, sender=TugasAkhir)
+def move_documents_to_new_supervisor(sender, instance, created, **kwargs):
+    """
+    The thesis's documents leave the old supervisor's view and enter the new
+    one's: the old supervisor gets tombstones, and the documents are touched
+    so the next delta sync sends them to the new one.
+    """
+    previous = getattr(instance, '_sync_dosen_id', instance.dosen_pembimbing_id)
+    instance._sync_dosen_id = instance.dosen_pembimbing_id
+    if created or previous == instance.dosen_pembimbing_id:
+        return
+    documents = Dokumen.objects.filter(tugas_akhir=instance)
+    if previous is not None:
+        DeletionLog.objects.bulk_create(
+            DeletionLog(resource='dokumen', object_id=pk, dosen_id=previous)
+            for pk in documents.values_list('pk', flat=True)
+        )
+    documents.update(updated_at=timezone.now())
+
+
+# --- UPLOADED FILE NAMES ---
+# Blob keys (core.storage) only hold the content hash, so the uploaded file's
+# name is kept on the row for downloads, templates and activity logs.
+
+@receiver(pre_save, sender=Dokumen)
+def remember_dokumen_file_name(sender, instance, **kwargs):
+    instance.file_name = uploaded_file_name(instance.file, instance.file_name)
+
+
+@receiver(pre_save, sender=Pengumuman)
+def remember_lampiran_name(sender, instance, **kwargs):
+    instance.lampiran_name = uploaded_file_name(instance.lampiran, instance.lampiran_name)
+
+
 # --- OTHER SIGNALS ---
 
 @receiver(post_save, sender=Dokumen)
@@ -76,7 +318,8 @@ def log_dokumen_deletion(sender, instance, **kwargs):
 
 @receiver(post_delete, sender=Pengumuman)
 def log_pengumuman_deletion(sender, instance, **kwargs):
-    # The file deletion logic for orphaned files
+    # The file deletion logic for orphaned files. Blobs are shared by content,
+    # so the blob store leaves them to prune_orphan_blobs.
     if instance.lampiran:
         instance.lampiran.delete(save=False)
 
@@ -0,0 +1,132 @@
+# core/stats.py
+
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, F
+from django.utils import timezone
+
+from tugas_akhir.models import Dokumen, TugasAkhir
+from users.models import Dosen, Mahasiswa
+from .models import DashboardStats
+
+# Dokumen.status -> DashboardStats counter
+DOKUMEN_STATUS_FIELDS = {
+    'Pending': 'dokumen_pending',
+    'Revisi': 'dokumen_revisi',
+    'Disetujui': 'dokumen_disetujui',
+}
+
+
+def count_stats():
+    """The true counter values, counted from the source tables."""
+    counters = {
+        'total_mahasiswa': Mahasiswa.objects.count(),
+        'total_dosen': Dosen.objects.count(),
+        'active_tugas_akhir': TugasAkhir.objects.count(),
+        'mahasiswa_per_prodi': {
+            str(row['program_studi_id']): row['total']
+            for row in Mahasiswa.objects.values('program_studi_id').annotate(total=Count('pk')).order_by()
+        },
+    }
+    by_status = dict(Dokumen.objects.values_list('status').annotate(total=Count('pk')).order_by())
+    counters['total_dokumen'] = sum(by_status.values())
+    for status, field in DOKUMEN_STATUS_FIELDS.items():
+        counters[field] = by_status.get(status, 0)
+    return counters
+
+
+def reconcile_stats():
+    """
+    Recounts today's row from the source tables, correcting any drift (e.g.
+    from bulk operations that bypass signals). Returns (stats, drift), where
+    drift maps each corrected counter to (stored, actual).
+    """
+    counters = count_stats()
+    with transaction.atomic():
+        stats = DashboardStats.objects.select_for_update().filter(date=timezone.localdate()).first()
+        drift = {}
+        if stats is not None:
+            drift = {
+                name: (stored, counters[name])
+                for name, stored in stats.counters().items() if stored != counters[name]
+            }
+        stats, _ = DashboardStats.objects.update_or_create(
+            date=timezone.localdate(), defaults={**counters, 'reconciled_at': timezone.now()}
+        )
+    return stats, drift
+
+
+def _ensure_today(today):
+    """
+    Creates today's row if needed, carrying the latest row's counters
+    forward. Returns False if there is no row at all yet: the first count
+    is made by `reconcile_stats` (the reconcile command, or the dashboard's
+    first read), and it includes every change committed before it.
+    """
+    latest = DashboardStats.objects.order_by('-date').first()
+    if latest is None:
+        return False
+    if latest.date != today:
+        DashboardStats.objects.get_or_create(date=today, defaults=latest.counters())
+    return True
+
+
+def adjust_stats(prodi_deltas=None, **deltas):
+    """
+    Adds `deltas` (counter name -> change) and `prodi_deltas` (ProgramStudi
+    id -> change) to today's row once the caller's transaction commits. The
+    row is then locked only for that short update, so concurrent writers do
+    not queue on it for the length of their transactions, and a rolled-back
+    change is never counted.
+    """
+    deltas = {name: delta for name, delta in deltas.items() if delta}
+    prodi_deltas = {key: delta for key, delta in (prodi_deltas or {}).items() if key is not None and delta}
+    if deltas or prodi_deltas:
+        transaction.on_commit(lambda: _apply_stats(deltas, prodi_deltas), robust=True)
+
+
+def _apply_stats(deltas, prodi_deltas):
+    """
+    Applies the counter deltas with a single UPDATE ... SET counter = counter
+    + delta, and the per-prodi counts under a row lock.
+    """
+    today = timezone.localdate()
+    updates = {name: F(name) + delta for name, delta in deltas.items()}
+    if not DashboardStats.objects.filter(date=today).update(updated_at=timezone.now(), **updates):
+        if not _ensure_today(today):
+            return
+        DashboardStats.objects.filter(date=today).update(updated_at=timezone.now(), **updates)
+
+    if prodi_deltas:
+        with transaction.atomic():
+            stats = DashboardStats.objects.select_for_update().get(date=today)
+            for prodi_id, delta in prodi_deltas.items():
+                key = str(prodi_id)
+                total = stats.mahasiswa_per_prodi.get(key, 0) + delta
+                # Empty prodi are dropped, as in count_stats().
+                if total:
+                    stats.mahasiswa_per_prodi[key] = total
+                else:
+                    stats.mahasiswa_per_prodi.pop(key, None)
+            stats.save(update_fields=['mahasiswa_per_prodi', 'updated_at'])
+
+
+def get_dashboard_stats():
+    """
+    The current counters in one query: today's row, or the latest one if
+    nothing changed today. Counts from scratch on the very first call.
+    """
+    stats = DashboardStats.objects.order_by('-date').first()
+    if stats is None:
+        stats, _ = reconcile_stats()
+    return stats
+
+
+def dashboard_trend(days=30):
+    """
+    Daily rows for the last `days` days, oldest first, for trend widgets.
+    Days without any change have no row; their counters equal the previous row's.
+    """
+    since = timezone.localdate() - timedelta(days=days - 1)
+    return list(DashboardStats.objects.filter(date__gte=since).order_by('date'))
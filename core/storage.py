@@ -0,0 +1,180 @@
+# core/storage.py
+
+import os
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from storages.backends.s3boto3 import S3Boto3Storage
+from storages.utils import clean_name
+
+from .models import StoredBlob
+from .s3 import get_s3_client
+from .utils import calculate_file_hash
+
+# Every (model, field) that may point at a blob. A blob is only deleted from
+# S3 (by prune_orphan_blobs) once none of these rows reference its key any more.
+BLOB_REFERENCES = [
+    ('tugas_akhir.Dokumen', 'file'),
+    ('announcements.Pengumuman', 'lampiran'),
+]
+
+
+def blob_key(sha256, file_name=''):
+    """
+    Returns the content-addressed key for a file, e.g.
+    'blobs/3f/3fa2...e1.pdf'. Identical content always maps to the same key.
+    """
+    extension = os.path.splitext(file_name)[1].lower()
+    prefix = getattr(settings, 'BLOB_STORE_PREFIX', 'blobs/')
+    return f"{prefix}{sha256[:2]}/{sha256}{extension}"
+
+
+def blob_reference_count(name):
+    """Counts the Dokumen and Pengumuman rows that still reference a stored key."""
+    total = 0
+    for model_label, field_name in BLOB_REFERENCES:
+        model = apps.get_model(model_label)
+        total += model._default_manager.filter(**{field_name: name}).count()
+    return total
+
+
+def referenced_blob_keys(keys):
+    """The subset of `keys` still referenced by a Dokumen or Pengumuman row."""
+    referenced = set()
+    for model_label, field_name in BLOB_REFERENCES:
+        model = apps.get_model(model_label)
+        referenced.update(
+            model._default_manager.filter(**{f'{field_name}__in': keys}).values_list(field_name, flat=True)
+        )
+    return referenced
+
+
+def touch_blob(key):
+    """
+    Marks a stored blob as in use now, so `prune_orphan_blobs` leaves it
+    alone while the row that will reference it is being saved. One UPDATE,
+    no S3 request. Returns False if the blob is not recorded as stored.
+    """
+    return bool(StoredBlob.objects.filter(key=key).update(last_used_at=timezone.now()))
+
+
+def record_blob(key):
+    """Records a blob that was just written to S3 (or refreshes it, if another save got there first)."""
+    StoredBlob.objects.bulk_create(
+        [StoredBlob(key=key, last_used_at=timezone.now())],
+        update_conflicts=True, unique_fields=['key'], update_fields=['last_used_at'],
+    )
+
+
+def uploaded_file_name(field_file, stored_name=''):
+    """
+    The name a FieldFile was uploaded with. Until the row is saved the
+    FieldFile still carries it; afterwards it holds the blob key, so the
+    name recorded on the row (`stored_name`) is used.
+    """
+    if not field_file:
+        return ''
+    if not field_file._committed:
+        return os.path.basename(field_file.name)
+    return stored_name or os.path.basename(field_file.name)
+
+
+def is_blob_key(name):
+    return name.startswith(getattr(settings, 'BLOB_STORE_PREFIX', 'blobs/'))
+
+
+class ContentAddressedS3Storage(S3Boto3Storage):
+    """
+    S3 storage that stores every file under a key derived from its SHA-256.
+
+    - Saving a file whose content is already stored skips the upload and
+      returns the existing key, so a PDF re-uploaded after a "Revisi" round
+      costs one UPDATE of its StoredBlob row instead of a new upload.
+    - Blobs are never deleted inline (django_cleanup, `FieldFile.delete()`):
+      a concurrent save of the same content may be about to reuse the key.
+      Unreferenced blobs are removed later by `prune_orphan_blobs`.
+    - Keys from before the blob store are deleted once no row references them.
+
+    The key drops the uploaded file's name; it is kept on the row instead
+    (Dokumen.file_name, Pengumuman.lampiran_name).
+    """
+
+    def get_available_name(self, name, max_length=None):
+        # The final key is chosen in _save() from the content hash, so there is
+        # no need to probe S3 for a free name here.
+        return clean_name(name)
+
+    def _save(self, name, content):
+        key = blob_key(calculate_file_hash(content), name)
+        if touch_blob(key):
+            return key
+        key = super()._save(key, content)
+        record_blob(key)
+        return key
+
+    def delete(self, name):
+        if not name or is_blob_key(name) or blob_reference_count(name) > 0:
+            return
+        super().delete(name)
+
+
+def promote_upload_to_blob(key, sha256):
+    """
+    Moves an object uploaded directly to S3 (see `dokumen/upload/finalize/`)
+    to its content-addressed key. If the blob already exists, the new upload
+    is simply discarded; otherwise it is copied server-side. No bytes pass
+    through this process. Returns the blob key.
+    """
+    target = blob_key(sha256, key)
+    if target == key:
+        return key
+
+    client = get_s3_client()
+    bucket = settings.AWS_STORAGE_BUCKET_NAME
+    if not touch_blob(target):
+        client.copy_object(Bucket=bucket, Key=target, CopySource={'Bucket': bucket, 'Key': key})
+        record_blob(target)
+    client.delete_object(Bucket=bucket, Key=key)
+    return target
+
+
+def prune_orphan_blobs(grace_seconds=None, batch_size=1000):
+    """
+    Deletes blobs that no Dokumen or Pengumuman references and that have
+    not been written or reused (see `touch_blob`) for BLOB_GC_GRACE_SECONDS,
+    walking the StoredBlob table `batch_size` rows at a time. Each batch's
+    rows stay locked until its objects are deleted from S3, so a concurrent
+    save of the same content waits, finds no row, and uploads it again.
+    Returns the number deleted.
+    """
+    grace = grace_seconds if grace_seconds is not None else getattr(settings, 'BLOB_GC_GRACE_SECONDS', 86400)
+    cutoff = timezone.now() - timedelta(seconds=grace)
+    client = get_s3_client()
+    bucket = settings.AWS_STORAGE_BUCKET_NAME
+
+    deleted, after = 0, 0
+    while True:
+        with transaction.atomic():
+            rows = list(
+                StoredBlob.objects.select_for_update(skip_locked=True)
+                .filter(pk__gt=after, last_used_at__lt=cutoff)
+                .order_by('pk').values_list('pk', 'key')[:batch_size]
+            )
+            if not rows:
+                return deleted
+            after = rows[-1][0]
+            keys = [key for _, key in rows]
+            orphans = sorted(set(keys) - referenced_blob_keys(keys))
+            if not orphans:
+                continue
+            response = client.delete_objects(
+                Bucket=bucket, Delete={'Objects': [{'Key': key} for key in orphans], 'Quiet': True}
+            )
+            # Keys S3 failed to delete keep their row and are retried on the next run.
+            failed = {error['Key'] for error in response.get('Errors', [])}
+            removed = [key for key in orphans if key not in failed]
+            StoredBlob.objects.filter(key__in=removed).delete()
+            deleted += len(removed)
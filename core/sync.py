@@ -0,0 +1,154 @@
+# core/sync.py
+
+from dataclasses import dataclass, field
+from datetime import timedelta, timezone as dt_timezone
+from typing import Callable
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from announcements.api_views import PENGUMUMAN_LIST_FIELDS, active_announcements, add_lampiran_urls
+from announcements.models import Pengumuman
+from tugas_akhir.models import Dokumen, JadwalBimbingan, RequestDosen
+from tugas_akhir.serializers import DokumenSerializer, JadwalBimbinganListSerializer, RequestDosenListSerializer
+from users.profiles import get_request_profile
+from users.tokens import ROLE_DOSEN, ROLE_MAHASISWA
+from .models import DeletionLog
+
+
+@dataclass(frozen=True)
+class SyncResource:
+    """
+    One resource of the delta sync. `scopes` maps a role to the lookup that
+    selects the caller's rows (given the caller's user pk); a resource
+    without scopes is visible to everyone. `snapshot` narrows the rows a
+    client holds, e.g. to the announcements active today. Rows can enter or
+    leave that set without being updated, so `window(since)` returns the
+    lookups (as Q objects) for rows that entered it and rows that left it
+    since the watermark.
+    """
+    queryset: Callable
+    serialize: Callable
+    scopes: dict = field(default_factory=dict)
+    snapshot: Callable = None
+    window: Callable = None
+
+
+def announcement_window(since):
+    # Announcements are active for whole days: one that starts after the
+    # watermark's day was not active then, and one that ended since was.
+    since_date, today = timezone.localdate(since), timezone.localdate()
+    return Q(tanggal_mulai__gt=since_date), Q(tanggal_selesai__gte=since_date, tanggal_selesai__lt=today)
+
+
+SYNC_RESOURCES = {
+    'dokumen': SyncResource(
+        lambda: Dokumen.objects.select_related('pemilik__user', 'pemilik__program_studi', 'tugas_akhir'),
+        lambda rows, request: DokumenSerializer(rows, many=True, context={'request': request}).data,
+        scopes={ROLE_MAHASISWA: 'pemilik_id', ROLE_DOSEN: 'tugas_akhir__dosen_pembimbing_id'},
+    ),
+    'jadwal_bimbingan': SyncResource(
+        lambda: JadwalBimbingan.objects.select_related(
+            'mahasiswa__user', 'mahasiswa__program_studi', 'dosen_pembimbing__user', 'lokasi_ruangan'
+        ),
+        lambda rows, request: JadwalBimbinganListSerializer(rows, many=True, context={'request': request}).data,
+        scopes={ROLE_MAHASISWA: 'mahasiswa_id', ROLE_DOSEN: 'dosen_pembimbing_id'},
+    ),
+    'request_dosen': SyncResource(
+        lambda: RequestDosen.objects.select_related('mahasiswa__user', 'dosen__user'),
+        lambda rows, request: RequestDosenListSerializer(rows, many=True, context={'request': request}).data,
+        scopes={ROLE_MAHASISWA: 'mahasiswa_id', ROLE_DOSEN: 'dosen_id'},
+    ),
+    'pengumuman': SyncResource(
+        lambda: Pengumuman.objects.values(*PENGUMUMAN_LIST_FIELDS, 'updated_at'),
+        lambda rows, request: add_lampiran_urls(request, list(rows)),
+        snapshot=active_announcements,
+        window=announcement_window,
+    ),
+}
+
+
+def parse_watermark(value):
+    """
+    Parses an ISO 8601 watermark (as returned by `build_sync_payload`).
+    Returns None for an empty value; raises ValueError if it is malformed.
+    """
+    if not value:
+        return None
+    parsed = parse_datetime(value)
+    if parsed is None:
+        raise ValueError(f"Invalid watermark: {value}")
+    return timezone.make_aware(parsed, dt_timezone.utc) if timezone.is_naive(parsed) else parsed
+
+
+def format_watermark(moment):
+    # UTC with a 'Z' suffix, so the value survives a query string unencoded.
+    return moment.astimezone(dt_timezone.utc).isoformat().replace('+00:00', 'Z')
+
+
+def sync_resource(name, request, since, now):
+    """
+    Changes to one resource for the caller since the `since` watermark:
+    rows created or updated (`updated`) and ids deleted (`deleted`).
+
+    Without a watermark, or with one older than the tombstone retention,
+    the caller's full current set is returned with `reset: true`, and the
+    client replaces its copy instead of merging. Rows are upserted by id,
+    so the SYNC_CLOCK_SKEW_SECONDS overlap may resend a row harmlessly.
+    For resources with a `snapshot`, rows that left it are sent as deleted,
+    so a delta leaves the client with the same set a reset would.
+    """
+    resource = SYNC_RESOURCES[name]
+    profile = get_request_profile(request)
+    retention = timedelta(days=getattr(settings, 'SYNC_TOMBSTONE_RETENTION_DAYS', 30))
+    reset = since is None or since < now - retention
+
+    queryset = resource.queryset()
+    tombstones = DeletionLog.objects.filter(resource=name)
+    if resource.scopes:
+        lookup = resource.scopes.get(profile.role)
+        if lookup is None:
+            return {'updated': [], 'deleted': [], 'reset': True}
+        queryset = queryset.filter(**{lookup: request.user.pk})
+        tombstones = tombstones.filter(**{f'{profile.role}_id': request.user.pk})
+
+    if reset:
+        if resource.snapshot:
+            queryset = resource.snapshot(queryset)
+        return {'updated': resource.serialize(queryset, request), 'deleted': [], 'reset': True}
+
+    since -= timedelta(seconds=getattr(settings, 'SYNC_CLOCK_SKEW_SECONDS', 5))
+    changed = Q(updated_at__gt=since)
+    deleted = list(tombstones.filter(deleted_at__gt=since).values_list('object_id', flat=True))
+    if resource.snapshot:
+        entered, left = resource.window(since)
+        visible = resource.snapshot(queryset)
+        deleted += queryset.filter(changed | left).exclude(pk__in=visible.values('pk')).values_list('pk', flat=True)
+        queryset = visible.filter(changed | entered)
+    else:
+        queryset = queryset.filter(changed)
+
+    return {'updated': resource.serialize(queryset, request), 'deleted': deleted, 'reset': False}
+
+
+def build_sync_payload(request, watermarks):
+    """
+    Delta-sync payload for every resource in SYNC_RESOURCES. `watermarks`
+    maps resource names to parsed watermarks (missing means a full sync).
+    The returned `watermark` is taken before any query, so a row changed
+    while the payload is built is sent again on the next sync, not lost.
+    """
+    now = timezone.now()
+    return {
+        'watermark': format_watermark(now),
+        'resources': {name: sync_resource(name, request, watermarks.get(name), now) for name in SYNC_RESOURCES},
+    }
+
+
+def prune_tombstones(days=None):
+    """Deletes tombstones older than the retention window. Returns the number deleted."""
+    days = days if days is not None else getattr(settings, 'SYNC_TOMBSTONE_RETENTION_DAYS', 30)
+    deleted, _ = DeletionLog.objects.filter(deleted_at__lt=timezone.now() - timedelta(days=days)).delete()
+    return deleted
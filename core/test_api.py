@@ -4,7 +4,9 @@ from django.urls import reverse
 from rest_framework.test import APIClient
 from rest_framework import status
 from django.contrib.auth.models import User
+from unittest.mock import patch
 from .models import FCMDevice
+from .tests import FakeTransport
 
 pytestmark = pytest.mark.django_db
 
@@ -21,6 +23,39 @@ def regular_user():
     """Fixture for a regular, authenticated user."""
     return User.objects.create_user(username='testuser', password='password123')
 
+@pytest.fixture
+def campus():
+    """Two students of one supervisor, each with a document, plus a schedule and an active announcement."""
+    from datetime import date, time, timedelta
+    from django.utils import timezone
+    from announcements.models import Pengumuman
+    from tugas_akhir.models import Dokumen, JadwalBimbingan, TugasAkhir
+    from users.models import Dosen, Jurusan, Mahasiswa, ProgramStudi
+
+    jurusan = Jurusan.objects.create(nama_jurusan='Teknik Informatika')
+    prodi = ProgramStudi.objects.create(nama_prodi='S1 Informatika', jurusan=jurusan)
+    dosen = Dosen.objects.create(user=User.objects.create_user(username='dosen', password='pw'), nik='1', jurusan=jurusan)
+    students = []
+    for nim in ('100', '200'):
+        mahasiswa = Mahasiswa.objects.create(
+            user=User.objects.create_user(username=nim, password='pw'), nim=nim, program_studi=prodi
+        )
+        tugas_akhir = TugasAkhir.objects.create(mahasiswa=mahasiswa, dosen_pembimbing=dosen, judul=f"TA {nim}")
+        Dokumen.objects.create(
+            tugas_akhir=tugas_akhir, pemilik=mahasiswa, bab='BAB I', nama_dokumen=f"Bab 1 {nim}",
+            file=f'dokumen_ta/{nim}.pdf',
+        )
+        students.append(mahasiswa)
+    jadwal = JadwalBimbingan.objects.create(
+        mahasiswa=students[0], dosen_pembimbing=dosen, judul_bimbingan="Bimbingan 1",
+        tanggal=date(2025, 1, 6), waktu=time(9, 0), lokasi_text="Online",
+    )
+    today = timezone.localdate()
+    Pengumuman.objects.create(
+        judul="Aktif", deskripsi="-", tanggal_mulai=today, tanggal_selesai=today + timedelta(days=1),
+    )
+    return {'dosen': dosen, 'students': students, 'jadwal': jadwal}
+
 
 # --- API Test Classes ---
 
@@ -87,3 +122,222 @@ class TestFCMDeviceAPI:
         response = api_client.post(url, data, format='json')
         
         assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+class TestFCMDeviceTopics:
+    """
+    Tests that registering a device subscribes it to its role topics.
+    """
+
+    def test_register_fcm_device_subscribes_to_role_topics(self, api_client, regular_user):
+        """
+        Test that a new device is subscribed to the topics of its user's role.
+        """
+        transport = FakeTransport()
+        api_client.force_authenticate(user=regular_user)
+        with patch('core.firebase_utils.get_transport', return_value=transport):
+            response = api_client.post(reverse('core-api-register-fcm'), {'fcm_token': 'topic_token'}, format='json')
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert transport.subscriptions == [(['topic_token'], 'all')]
+        assert FCMDevice.objects.get(fcm_token='topic_token').topics == ['all']
+
+
+class TestSyncAPI:
+    """
+    Tests for the mobile delta-sync endpoint.
+    """
+
+    @pytest.fixture(autouse=True)
+    def no_clock_skew(self, settings):
+        settings.SYNC_CLOCK_SKEW_SECONDS = 0
+
+    def test_first_sync_returns_the_callers_rows(self, api_client, campus):
+        student = campus['students'][0]
+        api_client.force_authenticate(user=student.user)
+
+        response = api_client.get(reverse('core-api-sync'))
+
+        resources = response.data['resources']
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['watermark'].endswith('Z')
+        assert [item['nama_dokumen'] for item in resources['dokumen']['updated']] == ["Bab 1 100"]
+        assert resources['dokumen']['reset'] is True
+        assert [item['id'] for item in resources['jadwal_bimbingan']['updated']] == [campus['jadwal'].pk]
+        assert [item['judul'] for item in resources['pengumuman']['updated']] == ["Aktif"]
+
+    def test_delta_returns_only_changes_and_tombstones(self, api_client, campus):
+        from tugas_akhir.models import Dokumen
+
+        student, other = campus['students']
+        api_client.force_authenticate(user=student.user)
+        watermark = api_client.get(reverse('core-api-sync')).data['watermark']
+
+        document = Dokumen.objects.get(pemilik=student)
+        document.status = 'Revisi'
+        document.save()
+        jadwal_id = campus['jadwal'].pk
+        campus['jadwal'].delete()
+        Dokumen.objects.filter(pemilik=other).delete()
+
+        resources = api_client.get(reverse('core-api-sync'), {'since': watermark}).data['resources']
+
+        assert [item['status'] for item in resources['dokumen']['updated']] == ['Revisi']
+        assert resources['dokumen']['deleted'] == []  # The other student's document was never visible
+        assert resources['jadwal_bimbingan'] == {'updated': [], 'deleted': [jadwal_id], 'reset': False}
+        assert resources['pengumuman']['updated'] == []
+
+        # The supervisor sees both students' deletions.
+        api_client.force_authenticate(user=campus['dosen'].user)
+        resources = api_client.get(reverse('core-api-sync'), {'since': watermark}).data['resources']
+        assert len(resources['dokumen']['deleted']) == 1
+        assert resources['jadwal_bimbingan']['deleted'] == [jadwal_id]
+
+    def test_delta_follows_the_active_window(self, api_client, campus):
+        from datetime import timedelta
+        from django.utils import timezone
+        from announcements.models import Pengumuman
+        from .sync import format_watermark
+
+        api_client.force_authenticate(user=campus['students'][0].user)
+        today = timezone.localdate()
+        upcoming = Pengumuman.objects.create(
+            judul="Besok", deskripsi="-", tanggal_mulai=today + timedelta(days=1), tanggal_selesai=today + timedelta(days=2),
+        )
+        active = Pengumuman.objects.get(judul="Aktif")
+        watermark = format_watermark(timezone.now() - timedelta(days=1))
+        Pengumuman.objects.filter(pk=active.pk).update(tanggal_mulai=today - timedelta(days=3))
+        Pengumuman.objects.filter(pk=active.pk).update(tanggal_selesai=today - timedelta(days=1))
+
+        resources = api_client.get(reverse('core-api-sync'), {'pengumuman': watermark}).data['resources']
+
+        # Neither is shown today: the expired one is dropped, and the upcoming one
+        # (changed, but never active) is listed too, which a client ignores.
+        assert resources['pengumuman']['updated'] == []
+        assert sorted(resources['pengumuman']['deleted']) == [active.pk, upcoming.pk]
+
+        Pengumuman.objects.filter(pk=upcoming.pk).update(
+            tanggal_mulai=today, updated_at=timezone.now() - timedelta(days=2)
+        )
+        resources = api_client.get(reverse('core-api-sync'), {'pengumuman': watermark}).data['resources']
+        assert [item['id'] for item in resources['pengumuman']['updated']] == [upcoming.pk]
+
+    def test_new_supervisor_receives_documents(self, api_client, campus):
+        from users.models import Dosen
+
+        student = campus['students'][0]
+        document = student.tugas_akhir.dokumen.get()
+        api_client.force_authenticate(user=campus['dosen'].user)
+        watermark = api_client.get(reverse('core-api-sync')).data['watermark']
+
+        new_dosen = Dosen.objects.create(
+            user=User.objects.create_user(username='dosen2', password='pw'), nik='2', jurusan=campus['dosen'].jurusan
+        )
+        tugas_akhir = student.tugas_akhir
+        tugas_akhir.dosen_pembimbing = new_dosen
+        tugas_akhir.save()
+        jadwal = campus['jadwal']
+        jadwal.dosen_pembimbing = new_dosen
+        jadwal.save()
+
+        resources = api_client.get(reverse('core-api-sync'), {'since': watermark}).data['resources']
+        assert resources['dokumen']['updated'] == []
+        assert resources['dokumen']['deleted'] == [document.pk]
+        assert resources['jadwal_bimbingan']['deleted'] == [jadwal.pk]
+
+        api_client.force_authenticate(user=new_dosen.user)
+        resources = api_client.get(reverse('core-api-sync'), {'since': watermark}).data['resources']
+        assert [item['id'] for item in resources['dokumen']['updated']] == [document.pk]
+        assert resources['dokumen']['deleted'] == []
+
+        # The student still sees both rows: the touch resends the document, nothing is deleted.
+        api_client.force_authenticate(user=student.user)
+        resources = api_client.get(reverse('core-api-sync'), {'since': watermark}).data['resources']
+        assert resources['dokumen']['deleted'] == [] and resources['jadwal_bimbingan']['deleted'] == []
+
+    def test_expired_or_invalid_watermark(self, api_client, campus):
+        api_client.force_authenticate(user=campus['students'][0].user)
+
+        response = api_client.get(reverse('core-api-sync'), {'dokumen': '2000-01-01T00:00:00Z'})
+        assert response.data['resources']['dokumen']['reset'] is True
+        assert len(response.data['resources']['dokumen']['updated']) == 1
+
+        response = api_client.get(reverse('core-api-sync'), {'since': 'kemarin'})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_prune_removes_old_tombstones(self, campus):
+        from datetime import timedelta
+        from django.core.management import call_command
+        from django.utils import timezone
+        from .models import DeletionLog
+
+        campus['jadwal'].delete()
+        DeletionLog.objects.create(resource='pengumuman', object_id=1)
+        DeletionLog.objects.filter(resource='pengumuman').update(deleted_at=timezone.now() - timedelta(days=90))
+
+        call_command('prune_sync_tombstones')
+
+        assert list(DeletionLog.objects.values_list('resource', flat=True)) == ['jadwal_bimbingan']
+
+
+class TestMeOverviewAPI:
+    """
+    Tests for the aggregated mobile home endpoint and its query budget.
+    """
+
+    def _add_activity(self, student, dosen, count):
+        from datetime import time, timedelta
+        from django.utils import timezone
+        from tugas_akhir.models import Dokumen, JadwalBimbingan, RequestDosen
+
+        for index in range(count):
+            JadwalBimbingan.objects.create(
+                mahasiswa=student, dosen_pembimbing=dosen, judul_bimbingan=f"Bimbingan {index}",
+                tanggal=timezone.localdate() + timedelta(days=index), waktu=time(9, 0), lokasi_text="Online",
+            )
+            RequestDosen.objects.create(mahasiswa=student, dosen=dosen, status='REJECTED', rencana_judul=f"Judul {index}")
+        for bab, _ in Dokumen.BAB_CHOICES[1:count + 1]:
+            Dokumen.objects.create(
+                tugas_akhir=student.tugas_akhir, pemilik=student, bab=bab, nama_dokumen=bab,
+                file=f'dokumen_ta/{student.nim}-{bab}.pdf',
+            )
+
+    def test_mahasiswa_overview(self, api_client, campus, django_assert_num_queries):
+        student = campus['students'][0]
+        self._add_activity(student, campus['dosen'], 4)
+        api_client.force_authenticate(user=student.user)
+
+        # Profile, documents, schedules, requests and announcements.
+        with django_assert_num_queries(5):
+            response = api_client.get(reverse('core-api-me-overview'))
+
+        data = response.json()
+        assert data['role'] == 'mahasiswa'
+        assert data['profile']['nim'] == '100'
+        assert data['tugas_akhir']['judul'] == 'TA 100'
+        assert [item['is_uploaded'] for item in data['status_checklist']] == [True] * 5 + [False]
+        assert [item['judul_bimbingan'] for item in data['jadwal_bimbingan']][:2] == ['Bimbingan 0', 'Bimbingan 1']
+        assert len(data['supervision_requests']) == 4
+        assert [item['judul'] for item in data['announcements']] == ['Aktif']
+
+    def test_dosen_overview_query_budget_is_fixed(self, api_client, campus, django_assert_num_queries):
+        dosen = campus['dosen']
+        api_client.force_authenticate(user=dosen.user)
+        with django_assert_num_queries(5):
+            api_client.get(reverse('core-api-me-overview'))
+
+        for student in campus['students']:
+            self._add_activity(student, dosen, 3)
+        api_client.force_authenticate(user=dosen.user)
+        with django_assert_num_queries(5):
+            response = api_client.get(reverse('core-api-me-overview'))
+
+        data = response.json()
+        assert data['role'] == 'dosen'
+        assert data['supervised_students_count'] == 2
+        assert len(data['jadwal_bimbingan']) == 5
+        assert data['supervision_requests'] == []  # Only PENDING requests need the Dosen's attention
+
+    def test_overview_requires_a_profile(self, api_client, regular_user):
+        api_client.force_authenticate(user=regular_user)
+        assert api_client.get(reverse('core-api-me-overview')).status_code == status.HTTP_403_FORBIDDEN
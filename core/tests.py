@@ -1,9 +1,36 @@
 # core/tests.py
+import hashlib
+import io
+import tracemalloc
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import MagicMock, patch
 import pytest
 from django.urls import reverse
+from django.conf import settings
 from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.db.models import F
 from django.db.utils import IntegrityError
-from .models import ActivityLog, FCMDevice
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from openpyxl import load_workbook
+from .broadcast import run_broadcast_job, run_pending_broadcasts
+from .export_jobs import create_export_job, run_export_job
+from .exports import write_xlsx
+from .firebase_utils import (
+    TokenResult, deliver_notification, role_topics_for_user, sync_all_device_topics, sync_device_topics,
+)
+from .models import ActivityLog, BroadcastJob, DashboardStats, ExportJob, FCMDevice, NotificationOutbox, StoredBlob
+from .outbox import claim_pending, dispatch_entries, enqueue_notification
+from .s3 import attachment_disposition, get_presigned_url, presigned_url_cache, reset_s3_client
+from .stats import count_stats, dashboard_trend, get_dashboard_stats, reconcile_stats
+from .storage import ContentAddressedS3Storage, blob_key, prune_orphan_blobs
+from .utils import calculate_file_hash
 from users.models import Mahasiswa, Dosen, Jurusan, ProgramStudi
 from announcements.models import Pengumuman
 from tugas_akhir.models import Dokumen, TugasAkhir
@@ -223,3 +250,807 @@ class TestCoreViews:
         response = client.get(url)
         assert response.status_code == 302
         assert reverse('core:login') in response.url
+
+
+# --- FCM Delivery Tests ---
+
+class FakeTransport:
+    """
+    In-memory FCM transport that records batches and reports the given
+    tokens as unregistered (`rejected` ones fail topic (un)subscriptions).
+    """
+    def __init__(self, unregistered=(), rejected=()):
+        self.unregistered = set(unregistered)
+        self.rejected = set(rejected)
+        self.batches = []
+        self.topic_messages = []
+        self.subscriptions = []
+        self.unsubscriptions = []
+
+    def is_available(self):
+        return True
+
+    def send_batch(self, tokens, data):
+        self.batches.append((list(tokens), data))
+        return [
+            TokenResult(token=token, success=False, unregistered=True, error='unregistered')
+            if token in self.unregistered else TokenResult(token=token, success=True)
+            for token in tokens
+        ]
+
+    def send_topic(self, topic, data):
+        self.topic_messages.append((topic, data))
+
+    def subscribe(self, tokens, topic):
+        self.subscriptions.append((list(tokens), topic))
+        return [token for token in tokens if token in self.rejected]
+
+    def unsubscribe(self, tokens, topic):
+        self.unsubscriptions.append((list(tokens), topic))
+        return [token for token in tokens if token in self.rejected]
+
+
+class TestFCMBatchDelivery:
+    """
+    Tests for the batched multicast delivery engine in core.firebase_utils.
+    """
+
+    def test_tokens_are_grouped_into_batches_of_500(self):
+        """
+        Test that 1200 tokens are delivered in three multicast batches.
+        """
+        transport = FakeTransport()
+        tokens = [f'token-{i}' for i in range(1200)]
+
+        report = deliver_notification(tokens, 'Judul', 'Isi', data={'screen': 'home'}, transport=transport)
+
+        assert [len(batch) for batch, _ in transport.batches] == [500, 500, 200]
+        assert transport.batches[0][1] == {'title': 'Judul', 'body': 'Isi', 'screen': 'home'}
+        assert report.success_count == 1200
+        assert report.failure_count == 0
+        assert report.batch_count == 3
+
+    def test_unregistered_tokens_are_pruned_in_bulk(self, regular_user, another_user):
+        """
+        Test that tokens reported as unregistered are deleted and counted as failures.
+        """
+        FCMDevice.objects.create(user=regular_user, fcm_token='stale-token')
+        FCMDevice.objects.create(user=another_user, fcm_token='live-token')
+        transport = FakeTransport(unregistered={'stale-token'})
+
+        report = deliver_notification(['stale-token', 'live-token'], 'Judul', 'Isi', transport=transport)
+
+        assert report.as_dict() == {'success': 1, 'failure': 1, 'batches': 1, 'pruned': 1}
+        assert list(FCMDevice.objects.values_list('fcm_token', flat=True)) == ['live-token']
+
+    def test_failed_batch_marks_every_token_as_failed(self):
+        """
+        Test that a transport error fails the whole batch without raising.
+        """
+        class BrokenTransport(FakeTransport):
+            def send_batch(self, tokens, data):
+                raise ConnectionError('FCM unreachable')
+
+        report = deliver_notification(['a', 'b'], 'Judul', 'Isi', transport=BrokenTransport())
+
+        assert report.success_count == 0
+        assert report.failure_count == 2
+        assert report.pruned_tokens == []
+
+
+# --- Notification Outbox Tests ---
+
+class TestNotificationOutbox:
+    """
+    Tests for the durable notification outbox and its dispatcher.
+    """
+
+    def test_enqueue_creates_pending_entry(self, regular_user):
+        """
+        Test that enqueueing stores a PENDING row with stringified data.
+        """
+        entry = enqueue_notification(regular_user, 'Judul', 'Isi', data={'document_id': 7})
+        assert entry.status == 'PENDING'
+        assert entry.data == {'document_id': '7'}
+
+    def test_dispatch_marks_entry_delivered(self, regular_user):
+        """
+        Test that a successful delivery marks the row DELIVERED.
+        """
+        FCMDevice.objects.create(user=regular_user, fcm_token='token-1')
+        entry = enqueue_notification(regular_user, 'Judul', 'Isi')
+
+        with patch('core.firebase_utils.get_transport', return_value=FakeTransport()):
+            counts = dispatch_entries(claim_pending(10), max_workers=1)
+
+        entry.refresh_from_db()
+        assert counts['DELIVERED'] == 1
+        assert entry.status == 'DELIVERED'
+        assert entry.delivered_at is not None
+
+    def test_failed_delivery_is_retried_then_dead(self, regular_user, settings):
+        """
+        Test that failures back off and end as DEAD after the maximum number of attempts.
+        """
+        settings.NOTIFICATION_OUTBOX_MAX_ATTEMPTS = 2
+
+        class UnavailableTransport(FakeTransport):
+            def is_available(self):
+                return False
+
+        entry = enqueue_notification(regular_user, 'Judul', 'Isi')
+        with patch('core.firebase_utils.get_transport', return_value=UnavailableTransport()):
+            dispatch_entries([entry.pk], max_workers=1)
+            entry.refresh_from_db()
+            assert entry.status == 'PENDING'
+            assert entry.attempts == 1
+            assert entry.next_attempt_at > entry.updated_at
+            # Not due yet, so it must not be claimed again.
+            assert claim_pending(10) == []
+
+            dispatch_entries([entry.pk], max_workers=1)
+            entry.refresh_from_db()
+            assert entry.status == 'DEAD'
+            assert 'not initialized' in entry.last_error
+
+    def test_expired_lease_counts_as_attempt(self, regular_user, settings):
+        """
+        Test that an entry whose worker died is reclaimed as a new attempt and ends as DEAD.
+        """
+        settings.NOTIFICATION_OUTBOX_MAX_ATTEMPTS = 2
+        entry = enqueue_notification(regular_user, 'Judul', 'Isi')
+
+        def expire_lease():
+            # The worker crashed mid-delivery and its lease ran out.
+            NotificationOutbox.objects.filter(pk=entry.pk).update(
+                updated_at=timezone.now() - timezone.timedelta(seconds=settings.NOTIFICATION_OUTBOX_LEASE + 1)
+            )
+
+        assert claim_pending(10) == [entry.pk]
+        expire_lease()
+        assert claim_pending(10) == [entry.pk]
+        entry.refresh_from_db()
+        assert entry.attempts == 1
+
+        expire_lease()
+        assert claim_pending(10) == []
+        entry.refresh_from_db()
+        assert entry.status == 'DEAD'
+        assert entry.attempts == 2
+        assert 'lease expired' in entry.last_error
+
+    def test_worker_command_drains_outbox(self, regular_user):
+        """
+        Test that `run_notification_worker --once` delivers all due entries.
+        """
+        for i in range(3):
+            enqueue_notification(regular_user, f'Judul {i}', 'Isi')
+
+        with patch('core.firebase_utils.get_transport', return_value=FakeTransport()):
+            call_command('run_notification_worker', '--once', '--workers', '1')
+
+        assert NotificationOutbox.objects.filter(status='DELIVERED').count() == 3
+
+
+# --- Broadcast Job Tests ---
+
+class TestBroadcastJob:
+    """
+    Tests for the background broadcast engine in core.broadcast.
+    """
+
+    def test_run_broadcast_job_streams_tokens_in_chunks(self, regular_user, settings):
+        """
+        Test that the job sends every token in chunks and records its counters.
+        """
+        settings.FCM_BATCH_SIZE = 2
+        for i in range(5):
+            FCMDevice.objects.create(user=regular_user, fcm_token=f'token-{i}')
+        transport = FakeTransport(unregistered={'token-3'})
+        job = BroadcastJob.objects.create(title='Info', body='Isi', mode='tokens')
+
+        assert run_broadcast_job(job.pk, transport=transport, max_workers=1) is True
+
+        job.refresh_from_db()
+        assert job.status == 'DONE'
+        assert [len(batch) for batch, _ in transport.batches] == [2, 2, 1]
+        assert (job.total_tokens, job.sent_count, job.failed_count, job.pruned_count) == (5, 4, 1, 1)
+        assert not FCMDevice.objects.filter(fcm_token='token-3').exists()
+
+    def test_job_is_only_claimed_once(self):
+        """
+        Test that a job that is already running is not executed again.
+        """
+        job = BroadcastJob.objects.create(title='Info', body='Isi', status='RUNNING')
+        assert run_broadcast_job(job.pk, transport=FakeTransport(), max_workers=1) is False
+
+
+    def test_abandoned_job_resumes_from_progress(self, regular_user, settings):
+        """
+        Test that a RUNNING job without a heartbeat is reclaimed and only sends the remaining tokens.
+        """
+        settings.FCM_BATCH_SIZE = 2
+        settings.BROADCAST_MAX_WORKERS = 1
+        devices = [FCMDevice.objects.create(user=regular_user, fcm_token=f'token-{i}') for i in range(5)]
+        stale = timezone.now() - timezone.timedelta(seconds=settings.BROADCAST_LEASE + 1)
+        # The runner died after sending the first chunk.
+        job = BroadcastJob.objects.create(
+            title='Info', body='Isi', mode='tokens', status='RUNNING',
+            started_at=stale, heartbeat_at=stale, resume_after=devices[1].pk, sent_count=2,
+        )
+        transport = FakeTransport()
+
+        with patch('core.firebase_utils.get_transport', return_value=transport):
+            assert run_pending_broadcasts() == 1
+
+        job.refresh_from_db()
+        assert job.status == 'DONE'
+        assert [batch for batch, _ in transport.batches] == [['token-2', 'token-3'], ['token-4']]
+        assert (job.sent_count, job.resume_after) == (5, devices[4].pk)
+
+# --- FCM Topic Tests ---
+
+class TestFCMTopics:
+    """
+    Tests for role topic subscriptions and topic broadcasts.
+    """
+
+    def test_role_topics_for_mahasiswa_and_dosen(self, mahasiswa, dosen, prodi, jurusan):
+        """
+        Test that users are mapped to 'all', their role and their prodi/jurusan topics.
+        """
+        assert role_topics_for_user(mahasiswa.user) == ['all', 'mahasiswa', f'prodi-{prodi.pk}', f'jurusan-{jurusan.pk}']
+        assert role_topics_for_user(dosen.user) == ['all', 'dosen', f'jurusan-{jurusan.pk}']
+
+    def test_sync_device_topics_only_sends_changes(self, mahasiswa, prodi, jurusan):
+        """
+        Test that a device is subscribed once and that re-syncing makes no calls.
+        """
+        transport = FakeTransport()
+        device = FCMDevice.objects.create(user=mahasiswa.user, fcm_token='token-m', topics=['all', 'dosen'])
+
+        assert sync_device_topics(device, transport=transport) is True
+        assert transport.unsubscriptions == [(['token-m'], 'dosen')]
+        assert [topic for _, topic in transport.subscriptions] == ['mahasiswa', f'prodi-{prodi.pk}', f'jurusan-{jurusan.pk}']
+
+        transport.subscriptions.clear()
+        assert sync_device_topics(device, transport=transport) is False
+        assert transport.subscriptions == []
+
+    def test_backfill_groups_tokens_per_topic(self, mahasiswa, another_user):
+        """
+        Test that the backfill sends one subscribe call per topic, not per device.
+        """
+        FCMDevice.objects.create(user=mahasiswa.user, fcm_token='token-1')
+        FCMDevice.objects.create(user=mahasiswa.user, fcm_token='token-2')
+        FCMDevice.objects.create(user=another_user, fcm_token='token-3')
+        transport = FakeTransport()
+
+        assert sync_all_device_topics(transport=transport) == 3
+        subscriptions = dict((topic, tokens) for tokens, topic in transport.subscriptions)
+        assert subscriptions['all'] == ['token-1', 'token-2', 'token-3']
+        assert subscriptions['mahasiswa'] == ['token-1', 'token-2']
+        assert FCMDevice.objects.get(fcm_token='token-3').topics == ['all']
+
+    def test_failed_subscriptions_are_retried(self, mahasiswa, another_user):
+        """
+        Test that a device whose subscribe failed is not recorded as synced and is retried.
+        """
+        FCMDevice.objects.create(user=mahasiswa.user, fcm_token='token-1')
+        FCMDevice.objects.create(user=another_user, fcm_token='token-2')
+
+        assert sync_all_device_topics(transport=FakeTransport(rejected={'token-1'})) == 1
+        assert FCMDevice.objects.get(fcm_token='token-1').topics == []
+        assert FCMDevice.objects.get(fcm_token='token-2').topics == ['all']
+
+        transport = FakeTransport()
+        assert sync_all_device_topics(transport=transport) == 1
+        assert [tokens for tokens, _ in transport.subscriptions] == [['token-1']] * 4
+        assert FCMDevice.objects.get(fcm_token='token-1').topics == role_topics_for_user(mahasiswa.user)
+
+    def test_deleted_device_is_unsubscribed(self, mahasiswa, another_user, django_capture_on_commit_callbacks):
+        """
+        Test that a deleted device leaves its topics, except a token FCM already dropped as unregistered.
+        """
+        transport = FakeTransport(unregistered={'stale-token'})
+        device = FCMDevice.objects.create(user=mahasiswa.user, fcm_token='token-1', topics=['all', 'mahasiswa'])
+        FCMDevice.objects.create(user=another_user, fcm_token='stale-token', topics=['all'])
+
+        with patch('core.firebase_utils.get_transport', return_value=transport):
+            with django_capture_on_commit_callbacks(execute=True):
+                device.delete()
+                deliver_notification(['stale-token'], 'Judul', 'Isi', transport=transport)
+
+        assert transport.unsubscriptions == [(['token-1'], 'all'), (['token-1'], 'mahasiswa')]
+        assert not FCMDevice.objects.exists()
+
+    def test_prodi_change_resyncs_devices(self, mahasiswa, prodi, jurusan, django_capture_on_commit_callbacks):
+        """
+        Test that moving a student to another prodi moves their devices to its topic.
+        """
+        transport = FakeTransport()
+        device = FCMDevice.objects.create(
+            user=mahasiswa.user, fcm_token='token-1', topics=role_topics_for_user(mahasiswa.user)
+        )
+        other_prodi = ProgramStudi.objects.create(nama_prodi='D3 Konstruksi Gedung', jurusan=jurusan)
+
+        with patch('core.firebase_utils.get_transport', return_value=transport):
+            with django_capture_on_commit_callbacks(execute=True):
+                mahasiswa.program_studi = other_prodi
+                mahasiswa.save()
+
+        assert transport.unsubscriptions == [(['token-1'], f'prodi-{prodi.pk}')]
+        assert transport.subscriptions == [(['token-1'], f'prodi-{other_prodi.pk}')]
+        device.refresh_from_db()
+        assert f'prodi-{other_prodi.pk}' in device.topics
+
+    def test_topic_broadcast_sends_single_message(self, mahasiswa, prodi):
+        """
+        Test that a topic-mode job sends one message to the audience topic.
+        """
+        FCMDevice.objects.create(user=mahasiswa.user, fcm_token='token-1')
+        transport = FakeTransport()
+        job = BroadcastJob.objects.create(title='Info', body='Isi', topic=f'prodi-{prodi.pk}', mode='topic')
+
+        assert run_broadcast_job(job.pk, transport=transport, max_workers=1) is True
+
+        job.refresh_from_db()
+        assert job.status == 'DONE'
+        assert job.total_tokens == 1
+        assert transport.batches == []
+        assert transport.topic_messages == [(f'prodi-{prodi.pk}', {'title': 'Info', 'body': 'Isi'})]
+
+
+# --- Presigned URL Cache Tests ---
+
+class TestPresignedUrlCache:
+    """
+    Tests for the shared S3 client and presigned URL cache in core.s3.
+    """
+
+    @patch('core.s3.boto3.client')
+    def test_urls_are_cached_per_key_and_disposition(self, mock_boto3_client, settings):
+        """
+        Test that the client is built once and URLs are reused per (key, disposition).
+        """
+        reset_s3_client()
+        mock_s3 = MagicMock()
+        mock_s3.generate_presigned_url.side_effect = lambda op, Params, ExpiresIn: f"url-{Params['Key']}-{len(Params)}"
+        mock_boto3_client.return_value = mock_s3
+
+        inline = get_presigned_url('dokumen_ta/bab1.pdf', site='test')
+        assert get_presigned_url('dokumen_ta/bab1.pdf', site='test') == inline
+        download = get_presigned_url('dokumen_ta/bab1.pdf', 'attachment; filename="bab1.pdf"', site='test')
+
+        assert download != inline
+        assert mock_boto3_client.call_count == 1
+        assert mock_s3.generate_presigned_url.call_count == 2
+        assert presigned_url_cache.stats('test') == {'hits': 1, 'misses': 2}
+
+    @patch('core.s3.boto3.client')
+    def test_url_is_not_cached_inside_refresh_margin(self, mock_boto3_client, settings):
+        """
+        Test that URLs whose lifetime is within the refresh margin are never reused.
+        """
+        reset_s3_client()
+        settings.S3_PRESIGNED_URL_REFRESH_MARGIN = 120
+        mock_boto3_client.return_value.generate_presigned_url.return_value = 'url'
+
+        get_presigned_url('dokumen_ta/bab2.pdf', expires_in=60, site='test')
+        get_presigned_url('dokumen_ta/bab2.pdf', expires_in=60, site='test')
+
+        assert mock_boto3_client.return_value.generate_presigned_url.call_count == 2
+
+
+# --- Content-Addressed Storage Tests ---
+
+class TestContentAddressedStorage:
+    """
+    Tests for the blob store in core.storage.
+    """
+
+    def test_duplicate_content_skips_upload(self, django_assert_num_queries):
+        """
+        Test that a file whose content is already stored is not uploaded again, and that
+        reusing it costs one UPDATE and no S3 request.
+        """
+        storage = ContentAddressedS3Storage()
+        content = ContentFile(b'%PDF-1.4 same content', name='bab1.pdf')
+        expected_key = blob_key(hashlib.sha256(b'%PDF-1.4 same content').hexdigest(), 'bab1.pdf')
+
+        with patch('storages.backends.s3boto3.S3Boto3Storage._save', side_effect=lambda name, content: name) as mock_upload:
+            assert storage.save('dokumen_ta/bab1.pdf', content) == expected_key
+            mock_upload.assert_called_once()
+            first_use = StoredBlob.objects.get(key=expected_key).last_used_at
+
+            with django_assert_num_queries(1), patch('core.storage.get_s3_client') as mock_client:
+                name = storage.save('dokumen_ta/bab1_revisi.pdf', content)
+
+        assert name == expected_key
+        assert mock_upload.call_count == 1
+        mock_client.assert_not_called()
+        assert StoredBlob.objects.get(key=expected_key).last_used_at > first_use
+
+    def test_blobs_are_not_deleted_inline(self, tugas_akhir, mahasiswa):
+        """
+        Test that blobs outlive their rows, while legacy keys are deleted once unreferenced.
+        """
+        key = blob_key('ab' * 32, 'x.pdf')
+        Pengumuman.objects.create(
+            judul='Info', deskripsi='Isi', tanggal_mulai='2025-01-01', tanggal_selesai='2025-01-02', lampiran=key
+        )
+        Dokumen.objects.create(
+            tugas_akhir=tugas_akhir, pemilik=mahasiswa, bab='BAB I', nama_dokumen='Bab 1', file='dokumen_ta/bab1.pdf'
+        )
+        storage = ContentAddressedS3Storage()
+
+        with patch('storages.backends.s3boto3.S3Boto3Storage.delete') as mock_delete:
+            # log_pengumuman_deletion leaves the blob to prune_orphan_blobs
+            Pengumuman.objects.all().delete()
+            mock_delete.assert_not_called()
+
+            storage.delete('dokumen_ta/bab1.pdf')
+            mock_delete.assert_not_called()
+            Dokumen.objects.all().delete()
+            storage.delete('dokumen_ta/bab1.pdf')
+            mock_delete.assert_called_once_with('dokumen_ta/bab1.pdf')
+
+    def test_prune_deletes_only_old_unreferenced_blobs(self, tugas_akhir, mahasiswa):
+        """
+        Test that the garbage collector keeps referenced and recently used blobs.
+        """
+        referenced, recent, orphan, undeletable = (blob_key(char * 64, 'x.pdf') for char in 'abcd')
+        Dokumen.objects.create(tugas_akhir=tugas_akhir, pemilik=mahasiswa, bab='BAB I', nama_dokumen='Bab 1', file=referenced)
+        old = timezone.now() - timezone.timedelta(days=2)
+        for key in (referenced, orphan, undeletable):
+            StoredBlob.objects.create(key=key, last_used_at=old)
+        StoredBlob.objects.create(key=recent, last_used_at=timezone.now())
+        client = MagicMock()
+        client.delete_objects.return_value = {'Errors': [{'Key': undeletable, 'Code': 'InternalError'}]}
+
+        with patch('core.storage.get_s3_client', return_value=client):
+            assert prune_orphan_blobs(grace_seconds=86400, batch_size=2) == 1
+
+        deleted = [call.kwargs['Delete']['Objects'] for call in client.delete_objects.call_args_list]
+        assert deleted == [[{'Key': orphan}], [{'Key': undeletable}]]
+        assert set(StoredBlob.objects.values_list('key', flat=True)) == {referenced, recent, undeletable}
+
+    def test_uploaded_name_is_kept_on_the_row(self, tugas_akhir, mahasiswa):
+        """
+        Test that the original file name survives the blob key and is used for downloads.
+        """
+        StoredBlob.objects.create(
+            key=blob_key(hashlib.sha256(b'%PDF-1.4 bab 1').hexdigest(), 'x.pdf'), last_used_at=timezone.now()
+        )
+        document = Dokumen.objects.create(
+            tugas_akhir=tugas_akhir, pemilik=mahasiswa, bab='BAB I', nama_dokumen='Bab 1',
+            file=ContentFile(b'%PDF-1.4 bab 1', name='Bab 1 Pendahuluan.pdf'),
+        )
+
+        document.refresh_from_db()
+        assert document.file.name.startswith('blobs/')
+        assert document.file_name == 'Bab 1 Pendahuluan.pdf'
+        assert attachment_disposition(document.file_name) == 'attachment; filename="Bab 1 Pendahuluan.pdf"'
+
+
+# --- Upload Hashing Tests ---
+
+class CountingContentFile(ContentFile):
+    """ContentFile that counts how many bytes are read through chunks()."""
+    bytes_read = 0
+
+    def chunks(self, chunk_size=None):
+        for chunk in super().chunks(chunk_size):
+            self.bytes_read += len(chunk)
+            yield chunk
+
+
+class TestUploadHashing:
+    """
+    Tests for the hashing upload handlers in core.upload_handlers.
+    """
+
+    @pytest.mark.parametrize('size', [1024, 3 * 1024 * 1024])
+    def test_digest_is_attached_while_parsing(self, size, settings):
+        """
+        Test that in-memory and temporary-file uploads carry their SHA-256.
+        """
+        settings.FILE_UPLOAD_MAX_MEMORY_SIZE = 2 * 1024 * 1024
+        content = b'x' * size
+        request = RequestFactory().post('/', {'file': SimpleUploadedFile('bab1.pdf', content)})
+
+        uploaded = request.FILES['file']
+        assert uploaded.sha256 == hashlib.sha256(content).hexdigest()
+
+    def test_bytes_read_per_upload_drops_to_one_pass(self):
+        """
+        Benchmark of bytes read per upload: form hashing, blob-key hashing and
+        the S3 upload used to read the file three times; with the digest
+        precomputed by the upload handler, only the upload reads it.
+        """
+        def bytes_read(precomputed):
+            content = CountingContentFile(b'%PDF-1.4 ' * 10000, name='bab1.pdf')
+            if precomputed:
+                content.sha256 = hashlib.sha256(content.read()).hexdigest()
+                content.seek(0)
+
+            def upload(self, name, uploaded):
+                for _ in uploaded.chunks():
+                    pass
+                return name
+
+            calculate_file_hash(content)  # DokumenCreateForm / PengumumanForm
+            with patch('core.storage.touch_blob', return_value=False), \
+                    patch('storages.backends.s3boto3.S3Boto3Storage._save', upload):
+                ContentAddressedS3Storage().save('dokumen_ta/bab1.pdf', content)
+            return content.bytes_read / content.size
+
+        assert bytes_read(precomputed=False) == 3
+        assert bytes_read(precomputed=True) == 1
+
+
+# --- Streaming XLSX Export Tests ---
+
+class TestStreamingXlsxExport:
+    """
+    Tests for the write-only export engine in core.exports.
+    """
+
+    def test_header_widths_and_frozen_pane(self):
+        rows = [['BAB 1', None, 'x' * 80], ['BAB 2', 'Disetujui', 'pendek']]
+        output = write_xlsx(iter(rows), ['BAB', 'Status', 'Judul'], "Export", max_width=40)
+
+        sheet = load_workbook(output).active
+        assert sheet.title == "Export"
+        assert [cell.value for cell in sheet[1]] == ['BAB', 'Status', 'Judul']
+        assert sheet['A1'].font.bold
+        assert sheet['B2'].value is None and sheet['C3'].value == 'pendek'
+        assert sheet.freeze_panes == 'A2'
+        assert sheet.column_dimensions['A'].width == 7
+        assert sheet.column_dimensions['B'].width == 11
+        assert sheet.column_dimensions['C'].width == 40
+
+    def test_peak_memory_does_not_grow_with_rows(self):
+        """
+        Benchmark of peak heap: exporting 20x more rows must not need
+        meaningfully more memory, since rows are spooled to disk.
+        """
+        def peak(count):
+            rows = ([f"BAB {i}", f"Dokumen {i}", "Menunggu Review"] for i in range(count))
+            tracemalloc.start()
+            write_xlsx(rows, ['BAB', 'Nama', 'Status'], "Export").close()
+            _, peak_bytes = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            return peak_bytes
+
+        assert peak(20000) < peak(1000) * 1.5
+
+
+# --- Background Export Job Tests ---
+
+@pytest.fixture
+def uploaded_exports():
+    """Patches the S3 client used by export jobs; yields {key: bytes} of the uploaded artifacts."""
+    uploads = {}
+
+    def upload(fileobj, bucket, key, ExtraArgs=None, Callback=None):
+        uploads[key] = fileobj.read()
+
+    with patch('core.export_jobs.get_s3_client') as mock_client:
+        mock_client.return_value.upload_fileobj.side_effect = upload
+        yield uploads
+
+
+class TestExportJobs:
+    """
+    Tests for background exports in core.export_jobs and the export endpoints.
+    """
+
+    def test_worker_builds_csv_artifact(self, mahasiswa, uploaded_exports):
+        """
+        Test that the worker builds the filtered export, records progress and uploads it.
+        """
+        regular_user = mahasiswa.user
+        regular_user.first_name = 'Budi'
+        regular_user.save()
+        job, created = create_export_job('users', 'csv', {'role': 'mahasiswa', 'q': ' Budi ', 'page': '2'})
+        assert created and job.params == {'q': 'Budi', 'role': 'mahasiswa'}
+
+        call_command('run_export_worker', '--once')
+
+        job.refresh_from_db()
+        assert job.status == 'DONE'
+        assert job.total_rows == job.processed_rows == 1
+        assert job.file_key.startswith('exports/users/') and job.file_key.endswith('.csv')
+        lines = uploaded_exports[job.file_key].decode('utf-8-sig').splitlines()
+        assert lines[0].startswith('Full Name,Email,Role')
+        assert lines[1].startswith('Budi,') and 'Mahasiswa' in lines[1]
+
+    def test_identical_params_reuse_recent_job(self, settings):
+        """
+        Test that a recent, non-failed job with the same kind, format and filters is reused.
+        """
+        settings.EXPORT_ARTIFACT_REUSE_SECONDS = 600
+        job, _ = create_export_job('documents', 'xlsx', {'q': 'bab'})
+
+        assert create_export_job('documents', 'xlsx', {'q': 'bab '}) == (job, False)
+        assert create_export_job('documents', 'csv', {'q': 'bab'})[1] is True
+        assert create_export_job('documents', 'xlsx', {'q': 'bab 2'})[1] is True
+
+        ExportJob.objects.filter(pk=job.pk).update(created_at=timezone.now() - timedelta(seconds=601))
+        assert create_export_job('documents', 'xlsx', {'q': 'bab'})[0] != job
+
+    def test_failed_job_is_not_reused(self):
+        job, _ = create_export_job('tugas_akhir', 'xlsx')
+        with patch('core.export_jobs.get_s3_client', side_effect=RuntimeError('S3 tidak tersedia')):
+            assert run_export_job(job.pk) is True
+
+        job.refresh_from_db()
+        assert job.status == 'FAILED' and 'S3 tidak tersedia' in job.error
+        assert run_export_job(job.pk) is False
+        assert create_export_job('tugas_akhir', 'xlsx')[0] != job
+
+    def test_abandoned_job_is_rebuilt_and_not_reused(self, mahasiswa, uploaded_exports, settings):
+        """
+        Test that a RUNNING job whose worker died is not handed out again and is rebuilt by the worker.
+        """
+        settings.EXPORT_LEASE = 300
+        job, _ = create_export_job('users', 'csv')
+        ExportJob.objects.filter(pk=job.pk).update(
+            status='RUNNING', processed_rows=7, heartbeat_at=timezone.now() - timedelta(seconds=301)
+        )
+
+        assert create_export_job('users', 'csv')[1] is True
+        assert run_export_job(job.pk) is True
+        job.refresh_from_db()
+        assert job.status == 'DONE' and job.processed_rows == 1 and job.file_key in uploaded_exports
+
+        # A job with a fresh heartbeat belongs to a live worker.
+        ExportJob.objects.filter(pk=job.pk).update(status='RUNNING', heartbeat_at=timezone.now())
+        assert run_export_job(job.pk) is False
+
+    def test_prune_deletes_old_jobs_and_artifacts(self):
+        """
+        Test that old finished jobs are deleted along with their files, and recent or running ones are kept.
+        """
+        old = ExportJob.objects.create(kind='users', params_hash='a', status='DONE', file_key='exports/users/1-a.csv')
+        ExportJob.objects.create(kind='users', params_hash='b', status='FAILED')
+        running = ExportJob.objects.create(kind='users', params_hash='c', status='RUNNING')
+        ExportJob.objects.update(created_at=timezone.now() - timedelta(days=2))
+        recent = ExportJob.objects.create(kind='users', params_hash='d', status='DONE', file_key='exports/users/4-d.csv')
+
+        with patch('core.export_jobs.get_s3_client') as mock_client:
+            call_command('prune_export_jobs')
+
+        mock_client.return_value.delete_objects.assert_called_once_with(
+            Bucket=settings.AWS_STORAGE_BUCKET_NAME, Delete={'Objects': [{'Key': old.file_key}], 'Quiet': True},
+        )
+        assert set(ExportJob.objects.values_list('pk', flat=True)) == {running.pk, recent.pk}
+
+    def test_create_status_and_download_endpoints(self, client, staff_user, tugas_akhir, uploaded_exports):
+        """
+        Test queueing an export over HTTP, polling it, and downloading the finished file.
+        """
+        client.force_login(staff_user)
+        response = client.post(reverse('core:export-create'), {'kind': 'tugas_akhir', 'format': 'xlsx'})
+        assert response.status_code == 201
+        job_data = response.json()['job']
+        assert job_data['status'] == 'PENDING' and job_data['download_url'] is None
+
+        repeat = client.post(reverse('core:export-create'), {'kind': 'tugas_akhir', 'format': 'xlsx'})
+        assert repeat.status_code == 200 and repeat.json()['reused'] is True
+
+        run_export_job(job_data['id'])
+        status = client.get(job_data['status_url']).json()
+        assert status['status'] == 'DONE' and status['processed'] == 1
+
+        with patch('core.export_jobs.get_presigned_url', return_value='https://s3.example.com/export.xlsx') as presign:
+            response = client.get(status['download_url'])
+        assert response.status_code == 302
+        assert response.url == 'https://s3.example.com/export.xlsx'
+        assert presign.call_args.kwargs['disposition'] == 'attachment; filename="tugas_akhir_export.xlsx"'
+        sheet = load_workbook(io.BytesIO(uploaded_exports[ExportJob.objects.get().file_key])).active
+        assert sheet['B2'].value == tugas_akhir.judul
+
+    def test_invalid_kind_is_rejected(self, client, staff_user):
+        client.force_login(staff_user)
+        response = client.post(reverse('core:export-create'), {'kind': 'passwords'})
+        assert response.status_code == 400
+        assert not ExportJob.objects.exists()
+
+
+class TestDashboardStats:
+    """
+    Tests for the materialized dashboard counters in core.stats.
+    """
+
+    def _assert_consistent(self):
+        stored = get_dashboard_stats().counters()
+        assert stored == count_stats()
+        return stored
+
+    def test_signals_keep_counters_current(self, mahasiswa, dosen, tugas_akhir, document, another_user, prodi, jurusan,
+                                           django_capture_on_commit_callbacks):
+        # No row yet: the first read counts from scratch.
+        counters = self._assert_consistent()
+        assert counters['total_mahasiswa'] == 1
+        assert counters['dokumen_pending'] == 1
+        assert counters['mahasiswa_per_prodi'] == {str(prodi.pk): 1}
+
+        with django_capture_on_commit_callbacks(execute=True):
+            document.status = 'Disetujui'
+            document.save()
+            other_prodi = ProgramStudi.objects.create(nama_prodi='D3 Teknik Sipil', jurusan=jurusan)
+            Mahasiswa.objects.create(user=another_user, nim='67890', program_studi=other_prodi)
+            mahasiswa.program_studi = other_prodi
+            mahasiswa.save()
+        counters = self._assert_consistent()
+        assert counters['dokumen_disetujui'] == 1
+        assert counters['mahasiswa_per_prodi'] == {str(other_prodi.pk): 2}
+
+        # Cascades: the student's tugas akhir and documents go too.
+        with django_capture_on_commit_callbacks(execute=True):
+            mahasiswa.delete()
+        counters = self._assert_consistent()
+        assert counters['total_mahasiswa'] == 1
+        assert counters['total_dokumen'] == 0
+        assert counters['active_tugas_akhir'] == 0
+
+    def test_dashboard_reads_one_row(self, client, staff_user, mahasiswa, django_assert_num_queries):
+        reconcile_stats()
+        with django_assert_num_queries(1):
+            stats = get_dashboard_stats()
+        assert stats.total_mahasiswa == 1
+
+        client.login(username='staffuser', password='password123')
+        response = client.get(reverse('core:dashboard'))
+        assert response.context['total_mahasiswa'] == 1
+
+    def test_new_day_carries_counters_forward(self, mahasiswa, another_user, prodi, django_capture_on_commit_callbacks):
+        reconcile_stats()
+        DashboardStats.objects.update(date=timezone.localdate() - timedelta(days=1))
+        with django_capture_on_commit_callbacks(execute=True):
+            Mahasiswa.objects.create(user=another_user, nim='67890', program_studi=prodi)
+
+        yesterday, today = dashboard_trend(days=7)
+        assert (yesterday.total_mahasiswa, today.total_mahasiswa) == (1, 2)
+        assert today.date == timezone.localdate()
+
+    def test_reconcile_corrects_drift(self, mahasiswa, document):
+        reconcile_stats()
+        # Writes that bypass signals, e.g. queryset.update(), leave the counters stale.
+        Dokumen.objects.update(status='Revisi')
+        DashboardStats.objects.update(total_mahasiswa=F('total_mahasiswa') + 5)
+
+        output = StringIO()
+        call_command('reconcile_dashboard_stats', stdout=output)
+
+        assert "total_mahasiswa: 6 -> 1" in output.getvalue()
+        assert "dokumen_revisi: 0 -> 1" in output.getvalue()
+        assert "3 counters corrected" in output.getvalue()
+        self._assert_consistent()
+
+    def test_changes_are_applied_after_commit(self, mahasiswa, another_user, prodi, django_capture_on_commit_callbacks):
+        reconcile_stats()
+        with django_capture_on_commit_callbacks() as callbacks:
+            Mahasiswa.objects.create(user=another_user, nim='67890', program_studi=prodi)
+            # Nothing is written to (or locked on) the stats row inside the caller's transaction.
+            assert DashboardStats.objects.get().total_mahasiswa == 1
+        for callback in callbacks:
+            callback()
+        assert DashboardStats.objects.get().total_mahasiswa == 2
+
+        # A rolled-back change is never counted.
+        with django_capture_on_commit_callbacks(execute=True):
+            with pytest.raises(RuntimeError), transaction.atomic():
+                mahasiswa.delete()
+                raise RuntimeError
+        assert DashboardStats.objects.get().total_mahasiswa == 2
+
+    def test_admin_session_is_not_saved_on_every_request(self, client, staff_user):
+        client.login(username='staffuser', password='password123')
+        client.get(reverse('core:dashboard'))
+        with CaptureQueriesContext(connection) as queries:
+            client.get(reverse('core:dashboard'))
+
+        assert not [query for query in queries if 'UPDATE "django_session"' in query['sql']]
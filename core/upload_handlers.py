@@ -0,0 +1,42 @@
+# core/upload_handlers.py
+
+import hashlib
+
+from django.core.files.uploadhandler import MemoryFileUploadHandler, TemporaryFileUploadHandler
+
+
+class SHA256UploadMixin:
+    """
+    Computes the SHA-256 of an uploaded file incrementally, while the
+    multipart body is being parsed, and attaches the hex digest to the
+    resulting UploadedFile as `sha256`. Hashing and storage code then no
+    longer have to read the file again (see core.utils.calculate_file_hash).
+    """
+
+    def new_file(self, *args, **kwargs):
+        # Set before calling super(): MemoryFileUploadHandler.new_file raises
+        # StopFutureHandlers when it takes over the file.
+        self.sha256 = hashlib.sha256()
+        super().new_file(*args, **kwargs)
+
+    def receive_data_chunk(self, raw_data, start):
+        remaining = super().receive_data_chunk(raw_data, start)
+        # Only hash chunks this handler actually consumed; chunks passed on are
+        # hashed by the next handler in FILE_UPLOAD_HANDLERS.
+        if remaining is None:
+            self.sha256.update(raw_data)
+        return remaining
+
+    def file_complete(self, file_size):
+        uploaded_file = super().file_complete(file_size)
+        if uploaded_file is not None:
+            uploaded_file.sha256 = self.sha256.hexdigest()
+        return uploaded_file
+
+
+class HashingMemoryFileUploadHandler(SHA256UploadMixin, MemoryFileUploadHandler):
+    """In-memory upload handler (small files) that also computes the SHA-256."""
+
+
+class HashingTemporaryFileUploadHandler(SHA256UploadMixin, TemporaryFileUploadHandler):
+    """Temporary-file upload handler (large files) that also computes the SHA-256."""
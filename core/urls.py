@@ -10,6 +10,11 @@ urlpatterns = [
     path('', views.HomeView.as_view(), name='home'),
     path('login/', views.LoginView.as_view(), name='login'),
     path('logout/', views.LogoutView.as_view(), name='logout'),
+
+    # Background exports: queue a job, poll its progress, download the file
+    path('exports/', views.ExportJobCreateView.as_view(), name='export-create'),
+    path('exports/<int:job_id>/status/', views.ExportJobStatusView.as_view(), name='export-status'),
+    path('exports/<int:job_id>/download/', views.ExportJobDownloadView.as_view(), name='export-download'),
 ]
 
 # Include other app URLs for a modular structure
@@ -1,13 +1,30 @@
 import hashlib
 
+def get_precomputed_hash(file_object):
+    """
+    Returns the SHA-256 computed while the upload was being received
+    (see core.upload_handlers), or None. Works for both an UploadedFile and
+    a FieldFile wrapping one.
+    """
+    digest = getattr(file_object, 'sha256', None)
+    if not digest:
+        digest = getattr(getattr(file_object, '_file', None), 'sha256', None)
+    return digest
+
 def calculate_file_hash(file_object):
     """
     Calculates the SHA-256 hash of a file-like object efficiently
     by reading it in chunks.
+    Uploads parsed by the hashing upload handlers already carry their digest,
+    in which case the file is not read again.
     """
     if not file_object:
         return ""
 
+    precomputed = get_precomputed_hash(file_object)
+    if precomputed:
+        return precomputed
+
     sha256_hash = hashlib.sha256()
 
     # Ensure we're at the beginning of the file
@@ -20,4 +37,4 @@ def calculate_file_hash(file_object):
     # Go back to the beginning of the file for any subsequent operations
     file_object.seek(0)
 
-    return sha256_hash.hexdigest()
\ No newline at end of file
+    return sha256_hash.hexdigest()
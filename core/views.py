@@ -1,5 +1,8 @@
 # core/views.py
-from django.shortcuts import render, redirect
+from botocore.exceptions import ClientError
+from django.http import HttpResponseRedirect, JsonResponse
+from django.shortcuts import get_object_or_404, render, redirect
+from django.urls import reverse
 from django.views.generic import FormView, TemplateView, View
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.mixins import LoginRequiredMixin
@@ -8,10 +11,11 @@ from django.contrib.auth import get_user_model
 from .forms import AdminLoginForm
 from itertools import chain
 
-from users.models import Mahasiswa, Dosen, User
-from tugas_akhir.models import Dokumen
+from users.models import User
 from announcements.models import Pengumuman
-from .models import ActivityLog
+from .export_jobs import create_export_job, download_url
+from .models import ActivityLog, ExportJob
+from .stats import get_dashboard_stats
 
 
 class HomeView(TemplateView):
@@ -55,9 +59,12 @@ class DashboardView(LoginRequiredMixin, TemplateView):
         context = super().get_context_data(**kwargs)
 
         # --- Data for Stat Cards ---
-        context['total_mahasiswa'] = Mahasiswa.objects.count()
-        context['total_dosen'] = Dosen.objects.count()
-        context['total_dokumen'] = Dokumen.objects.count()
+        # One row of materialized counters instead of a COUNT(*) per table (see core.stats).
+        stats = get_dashboard_stats()
+        context['stats'] = stats
+        context['total_mahasiswa'] = stats.total_mahasiswa
+        context['total_dosen'] = stats.total_dosen
+        context['total_dokumen'] = stats.total_dokumen
 
         # --- Data for Recent Announcements Panel ---
         context['recent_announcements'] = Pengumuman.objects.all()[:3]
@@ -65,4 +72,55 @@ class DashboardView(LoginRequiredMixin, TemplateView):
         # --- Data for Recent Activity Panel ---
         context['recent_activities'] = ActivityLog.objects.select_related('actor').all()[:5]
 
-        return context
\ No newline at end of file
+        return context
+
+# --- Background Exports ---
+
+def _export_job_payload(job):
+    data = job.as_dict()
+    data['status_url'] = reverse('core:export-status', kwargs={'job_id': job.pk})
+    data['download_url'] = reverse('core:export-download', kwargs={'job_id': job.pk}) if job.status == 'DONE' else None
+    return data
+
+
+class ExportJobCreateView(LoginRequiredMixin, View):
+    """
+    Queues a background export (see core.export_jobs). POST `kind`
+    ('users', 'documents', 'tugas_akhir', 'jadwal_bimbingan'), `format`
+    ('xlsx', 'csv', 'ndjson') and the list page's filters (`q`, `role`,
+    `status`). If the same export was requested recently, its job is
+    returned instead of a new one.
+    """
+    def post(self, request, *args, **kwargs):
+        kind = request.POST.get('kind', '')
+        file_format = request.POST.get('format', 'xlsx')
+        if kind not in dict(ExportJob.KIND_CHOICES) or file_format not in dict(ExportJob.FORMAT_CHOICES):
+            return JsonResponse({'status': 'error', 'message': "Jenis atau format export tidak valid."}, status=400)
+
+        job, created = create_export_job(kind, file_format, params=request.POST, user=request.user)
+        return JsonResponse({'status': 'success', 'reused': not created, 'job': _export_job_payload(job)},
+                            status=201 if created else 200)
+
+
+class ExportJobStatusView(LoginRequiredMixin, View):
+    """
+    Returns the progress of an export job (processed/total rows) as JSON,
+    with a download link once the file is ready.
+    """
+    def get(self, request, job_id):
+        job = get_object_or_404(ExportJob, pk=job_id)
+        return JsonResponse(_export_job_payload(job))
+
+
+class ExportJobDownloadView(LoginRequiredMixin, View):
+    """
+    Redirects to a short-lived presigned S3 URL for a finished export.
+    """
+    def get(self, request, job_id):
+        job = get_object_or_404(ExportJob, pk=job_id, status='DONE')
+        try:
+            url = download_url(job)
+        except ClientError as e:
+            print(f"Error generating presigned URL for export job {job.pk}: {e}")
+            return JsonResponse({'status': 'error', 'message': "Gagal membuat tautan unduhan."}, status=502)
+        return HttpResponseRedirect(url)
@@ -1,4 +1,5 @@
 import base64
+import importlib.util
 import os
 from datetime import timedelta
 from pathlib import Path
@@ -168,6 +169,43 @@ AUTH_PASSWORD_VALIDATORS = [
     {"NAME": "django.contrib.auth.password_validation.NumericPasswordValidator",},
 ]
 
+# --- Password Hashing ---
+# PASSWORD_HASHER_POLICY picks the hasher for new and upgraded hashes:
+# 'scrypt' (default, stdlib), 'argon2' (needs argon2-cffi) or 'pbkdf2'
+# (Django's default, ~1M iterations). Hashes made with another hasher or
+# other cost parameters are rehashed transparently on the next login.
+# Measure the options on production hardware with `manage.py benchmark_login`.
+PASSWORD_HASHER_POLICY = os.environ.get('PASSWORD_HASHER_POLICY', 'scrypt')
+if PASSWORD_HASHER_POLICY == 'argon2' and importlib.util.find_spec('argon2') is None:
+    PASSWORD_HASHER_POLICY = 'scrypt'
+
+PASSWORD_SCRYPT_WORK_FACTOR = int(os.environ.get('PASSWORD_SCRYPT_WORK_FACTOR', 2 ** 14))
+PASSWORD_SCRYPT_BLOCK_SIZE = int(os.environ.get('PASSWORD_SCRYPT_BLOCK_SIZE', 8))
+PASSWORD_SCRYPT_PARALLELISM = int(os.environ.get('PASSWORD_SCRYPT_PARALLELISM', 1))
+PASSWORD_ARGON2_TIME_COST = int(os.environ.get('PASSWORD_ARGON2_TIME_COST', 2))
+PASSWORD_ARGON2_MEMORY_COST = int(os.environ.get('PASSWORD_ARGON2_MEMORY_COST', 19456))  # KiB
+PASSWORD_ARGON2_PARALLELISM = int(os.environ.get('PASSWORD_ARGON2_PARALLELISM', 1))
+# Iterations for admin-issued temporary passwords (upgraded on first login)
+PASSWORD_TEMPORARY_ITERATIONS = int(os.environ.get('PASSWORD_TEMPORARY_ITERATIONS', 10000))
+# Hashing processes used by the admin bulk user import (users.importer)
+USER_IMPORT_WORKERS = int(os.environ.get('USER_IMPORT_WORKERS', 2))
+
+_PREFERRED_PASSWORD_HASHERS = {
+    'scrypt': 'users.hashers.TunedScryptPasswordHasher',
+    'argon2': 'users.hashers.TunedArgon2PasswordHasher',
+    'pbkdf2': 'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+}
+# The first entry hashes new passwords; the rest can still verify old hashes.
+PASSWORD_HASHERS = [_PREFERRED_PASSWORD_HASHERS[PASSWORD_HASHER_POLICY]] + [
+    hasher for hasher in [
+        'users.hashers.TunedScryptPasswordHasher',
+        'users.hashers.TunedArgon2PasswordHasher',
+        'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+        'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+        'users.hashers.TemporaryPasswordHasher',
+    ] if hasher != _PREFERRED_PASSWORD_HASHERS[PASSWORD_HASHER_POLICY]
+]
+
 
 # --- Internationalization & Localization ---
 # Settings for language, time zone, and translation support.
@@ -201,18 +239,100 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 # Configures default settings for Django REST Framework.
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        # Stateless: the user is rebuilt from the token's role claims
+        'users.authentication.RoleClaimsJWTAuthentication',
     ),
+    # Keyset pagination for list endpoints; see core.pagination
+    'DEFAULT_PAGINATION_CLASS': 'core.pagination.StableCursorPagination',
 }
+API_PAGE_SIZE = int(os.environ.get('API_PAGE_SIZE', 50))          # Default items per page (?page_size= overrides)
+API_MAX_PAGE_SIZE = int(os.environ.get('API_MAX_PAGE_SIZE', 200))  # Upper bound for ?page_size=
 
 # --- Simple JWT (JSON Web Token) Settings ---
 SIMPLE_JWT = {
-    "ACCESS_TOKEN_LIFETIME": timedelta(hours=24), # Lifespan of an access token
+    # Access tokens are checked from their claims alone (users.authentication), so a
+    # deactivation or revoked staff flag only takes effect once the token expires.
+    "ACCESS_TOKEN_LIFETIME": timedelta(minutes=int(os.environ.get('JWT_ACCESS_TOKEN_MINUTES', 15))),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=30),     # Lifespan of a refresh token
     "ROTATE_REFRESH_TOKENS": False,                  # If True, a new refresh token is issued when one is used
     "BLACKLIST_AFTER_ROTATION": False,               # If True, old refresh tokens are added to a blacklist
+    "TOKEN_REFRESH_SERIALIZER": "users.tokens.RoleTokenRefreshSerializer",  # Re-reads role claims on refresh
 }
 
+# --- Presigned URL Settings ---
+# Presigned S3 links are cached per (object key, disposition) in core.s3 and
+# reused until S3_PRESIGNED_URL_REFRESH_MARGIN seconds before they expire.
+S3_PRESIGNED_URL_EXPIRY = int(os.environ.get('S3_PRESIGNED_URL_EXPIRY', 900))
+S3_PRESIGNED_URL_REFRESH_MARGIN = int(os.environ.get('S3_PRESIGNED_URL_REFRESH_MARGIN', 120))
+S3_PRESIGNED_URL_CACHE_SIZE = int(os.environ.get('S3_PRESIGNED_URL_CACHE_SIZE', 10000))
+# Uploads are hashed (SHA-256) while the request body is parsed, so files are
+# read once instead of once per hash calculation plus once for the S3 upload.
+FILE_UPLOAD_HANDLERS = [
+    'core.upload_handlers.HashingMemoryFileUploadHandler',
+    'core.upload_handlers.HashingTemporaryFileUploadHandler',
+]
+# Uploaded files are stored by content hash (core.storage.ContentAddressedS3Storage).
+BLOB_STORE_PREFIX = 'blobs/'
+# Unreferenced blobs are deleted by `manage.py prune_orphan_blobs` once unused this long
+# (core.StoredBlob.last_used_at).
+BLOB_GC_GRACE_SECONDS = int(os.environ.get('BLOB_GC_GRACE_SECONDS', 86400))
+# Direct-to-S3 uploads (`dokumen/upload/initiate/` + `dokumen/upload/finalize/`).
+S3_PRESIGNED_POST_EXPIRY = int(os.environ.get('S3_PRESIGNED_POST_EXPIRY', 600))
+DOKUMEN_UPLOAD_MAX_SIZE = 2 * 1024 * 1024  # Same 2MB limit as tugas_akhir.models.validate_file_size
+# Maximum number of documents signed by one `dokumen/access-files/` request.
+DOKUMEN_ACCESS_FILES_MAX_IDS = 50
+
+# --- Firebase Cloud Messaging Settings ---
+# Dotted path to the transport used to deliver push notifications.
+# Swap it for a fake transport to benchmark against a local FCM stub.
+FCM_TRANSPORT = os.environ.get('FCM_TRANSPORT', 'core.firebase_utils.FirebaseTransport')
+# Number of tokens per multicast request (FCM caps this at 500).
+FCM_BATCH_SIZE = int(os.environ.get('FCM_BATCH_SIZE', 500))
+# Prefix for audience topics ('all', 'mahasiswa', 'prodi-<id>', ...), so several
+# environments can share one Firebase project without receiving each other's messages.
+FCM_TOPIC_PREFIX = os.environ.get('FCM_TOPIC_PREFIX', '')
+# How announcements are delivered: 'topic' sends one message per audience topic,
+# 'tokens' fans out to every matching device token in batches. Topic mode relies
+# on the subscriptions backfilled by `manage.py sync_fcm_topics` (run by entrypoint.sh).
+ANNOUNCEMENT_BROADCAST_MODE = os.environ.get('ANNOUNCEMENT_BROADCAST_MODE', 'topic')
+
+# --- Notification Outbox Settings ---
+# Notifications are queued in core.NotificationOutbox and delivered by
+# `python manage.py run_notification_worker`.
+NOTIFICATION_OUTBOX_WORKERS = int(os.environ.get('NOTIFICATION_OUTBOX_WORKERS', 8))     # Delivery thread pool size
+NOTIFICATION_OUTBOX_MAX_ATTEMPTS = int(os.environ.get('NOTIFICATION_OUTBOX_MAX_ATTEMPTS', 5))  # Attempts before a row is marked DEAD
+NOTIFICATION_OUTBOX_BACKOFF_BASE = 30    # Seconds before the first retry, doubled on each attempt
+NOTIFICATION_OUTBOX_BACKOFF_MAX = 3600   # Upper bound for the retry delay
+NOTIFICATION_OUTBOX_LEASE = 300          # Seconds before a PROCESSING row is considered abandoned
+# Deliver right after commit instead of waiting for the worker (local development only).
+NOTIFICATION_OUTBOX_EAGER = os.environ.get('NOTIFICATION_OUTBOX_EAGER', '0') == '1'
+# Number of token chunks sent concurrently by a broadcast job (core.BroadcastJob).
+BROADCAST_MAX_WORKERS = int(os.environ.get('BROADCAST_MAX_WORKERS', 4))
+BROADCAST_LEASE = 300                    # Seconds without progress before a RUNNING broadcast is reclaimed
+
+# --- Background Export Settings ---
+# Exports queued through core.ExportJob are built by `manage.py run_export_worker`
+# and stored in S3 under EXPORT_STORAGE_PREFIX. A request with the same kind,
+# format and filters within EXPORT_ARTIFACT_REUSE_SECONDS reuses that job.
+# Jobs and their files are deleted after EXPORT_RETENTION_SECONDS by
+# `manage.py prune_export_jobs`.
+EXPORT_STORAGE_PREFIX = os.environ.get('EXPORT_STORAGE_PREFIX', 'exports/')
+EXPORT_ARTIFACT_REUSE_SECONDS = int(os.environ.get('EXPORT_ARTIFACT_REUSE_SECONDS', 600))
+EXPORT_RETENTION_SECONDS = int(os.environ.get('EXPORT_RETENTION_SECONDS', 86400))
+EXPORT_LEASE = 300                       # Seconds without progress before a RUNNING export is reclaimed
+
+# --- Conditional GET Settings ---
+# Announcement and lookup endpoints send ETag/Last-Modified (see core.conditional);
+# clients may reuse a response this many seconds before revalidating.
+CONDITIONAL_GET_MAX_AGE = int(os.environ.get('CONDITIONAL_GET_MAX_AGE', 60))
+
+# --- Mobile Delta Sync Settings ---
+# Deletions are kept as tombstones for SYNC_TOMBSTONE_RETENTION_DAYS (pruned by
+# `manage.py prune_sync_tombstones`); older watermarks get a full resync.
+# Watermarks are widened by SYNC_CLOCK_SKEW_SECONDS to cover in-flight writes.
+SYNC_TOMBSTONE_RETENTION_DAYS = int(os.environ.get('SYNC_TOMBSTONE_RETENTION_DAYS', 30))
+SYNC_CLOCK_SKEW_SECONDS = int(os.environ.get('SYNC_CLOCK_SKEW_SECONDS', 5))
+
 # --- Deployment Specific Settings (Railway) ---
 # Fetches the application URL from Railway's environment variables.
 RAILWAY_APP_URL = os.environ.get('RAILWAY_APP_URL')
@@ -243,6 +363,38 @@ AUTHENTICATION_BACKENDS = [
     'django.contrib.auth.backends.ModelBackend', # Default Django backend
 ]
 
+# --- Cache ---
+# Redis when REDIS_URL is set: shared by every gunicorn worker (and management
+# commands), so a signal that drops a cached entry, or the user importer's
+# delete_many, reaches all of them. Without it each process has its own
+# LocMemCache, and the caches that rely on that invalidation are off.
+REDIS_URL = os.environ.get('REDIS_URL', '')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Seconds an unknown NIM/NIK is remembered by NimNikAuthBackend, so repeated
+# login attempts with it are rejected without a database query. 0 disables
+# the cache (the default without Redis).
+AUTH_NEGATIVE_CACHE_TTL = int(os.environ.get('AUTH_NEGATIVE_CACHE_TTL', 60 if REDIS_URL else 0))
+# Seconds a student's chapter checklist (dokumen/status-checklist/) stays
+# cached; it is also dropped whenever one of their documents changes. 0
+# disables the cache (the default without Redis).
+STATUS_CHECKLIST_CACHE_TTL = int(os.environ.get('STATUS_CHECKLIST_CACHE_TTL', 300 if REDIS_URL else 0))
+# Seconds a Dosen's progress dashboard (dosen/progress/) is cached; not
+# invalidated on writes, so keep it short. 0 disables the cache.
+SUPERVISION_PROGRESS_CACHE_TTL = int(os.environ.get('SUPERVISION_PROGRESS_CACHE_TTL', 30))
+
 # --- Email Settings ---
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
 EMAIL_HOST = os.environ.get('BREVO_EMAIL_HOST', '')
@@ -270,8 +422,11 @@ SESSION_EXPIRE_AT_BROWSER_CLOSE = True
 # This will now primarily affect admins due to our middleware.
 SESSION_COOKIE_AGE = 1200
 
-# Resets the inactivity timer on each request.
-SESSION_SAVE_EVERY_REQUEST = True
+# The inactivity timer is renewed by core.middleware.AdminSessionTimeoutMiddleware
+# at most once per SESSION_REFRESH_INTERVAL seconds, rather than by saving the
+# session on every request (SESSION_SAVE_EVERY_REQUEST), which cost a write per page.
+SESSION_SAVE_EVERY_REQUEST = False
+SESSION_REFRESH_INTERVAL = 60
 # --- END SESSION TIMEOUT CONFIGURATION ---
 
 # LOGGING = {
@@ -3,5 +3,8 @@
 echo "Running database migrations..."
 python manage.py migrate --noinput
 
+echo "Syncing FCM topic subscriptions..."
+python manage.py sync_fcm_topics
+
 echo "Starting Gunicorn..."
 exec gunicorn digita_admin.wsgi:application --bind 0.0.0.0:8000
@@ -3,6 +3,8 @@ import os
 import django
 import random
 import io
+import hashlib
+import requests
 from locust import HttpUser, task, between, events
 
 # --- Setup Django Environment ---
@@ -101,6 +103,40 @@ class DokumenUploadUser(HttpUser):
                 name="/api/v1/tugas-akhir/dokumen/ [CREATE]"
             )
 
+    @task
+    def upload_document_direct(self):
+        """
+        Task to upload a document straight to S3 using the two-phase API
+        (initiate -> presigned POST -> finalize). Django never sees the bytes.
+        """
+        if not self.token:
+            return
+
+        headers = {"Authorization": f"Bearer {self.token}"}
+        bab_choice = random.choice(Dokumen.BAB_CHOICES)[0]
+        content = b"This is the content of the test document."
+        file_name = f"test_document_{bab_choice}.pdf"
+
+        response = self.client.post(
+            "/api/v1/tugas-akhir/dokumen/upload/initiate/",
+            json={"bab": bab_choice, "file_name": file_name, "sha256": hashlib.sha256(content).hexdigest()},
+            headers=headers,
+            name="/api/v1/tugas-akhir/dokumen/upload/initiate/"
+        )
+        if response.status_code != 200:
+            return
+        upload = response.json()
+
+        # The S3 upload is not part of the measured Django endpoints.
+        requests.post(upload["url"], data=upload["fields"], files={"file": (file_name, content, "application/pdf")})
+
+        self.client.post(
+            "/api/v1/tugas-akhir/dokumen/upload/finalize/",
+            json={"key": upload["key"], "bab": bab_choice, "nama_dokumen": f"Dokumen untuk {bab_choice}"},
+            headers=headers,
+            name="/api/v1/tugas-akhir/dokumen/upload/finalize/"
+        )
+
     def on_stop(self):
         """
         Cleans up all created test data for this user.
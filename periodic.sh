@@ -0,0 +1,14 @@
+#!/bin/sh
+# Runs the periodic maintenance commands once every PERIODIC_INTERVAL
+# seconds (default: daily). Used by the `periodic` service in docker-compose.
+
+INTERVAL=${PERIODIC_INTERVAL:-86400}
+
+while true; do
+    echo "Running periodic tasks..."
+    python manage.py reconcile_dashboard_stats
+    python manage.py prune_sync_tombstones
+    python manage.py prune_orphan_blobs
+    python manage.py prune_export_jobs
+    sleep "$INTERVAL"
+done
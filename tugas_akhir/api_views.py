@@ -1,14 +1,26 @@
 # tugas_akhir/api_views.py
-import boto3
+import os
+import uuid
+
 from botocore.exceptions import ClientError
 from django.db import transaction
+from django.db.models import F, Q
 from rest_framework import generics, permissions, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.exceptions import PermissionDenied, ValidationError
 from rest_framework.response import Response
 from rest_framework import serializers
 from django.conf import settings
-from core.firebase_utils import send_notification_to_user
+from core.conditional import ConditionalGetMixin
+from core.outbox import enqueue_notification
+from users.profiles import get_request_profile
+from core.storage import promote_upload_to_blob
+from core.s3 import (
+    attachment_disposition, checksum_sha256_hex, generate_presigned_post,
+    get_presigned_url, head_object
+)
+from .checklist import get_status_checklist
+from .progress import get_supervision_progress
 from .models import Dokumen, RequestDosen, TugasAkhir, Mahasiswa, JadwalBimbingan, Ruangan
 from .permissions import (
     IsDokumenOwner, IsDosen, IsMahasiswa, IsMahasiswaOrDosen,
@@ -20,9 +32,23 @@ from .serializers import (
     DokumenSerializer, DokumenStatusUpdateSerializer, RequestDosenCreateSerializer,
     RequestDosenListSerializer, RequestDosenRespondSerializer, SupervisedMahasiswaSerializer,
     JadwalBimbinganCreateSerializer, JadwalBimbinganListSerializer, JadwalBimbinganDosenResponseSerializer,
-    JadwalBimbinganDosenCompleteSerializer, RuanganSerializer, JadwalBimbinganRescheduleSerializer
+    JadwalBimbinganDosenCompleteSerializer, RuanganSerializer, JadwalBimbinganRescheduleSerializer,
+    DokumenUploadInitiateSerializer, DokumenUploadFinalizeSerializer, direct_upload_prefix
 )
 
+# --- Lookup endpoints ---
+class RuanganListView(ConditionalGetMixin, generics.ListAPIView):
+    """
+    Lists all available rooms. Clients revalidate with ETag/Last-Modified
+    and get an empty 304 while no room has changed.
+    """
+    queryset = Ruangan.objects.all()
+    serializer_class = RuanganSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = None  # Small lookup table, returned in full
+    conditional_private = True
+
+
 # --- View to list supervised students ---
 class SupervisedStudentsListView(generics.ListAPIView):
     """
@@ -31,16 +57,31 @@ class SupervisedStudentsListView(generics.ListAPIView):
     """
     serializer_class = SupervisedMahasiswaSerializer
     permission_classes = [permissions.IsAuthenticated, IsDosen]
+    # Alphabetical by first name; NIM is unique and breaks ties.
+    cursor_ordering = ('nama_depan', 'nim')
 
     def get_queryset(self):
         """
         Returns a queryset of Mahasiswa who are being supervised by the
         currently authenticated Dosen.
         """
-        user = self.request.user
         return Mahasiswa.objects.filter(
-            tugas_akhir__dosen_pembimbing=user.dosen_profile
-        ).select_related('user', 'program_studi', 'tugas_akhir').order_by('user__first_name')
+            tugas_akhir__dosen_pembimbing_id=self.request.user.pk
+        ).select_related('user', 'program_studi', 'tugas_akhir').annotate(
+            nama_depan=F('user__first_name')
+        ).order_by('nama_depan', 'nim')
+
+class SupervisionProgressView(generics.GenericAPIView):
+    """
+    Progress dashboard for a logged-in Dosen: for every supervised Mahasiswa,
+    the status of each chapter, the latest upload time and the number of
+    pending guidance schedules, from one aggregate query (see
+    tugas_akhir.progress). Replaces a `dokumen/?mahasiswa_id=` call per student.
+    """
+    permission_classes = [permissions.IsAuthenticated, IsDosen]
+
+    def get(self, request, *args, **kwargs):
+        return Response(get_supervision_progress(request.user.pk))
 
 class SupervisionRequestListCreateView(generics.ListCreateAPIView):
     """
@@ -50,17 +91,19 @@ class SupervisionRequestListCreateView(generics.ListCreateAPIView):
     - POST: Creates a new supervision request (for Mahasiswa only).
     """
     permission_classes = [permissions.IsAuthenticated, IsMahasiswaOrDosen]
+    cursor_ordering = ('-created_at', '-id')
 
     def get_queryset(self):
         """Dynamically filters the queryset based on the user's role."""
         user = self.request.user
-        if hasattr(user, 'mahasiswa_profile'):
-            return RequestDosen.objects.filter(mahasiswa=user.mahasiswa_profile).select_related('mahasiswa__user', 'dosen__user')
+        profile = get_request_profile(self.request)
+        if profile.is_mahasiswa:
+            return RequestDosen.objects.filter(mahasiswa_id=user.pk).select_related('mahasiswa__user', 'dosen__user')
 
-        if hasattr(user, 'dosen_profile'):
+        if profile.is_dosen:
             # Modifikasi: Dosen sekarang hanya dapat melihat permintaan dengan status PENDING.
             return RequestDosen.objects.filter(
-                dosen=user.dosen_profile,
+                dosen_id=user.pk,
                 status='PENDING'
             ).select_related('mahasiswa__user', 'dosen__user')
 
@@ -71,8 +114,8 @@ class SupervisionRequestListCreateView(generics.ListCreateAPIView):
         return RequestDosenListSerializer
 
     def perform_create(self, serializer):
-        mahasiswa_profile = self.request.user.mahasiswa_profile
-        if TugasAkhir.objects.filter(mahasiswa=mahasiswa_profile).exists():
+        mahasiswa_profile = get_request_profile(self.request).mahasiswa
+        if getattr(mahasiswa_profile, 'tugas_akhir', None) is not None:
             raise ValidationError("Anda sudah terdaftar dalam proses Tugas Akhir.")
         if RequestDosen.objects.filter(mahasiswa=mahasiswa_profile, status='PENDING').exists():
             raise ValidationError("Anda sudah memiliki permintaan pembimbing yang PENDING.")
@@ -92,7 +135,7 @@ class SupervisionRequestListCreateView(generics.ListCreateAPIView):
                 'screen': 'supervision_request_detail'
             }
 
-            send_notification_to_user(
+            enqueue_notification(
                 user=recipient_user,
                 title=title,
                 body=body,
@@ -158,7 +201,7 @@ class SupervisionRequestDetailUpdateView(generics.RetrieveUpdateAPIView):
                 'screen': 'supervision_request_detail'
             }
 
-            send_notification_to_user(
+            enqueue_notification(
                 user=recipient_user,
                 title=title,
                 body=body,
@@ -173,6 +216,9 @@ class DokumenViewSet(viewsets.ModelViewSet):
     Manages documents for a thesis (Tugas Akhir).
     """
     serializer_class = DokumenSerializer
+    # Grouped per student and ordered by chapter; a student has at most one
+    # document per BAB, so the cursor only ever skips a handful of ties.
+    cursor_ordering = ('pemilik_id', 'bab', 'id')
 
     def get_queryset(self):
         """
@@ -181,13 +227,14 @@ class DokumenViewSet(viewsets.ModelViewSet):
         - Dosen can see documents of the students they supervise.
         """
         user = self.request.user
+        profile = get_request_profile(self.request)
         queryset = Dokumen.objects.none() # Start with an empty queryset
 
-        if hasattr(user, 'mahasiswa_profile'):
+        if profile.is_mahasiswa:
             # Mahasiswa can only see their own documents
-            queryset = Dokumen.objects.filter(pemilik=user.mahasiswa_profile)
+            queryset = Dokumen.objects.filter(pemilik_id=user.pk)
 
-        elif hasattr(user, 'dosen_profile'):
+        elif profile.is_dosen:
             # Dosen can see documents of students they supervise.
             # Check for the filter first.
             mahasiswa_id = self.request.query_params.get('mahasiswa_id')
@@ -196,15 +243,15 @@ class DokumenViewSet(viewsets.ModelViewSet):
                 # but ensure the Dosen is actually their supervisor.
                 queryset = Dokumen.objects.filter(
                     pemilik_id=mahasiswa_id,
-                    tugas_akhir__dosen_pembimbing=user.dosen_profile
+                    tugas_akhir__dosen_pembimbing_id=user.pk
                 )
             else:
                 # If not filtered, show all documents from all supervised students.
                 queryset = Dokumen.objects.filter(
-                    tugas_akhir__dosen_pembimbing=user.dosen_profile
+                    tugas_akhir__dosen_pembimbing_id=user.pk
                 )
 
-        return queryset.select_related('pemilik__user', 'tugas_akhir').order_by('bab')
+        return queryset.select_related('pemilik__user', 'pemilik__program_studi', 'tugas_akhir').order_by('bab')
 
     def get_permissions(self):
         """Assigns permissions based on the requested action."""
@@ -212,9 +259,11 @@ class DokumenViewSet(viewsets.ModelViewSet):
             self.permission_classes = [permissions.IsAuthenticated, IsSupervisingDosen]
         elif self.action == 'access_file':
             self.permission_classes = [permissions.IsAuthenticated, IsOwnerOrSupervisingDosen]
+        elif self.action == 'access_files':
+            self.permission_classes = [permissions.IsAuthenticated, IsMahasiswaOrDosen]
         elif self.action == 'status_checklist':
             self.permission_classes = [permissions.IsAuthenticated, IsMahasiswa]
-        elif self.action == 'create':
+        elif self.action in ['create', 'upload_initiate', 'upload_finalize']:
             self.permission_classes = [permissions.IsAuthenticated, IsMahasiswa]
         elif self.action in ['update', 'partial_update', 'destroy']:
             self.permission_classes = [permissions.IsAuthenticated, IsDokumenOwner]
@@ -224,13 +273,22 @@ class DokumenViewSet(viewsets.ModelViewSet):
             self.permission_classes = [permissions.IsAuthenticated, IsMahasiswaOrDosen]
         return super().get_permissions()
 
+    def get_serializer_context(self):
+        """Enables inline pre-signed URLs in DokumenSerializer with `?inline_urls=1`."""
+        context = super().get_serializer_context()
+        context['inline_urls'] = self.request.query_params.get('inline_urls') in ('1', 'true')
+        return context
+
     def perform_create(self, serializer):
         """
         Saves the new document instance and notifies the supervising Dosen.
         """
         # The serializer.save() returns the created object instance
         new_document = serializer.save()
+        self._notify_new_document(new_document)
 
+    def _notify_new_document(self, new_document):
+        """Queues a push notification to the supervising Dosen about a new upload."""
         # --- 🚀 NOTIFICATION LOGIC FOR DOSEN ---
         try:
             # Ensure the thesis and supervisor exist
@@ -247,7 +305,7 @@ class DokumenViewSet(viewsets.ModelViewSet):
                     'screen': 'document_list_for_student'
                 }
 
-                send_notification_to_user(
+                enqueue_notification(
                     user=recipient_user,
                     title=title,
                     body=body,
@@ -294,7 +352,7 @@ class DokumenViewSet(viewsets.ModelViewSet):
                     'screen': 'document_detail'
                 }
 
-                send_notification_to_user(
+                enqueue_notification(
                     user=recipient_user,
                     title=title,
                     body=body,
@@ -321,56 +379,176 @@ class DokumenViewSet(viewsets.ModelViewSet):
         if not document.file:
             return Response({"error": "File tidak ditemukan untuk dokumen ini."}, status=status.HTTP_404_NOT_FOUND)
 
-        s3_client = boto3.client('s3', region_name=settings.AWS_S3_REGION_NAME)
-        params = {
-            'Bucket': settings.AWS_STORAGE_BUCKET_NAME,
-            'Key': document.file.name,
-        }
-
+        disposition = ''
         if request.query_params.get('action') == 'download':
-            file_name = document.file.name.split('/')[-1]
-            params['ResponseContentDisposition'] = f'attachment; filename="{file_name}"'
+            disposition = attachment_disposition(document.file_name)
 
         try:
-            url = s3_client.generate_presigned_url('get_object', Params=params, ExpiresIn=900)
+            url = get_presigned_url(document.file.name, disposition, site='api.access_file')
             return Response({'url': url})
         except ClientError as e:
             print(f"Error generating pre-signed URL: {e}")
             return Response({"error": "Tidak dapat membuat link aman untuk file tersebut."}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+    @action(detail=False, methods=['post'], url_path='upload/initiate', url_name='upload-initiate')
+    def upload_initiate(self, request):
+        """
+        Phase one of a direct-to-S3 upload. Returns a pre-signed POST that
+        only accepts a PDF of at most 2MB, matching the given SHA-256, under a
+        fresh key in 'dokumen_ta/'. The file never passes through this server.
+        """
+        serializer = DokumenUploadInitiateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        if getattr(get_request_profile(request).mahasiswa, 'tugas_akhir', None) is None:
+            raise ValidationError("Anda tidak memiliki data Tugas Akhir yang aktif untuk mengunggah dokumen.")
+
+        key = f"{direct_upload_prefix(request.user)}{uuid.uuid4().hex}/{serializer.validated_data['file_name']}"
+        try:
+            presigned_post = generate_presigned_post(
+                key, 'application/pdf', settings.DOKUMEN_UPLOAD_MAX_SIZE,
+                checksum_sha256=serializer.validated_data['sha256'],
+            )
+        except ClientError as e:
+            print(f"Error generating pre-signed POST: {e}")
+            return Response({"error": "Tidak dapat menyiapkan unggahan file."}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        return Response({
+            'key': key,
+            'url': presigned_post['url'],
+            'fields': presigned_post['fields'],
+            'expires_in': settings.S3_PRESIGNED_POST_EXPIRY,
+        })
+
+    @action(detail=False, methods=['post'], url_path='upload/finalize', url_name='upload-finalize')
+    def upload_finalize(self, request):
+        """
+        Phase two of a direct-to-S3 upload. Verifies the uploaded object with a
+        HEAD request, records its SHA-256 checksum as `file_hash`, moves it to
+        its content-addressed key and creates the Dokumen for the chapter, or
+        updates it if one already exists.
+        """
+        serializer = DokumenUploadFinalizeSerializer(data=request.data, context={'request': request})
+        serializer.is_valid(raise_exception=True)
+        key = serializer.validated_data['key']
+
+        try:
+            metadata = head_object(key)
+        except ClientError:
+            raise ValidationError({'key': "File belum diunggah ke penyimpanan."})
+
+        if metadata.get('ContentLength', 0) > settings.DOKUMEN_UPLOAD_MAX_SIZE:
+            raise ValidationError({'key': "Ukuran file maksimal adalah 2MB."})
+        if metadata.get('ContentType') != 'application/pdf':
+            raise ValidationError({'key': "File harus dalam format PDF."})
+        file_hash = checksum_sha256_hex(metadata)
+        if not file_hash:
+            raise ValidationError({'key': "Checksum file tidak ditemukan. Unggah ulang file melalui 'initiate'."})
+
+        # Move the upload to its content-addressed key; identical content that is
+        # already stored is reused and the new copy discarded. The key from
+        # 'initiate' ends in the client's file name, which the blob key drops.
+        file_name = os.path.basename(key)
+        try:
+            key = promote_upload_to_blob(key, file_hash)
+        except ClientError as e:
+            print(f"Error moving upload to blob store: {e}")
+            return Response({"error": "Tidak dapat menyimpan file yang diunggah."}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        validated_data = {
+            'nama_dokumen': serializer.validated_data['nama_dokumen'],
+            'file': key,
+            'file_name': file_name,
+            'file_hash': file_hash,
+        }
+        document_serializer = DokumenSerializer(context=self.get_serializer_context())
+        existing = Dokumen.objects.filter(
+            pemilik__user_id=request.user.pk, bab=serializer.validated_data['bab']
+        ).select_related('tugas_akhir__dosen_pembimbing__user', 'pemilik__user').first()
+
+        if existing:
+            # Same flow as re-uploading through the API: status resets to Pending.
+            document = document_serializer.update(existing, validated_data)
+            response_status = status.HTTP_200_OK
+        else:
+            document = document_serializer.create({**validated_data, 'bab': serializer.validated_data['bab']})
+            self._notify_new_document(document)
+            response_status = status.HTTP_201_CREATED
+
+        return Response(DokumenSerializer(document, context=self.get_serializer_context()).data, status=response_status)
+
+    @action(detail=False, methods=['get', 'post'], url_path='access-files')
+    def access_files(self, request):
+        """
+        Generates pre-signed URLs for several documents in one request.
+        Accepts either a list of document 'ids' (a JSON list on POST, or a
+        comma-separated '?ids=1,2,3' on GET) or a 'mahasiswa_id' to fetch all
+        of a student's documents. Ownership and supervision are checked with a
+        single queryset; ids the user may not access are reported in 'missing'.
+        Accepts a '?action=download' query parameter to force download.
+        """
+        params = request.data if request.method == 'POST' else request.query_params
+        ids = params.get('ids')
+        mahasiswa_id = params.get('mahasiswa_id')
+
+        if isinstance(ids, str):
+            ids = [value for value in ids.split(',') if value.strip()]
+        if not ids and not mahasiswa_id:
+            return Response({"error": "Parameter 'ids' atau 'mahasiswa_id' wajib diisi."}, status=status.HTTP_400_BAD_REQUEST)
+
+        max_ids = getattr(settings, 'DOKUMEN_ACCESS_FILES_MAX_IDS', 50)
+        try:
+            ids = [int(value) for value in ids or []]
+            mahasiswa_id = int(mahasiswa_id) if mahasiswa_id else None
+        except (TypeError, ValueError):
+            return Response({"error": "Parameter 'ids' dan 'mahasiswa_id' harus berupa angka."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(ids) > max_ids:
+            return Response({"error": f"Maksimal {max_ids} dokumen per permintaan."}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Documents the user owns or supervises, resolved in one query.
+        user = request.user
+        documents = Dokumen.objects.filter(
+            Q(pemilik__user_id=user.pk) | Q(tugas_akhir__dosen_pembimbing__user_id=user.pk)
+        )
+        if ids:
+            documents = documents.filter(pk__in=ids)
+        if mahasiswa_id:
+            documents = documents.filter(pemilik_id=mahasiswa_id)
+        documents = documents.only('id', 'bab', 'file', 'file_name').order_by('bab')
+
+        download = request.query_params.get('action') == 'download'
+        results = []
+        for document in documents:
+            if not document.file:
+                continue
+            disposition = attachment_disposition(document.file_name) if download else ''
+            try:
+                url = get_presigned_url(document.file.name, disposition, site='api.access_files')
+            except ClientError as e:
+                print(f"Error generating pre-signed URL: {e}")
+                return Response({"error": "Tidak dapat membuat link aman untuk file tersebut."}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            results.append({'id': document.pk, 'bab': document.bab, 'url': url})
+
+        found = {result['id'] for result in results}
+        return Response({
+            'results': results,
+            'missing': [pk for pk in ids if pk not in found],
+        })
+
     @action(detail=False, methods=['get'], url_path='status-checklist')
     def status_checklist(self, request):
         """
         Provides a checklist of all required chapters and their upload status for the
         requesting Mahasiswa.
         """
-        mahasiswa = request.user.mahasiswa_profile
-        uploaded_docs = {doc.bab: doc for doc in Dokumen.objects.filter(pemilik=mahasiswa)}
-        all_babs = Dokumen.BAB_CHOICES
-        checklist_data = []
-
-        for bab_code, bab_display_name in all_babs:
-            if bab_code in uploaded_docs:
-                document = uploaded_docs[bab_code]
-                serializer = self.get_serializer(document)
-                checklist_data.append({
-                    'bab': bab_code,
-                    'is_uploaded': True,
-                    'document_details': serializer.data
-                })
-            else:
-                checklist_data.append({
-                    'bab': bab_code,
-                    'is_uploaded': False,
-                    'document_details': None
-                })
-        return Response(checklist_data)
+        return Response(get_status_checklist(request.user.pk, self.get_serializer_context()))
 
 class JadwalBimbinganViewSet(viewsets.ModelViewSet):
     """
     Manages guidance schedule (Jadwal Bimbingan) for students and lecturers.
     """
     http_method_names = ['get', 'post', 'patch', 'head', 'options']
+    cursor_ordering = ('-tanggal', '-waktu', '-id')
 
     def get_queryset(self):
         """
@@ -378,10 +556,11 @@ class JadwalBimbinganViewSet(viewsets.ModelViewSet):
         - Dosen sees incoming schedule requests from their students.
         """
         user = self.request.user
-        if hasattr(user, 'mahasiswa_profile'):
-            return JadwalBimbingan.objects.filter(mahasiswa=user.mahasiswa_profile).select_related('mahasiswa__user', 'dosen_pembimbing__user', 'lokasi_ruangan')
-        if hasattr(user, 'dosen_profile'):
-            return JadwalBimbingan.objects.filter(dosen_pembimbing=user.dosen_profile).select_related('mahasiswa__user', 'dosen_pembimbing__user', 'lokasi_ruangan')
+        profile = get_request_profile(self.request)
+        if profile.is_mahasiswa:
+            return JadwalBimbingan.objects.filter(mahasiswa_id=user.pk).select_related('mahasiswa__user', 'mahasiswa__program_studi', 'dosen_pembimbing__user', 'lokasi_ruangan')
+        if profile.is_dosen:
+            return JadwalBimbingan.objects.filter(dosen_pembimbing_id=user.pk).select_related('mahasiswa__user', 'mahasiswa__program_studi', 'dosen_pembimbing__user', 'lokasi_ruangan')
         return JadwalBimbingan.objects.none()
 
     def get_serializer_class(self):
@@ -436,7 +615,7 @@ class JadwalBimbinganViewSet(viewsets.ModelViewSet):
                 'screen': 'guidance_schedule_detail'
             }
 
-            send_notification_to_user(
+            enqueue_notification(
                 user=recipient_user,
                 title=title,
                 body=body,
@@ -470,7 +649,7 @@ class JadwalBimbinganViewSet(viewsets.ModelViewSet):
                 'screen': 'guidance_schedule_detail'
             }
 
-            send_notification_to_user(
+            enqueue_notification(
                 user=recipient_user,
                 title=title,
                 body=body,
@@ -508,7 +687,7 @@ class JadwalBimbinganViewSet(viewsets.ModelViewSet):
                 'screen': 'guidance_schedule_detail'
             }
 
-            send_notification_to_user(
+            enqueue_notification(
                 user=recipient_user,
                 title=title,
                 body=body,
@@ -0,0 +1,54 @@
+# tugas_akhir/checklist.py
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Dokumen
+from .serializers import DokumenSerializer
+
+
+def status_checklist_cache_key(mahasiswa_id):
+    return f"tugas_akhir:status_checklist:{mahasiswa_id}"
+
+
+def forget_status_checklist(mahasiswa_id):
+    """Drops a student's cached checklist, e.g. after one of their documents changed."""
+    cache.delete(status_checklist_cache_key(mahasiswa_id))
+
+
+def build_status_checklist(mahasiswa_id, context):
+    """
+    One entry per required chapter (Dokumen.BAB_CHOICES) saying whether the
+    student has uploaded it, with the document details if so. The documents
+    are loaded with their owner, user and prodi in one joined query and
+    serialized in a single pass; `context` is the DokumenSerializer context.
+    """
+    documents = Dokumen.objects.filter(pemilik_id=mahasiswa_id).select_related('pemilik__user', 'pemilik__program_studi')
+    details = {item['bab']: dict(item) for item in DokumenSerializer(documents, many=True, context=context).data}
+    return [
+        {'bab': bab_code, 'is_uploaded': bab_code in details, 'document_details': details.get(bab_code)}
+        for bab_code, _ in Dokumen.BAB_CHOICES
+    ]
+
+
+def get_status_checklist(mahasiswa_id, context):
+    """
+    `build_status_checklist`, cached per student for STATUS_CHECKLIST_CACHE_TTL
+    seconds (0 disables the cache). Entries are dropped by the Dokumen,
+    Mahasiswa and User signals in core.signals. `file_url` is absolute, so an
+    entry is only reused for the same host; inline pre-signed URLs expire and
+    are never cached.
+    """
+    ttl = getattr(settings, 'STATUS_CHECKLIST_CACHE_TTL', 0)
+    if not ttl or context.get('inline_urls'):
+        return build_status_checklist(mahasiswa_id, context)
+
+    key = status_checklist_cache_key(mahasiswa_id)
+    base_url = context['request'].build_absolute_uri('/')
+    cached = cache.get(key)
+    if cached and cached[0] == base_url:
+        return cached[1]
+
+    checklist = build_status_checklist(mahasiswa_id, context)
+    cache.set(key, (base_url, checklist), ttl)
+    return checklist
@@ -3,6 +3,7 @@ from .models import Dokumen
 from django.db import transaction
 from core.models import ActivityLog
 from django.contrib.auth.models import User
+from core.storage import uploaded_file_name
 from core.utils import calculate_file_hash
 from .models import Dokumen, TugasAkhir, Dosen
 from crum import get_current_user
@@ -61,8 +62,8 @@ class DokumenEditForm(forms.ModelForm):
 
         if old_hash != new_hash:
             updated_dokumen.file_hash = new_hash
-            old_filename = old_dokumen.file.name.split('/')[-1] if old_dokumen.file else "No File"
-            new_filename = updated_dokumen.file.name.split('/')[-1] if updated_dokumen.file else "No File"
+            old_filename = uploaded_file_name(old_dokumen.file, old_dokumen.file_name) or "No File"
+            new_filename = uploaded_file_name(updated_dokumen.file, updated_dokumen.file_name) or "No File"
             changes.append(f"File: '{old_filename}' -> '{new_filename}'")
 
         # Logic for other fields
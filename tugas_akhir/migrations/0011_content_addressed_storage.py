@@ -0,0 +1,21 @@
+# Generated by Django 5.2 on 2026-10-18 16:51
+
+import core.storage
+import django.core.validators
+import tugas_akhir.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tugas_akhir', '0010_ruangan_jadwalbimbingan'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='dokumen',
+            name='file',
+            field=models.FileField(db_index=True, help_text='The uploaded document file', storage=core.storage.ContentAddressedS3Storage(), upload_to='dokumen_ta/', validators=[tugas_akhir.models.validate_file_size, django.core.validators.FileExtensionValidator(allowed_extensions=['pdf'], message='File harus dalam format PDF.')]),
+        ),
+    ]
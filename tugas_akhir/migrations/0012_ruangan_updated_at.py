@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-18 17:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tugas_akhir', '0011_content_addressed_storage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ruangan',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2 on 2026-10-18 17:54
+
+from django.db import migrations, models
+
+
+def backfill_updated_at(apps, schema_editor):
+    # Existing documents were last changed no earlier than their upload.
+    Dokumen = apps.get_model('tugas_akhir', 'Dokumen')
+    Dokumen.objects.update(updated_at=models.F('uploaded_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tugas_akhir', '0012_ruangan_updated_at'),
+        ('users', '0005_lookup_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dokumen',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.RunPython(backfill_updated_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='dokumen',
+            index=models.Index(fields=['pemilik', 'updated_at'], name='dokumen_sync_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jadwalbimbingan',
+            index=models.Index(fields=['mahasiswa', 'updated_at'], name='jadwal_mhs_sync_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jadwalbimbingan',
+            index=models.Index(fields=['dosen_pembimbing', 'updated_at'], name='jadwal_dosen_sync_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='requestdosen',
+            index=models.Index(fields=['mahasiswa', 'updated_at'], name='request_mhs_sync_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='requestdosen',
+            index=models.Index(fields=['dosen', 'updated_at'], name='request_dosen_sync_idx'),
+        ),
+    ]
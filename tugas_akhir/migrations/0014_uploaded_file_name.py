@@ -0,0 +1,36 @@
+# Generated by Django 5.2 on 2026-10-18 18:29
+
+import os
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_file_name(apps, schema_editor):
+    # Keys from before the blob store still end in the uploaded name; blob keys
+    # only hold the hash, so those fall back to the document's name.
+    Dokumen = apps.get_model('tugas_akhir', 'Dokumen')
+    prefix = getattr(settings, 'BLOB_STORE_PREFIX', 'blobs/')
+    for document in Dokumen.objects.exclude(file='').exclude(file__isnull=True).only('pk', 'file', 'nama_dokumen').iterator():
+        key = document.file.name
+        name = os.path.basename(key)
+        if key.startswith(prefix):
+            stem, extension = os.path.splitext(document.nama_dokumen)
+            name = f"{stem}{extension or os.path.splitext(key)[1]}"
+        Dokumen.objects.filter(pk=document.pk).update(file_name=name)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tugas_akhir', '0013_sync_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dokumen',
+            name='file_name',
+            field=models.CharField(blank=True, editable=False, help_text='Original name of the uploaded file; the storage key only holds its hash', max_length=255),
+        ),
+        migrations.RunPython(backfill_file_name, migrations.RunPython.noop),
+    ]
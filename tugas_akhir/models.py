@@ -5,7 +5,7 @@ from users.models import Mahasiswa, Dosen
 from django.core.exceptions import ValidationError
 from django.core.validators import FileExtensionValidator
 from django.db.models import UniqueConstraint
-from storages.backends.s3boto3 import S3Boto3Storage
+from core.storage import ContentAddressedS3Storage
 
 def validate_file_size(value):
     """
@@ -24,6 +24,7 @@ class Ruangan(models.Model):
     nama_ruangan = models.CharField(max_length=100, unique=True)
     gedung = models.CharField(max_length=100, blank=True, null=True)
     keterangan = models.TextField(blank=True, null=True, help_text="Informasi tambahan seperti kapasitas atau fasilitas.")
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"{self.nama_ruangan}{f' ({self.gedung})' if self.gedung else ''}"
@@ -64,6 +65,11 @@ class JadwalBimbingan(models.Model):
         ordering = ['-tanggal', '-waktu']
         verbose_name = "Jadwal Bimbingan"
         verbose_name_plural = "Jadwal Bimbingan"
+        indexes = [
+            # Delta sync (core.sync): a user's rows changed since a watermark.
+            models.Index(fields=['mahasiswa', 'updated_at'], name='jadwal_mhs_sync_idx'),
+            models.Index(fields=['dosen_pembimbing', 'updated_at'], name='jadwal_dosen_sync_idx'),
+        ]
 
 # --- Model TugasAkhir ---
 class TugasAkhir(models.Model):
@@ -105,6 +111,11 @@ class RequestDosen(models.Model):
             models.UniqueConstraint(fields=['mahasiswa'], condition=Q(status='PENDING'), name='unique_pending_request_per_mahasiswa')
         ]
         ordering = ['-created_at']
+        indexes = [
+            # Delta sync (core.sync): a user's rows changed since a watermark.
+            models.Index(fields=['mahasiswa', 'updated_at'], name='request_mhs_sync_idx'),
+            models.Index(fields=['dosen', 'updated_at'], name='request_dosen_sync_idx'),
+        ]
 
     def __str__(self):
         return f"Request from {self.mahasiswa.nim} to {self.dosen.nik} ({self.status})"
@@ -138,7 +149,8 @@ class Dokumen(models.Model):
 
     file = models.FileField(
         upload_to='dokumen_ta/',
-        storage=S3Boto3Storage(),
+        storage=ContentAddressedS3Storage(),
+        db_index=True,  # Blob reference counting looks documents up by key
         help_text="The uploaded document file",
         validators=[
             validate_file_size,
@@ -148,6 +160,10 @@ class Dokumen(models.Model):
             )
         ]
     )
+    file_name = models.CharField(
+        max_length=255, blank=True, editable=False,
+        help_text="Original name of the uploaded file; the storage key only holds its hash"
+    )
     file_hash = models.CharField(max_length=64, blank=True, editable=False)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='Pending', help_text="Approval status of the document", db_index=True)
     catatan_revisi = models.TextField(
@@ -156,6 +172,7 @@ class Dokumen(models.Model):
     )
     pemilik = models.ForeignKey(Mahasiswa, on_delete=models.CASCADE, related_name='dokumen_mahasiswa', help_text="The student who owns this document")
     uploaded_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"{self.nama_dokumen} ({self.get_bab_display()}) - {self.pemilik.user.get_full_name()}"
@@ -169,4 +186,8 @@ class Dokumen(models.Model):
                 fields=['pemilik', 'bab'],
                 name='unique_bab_per_mahasiswa'
             )
+        ]
+        indexes = [
+            # Delta sync (core.sync): a student's documents changed since a watermark.
+            models.Index(fields=['pemilik', 'updated_at'], name='dokumen_sync_idx'),
         ]
\ No newline at end of file
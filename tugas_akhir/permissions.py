@@ -1,19 +1,25 @@
 from rest_framework import permissions
 from rest_framework.permissions import SAFE_METHODS
 
+from users.profiles import get_request_profile
+
+# Mahasiswa and Dosen use their user as primary key, so ownership checks
+# compare foreign key ids with `request.user.pk` instead of loading profiles.
+# Roles come from the request-scoped resolver in users.profiles.
+
 class IsMahasiswa(permissions.BasePermission):
     """Allows access only to authenticated users with a Mahasiswa profile."""
     message = "Akses hanya untuk Mahasiswa."
 
     def has_permission(self, request, view):
-        return request.user and request.user.is_authenticated and hasattr(request.user, 'mahasiswa_profile')
+        return get_request_profile(request).is_mahasiswa
 
 class IsDosen(permissions.BasePermission):
     """Allows access only to authenticated users with a Dosen profile."""
     message = "Akses hanya untuk Dosen."
 
     def has_permission(self, request, view):
-        return request.user and request.user.is_authenticated and hasattr(request.user, 'dosen_profile')
+        return get_request_profile(request).is_dosen
 
 class IsRequestRecipientOrAdmin(permissions.BasePermission):
     """
@@ -25,10 +31,7 @@ class IsRequestRecipientOrAdmin(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
         if request.user and request.user.is_staff:
             return True
-        return (
-                hasattr(request.user, 'dosen_profile') and
-                obj.dosen == request.user.dosen_profile
-        )
+        return get_request_profile(request).is_dosen and obj.dosen_id == request.user.pk
 
 class IsMahasiswaOrDosen(permissions.BasePermission):
     """
@@ -37,10 +40,8 @@ class IsMahasiswaOrDosen(permissions.BasePermission):
     message = "Akses hanya untuk Mahasiswa atau Dosen."
 
     def has_permission(self, request, view):
-        is_authenticated = request.user and request.user.is_authenticated
-        is_mahasiswa = hasattr(request.user, 'mahasiswa_profile')
-        is_dosen = hasattr(request.user, 'dosen_profile')
-        return is_authenticated and (is_mahasiswa or is_dosen)
+        profile = get_request_profile(request)
+        return profile.is_mahasiswa or profile.is_dosen
 
 class IsOwnerOrRecipient(permissions.BasePermission):
     """
@@ -49,16 +50,9 @@ class IsOwnerOrRecipient(permissions.BasePermission):
     message = "Anda tidak memiliki izin untuk melihat permintaan ini."
 
     def has_object_permission(self, request, view, obj):
-        if not (request.user and request.user.is_authenticated):
-            return False
-        is_owner = (
-                hasattr(request.user, 'mahasiswa_profile') and
-                obj.mahasiswa == request.user.mahasiswa_profile
-        )
-        is_recipient = (
-                hasattr(request.user, 'dosen_profile') and
-                obj.dosen == request.user.dosen_profile
-        )
+        profile = get_request_profile(request)
+        is_owner = profile.is_mahasiswa and obj.mahasiswa_id == request.user.pk
+        is_recipient = profile.is_dosen and obj.dosen_id == request.user.pk
         return is_owner or is_recipient
 
 # --- NEW PERMISSIONS FOR DOKUMEN ---
@@ -71,9 +65,9 @@ class IsDokumenOwner(permissions.BasePermission):
     message = "Anda bukan pemilik dokumen ini."
 
     def has_object_permission(self, request, view, obj):
-        if not hasattr(request.user, 'mahasiswa_profile'):
+        if not get_request_profile(request).is_mahasiswa:
             return False
-        return obj.pemilik == request.user.mahasiswa_profile
+        return obj.pemilik_id == request.user.pk
 
 class IsSupervisingDosen(permissions.BasePermission):
     """
@@ -83,10 +77,10 @@ class IsSupervisingDosen(permissions.BasePermission):
     message = "Anda bukan dosen pembimbing untuk mahasiswa pemilik dokumen ini."
 
     def has_object_permission(self, request, view, obj):
-        if not hasattr(request.user, 'dosen_profile'):
+        if not get_request_profile(request).is_dosen:
             return False
         # The document is linked to TugasAkhir, which has the dosen_pembimbing.
-        return obj.tugas_akhir.dosen_pembimbing == request.user.dosen_profile
+        return obj.tugas_akhir.dosen_pembimbing_id == request.user.pk
 
 class IsOwnerOrSupervisingDosen(permissions.BasePermission):
     """
@@ -96,13 +90,14 @@ class IsOwnerOrSupervisingDosen(permissions.BasePermission):
     message = "Anda tidak memiliki izin untuk melihat dokumen ini."
 
     def has_object_permission(self, request, view, obj):
+        profile = get_request_profile(request)
         is_owner = False
-        if hasattr(request.user, 'mahasiswa_profile'):
-            is_owner = (obj.pemilik == request.user.mahasiswa_profile)
+        if profile.is_mahasiswa:
+            is_owner = (obj.pemilik_id == request.user.pk)
 
         is_supervisor = False
-        if hasattr(request.user, 'dosen_profile'):
-            is_supervisor = (obj.tugas_akhir.dosen_pembimbing == request.user.dosen_profile)
+        if profile.is_dosen:
+            is_supervisor = (obj.tugas_akhir.dosen_pembimbing_id == request.user.pk)
 
         return is_owner or is_supervisor
 
@@ -113,9 +108,9 @@ class IsJadwalOwner(permissions.BasePermission):
     message = "Anda bukan pemilik jadwal bimbingan ini."
 
     def has_object_permission(self, request, view, obj):
-        if not hasattr(request.user, 'mahasiswa_profile'):
+        if not get_request_profile(request).is_mahasiswa:
             return False
-        return obj.mahasiswa == request.user.mahasiswa_profile
+        return obj.mahasiswa_id == request.user.pk
 
 class IsJadwalDosen(permissions.BasePermission):
     """
@@ -124,9 +119,9 @@ class IsJadwalDosen(permissions.BasePermission):
     message = "Anda bukan dosen pembimbing untuk jadwal ini."
 
     def has_object_permission(self, request, view, obj):
-        if not hasattr(request.user, 'dosen_profile'):
+        if not get_request_profile(request).is_dosen:
             return False
-        return obj.dosen_pembimbing == request.user.dosen_profile
+        return obj.dosen_pembimbing_id == request.user.pk
 
 class IsJadwalOwnerOrDosen(permissions.BasePermission):
     """
@@ -136,12 +131,13 @@ class IsJadwalOwnerOrDosen(permissions.BasePermission):
     message = "Anda tidak memiliki izin untuk melihat jadwal bimbingan ini."
 
     def has_object_permission(self, request, view, obj):
+        profile = get_request_profile(request)
         is_owner = False
-        if hasattr(request.user, 'mahasiswa_profile'):
-            is_owner = (obj.mahasiswa == request.user.mahasiswa_profile)
+        if profile.is_mahasiswa:
+            is_owner = (obj.mahasiswa_id == request.user.pk)
 
         is_dosen = False
-        if hasattr(request.user, 'dosen_profile'):
-            is_dosen = (obj.dosen_pembimbing == request.user.dosen_profile)
+        if profile.is_dosen:
+            is_dosen = (obj.dosen_pembimbing_id == request.user.pk)
 
         return is_owner or is_dosen
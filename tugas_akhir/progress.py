@@ -0,0 +1,83 @@
+# tugas_akhir/progress.py
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Max, Q
+
+from core.exports import full_name
+from .models import Dokumen
+from users.models import Mahasiswa
+
+# Each chapter is pivoted into its own column; a student has at most one
+# document per chapter, so Max() over the filtered join is that document's status.
+CHAPTER_ALIASES = {bab: f'chapter_{index}' for index, (bab, _) in enumerate(Dokumen.BAB_CHOICES)}
+
+
+def supervision_progress_cache_key(dosen_id):
+    return f"tugas_akhir:supervision_progress:{dosen_id}"
+
+
+def build_supervision_progress(dosen_id):
+    """
+    Progress of every Mahasiswa supervised by the Dosen, from one aggregate
+    query: the status of each chapter (None if not uploaded), per-status
+    document counts, the latest upload time and the number of guidance
+    schedules waiting for the Dosen's approval.
+
+    Both the documents and the schedules are joined, so counts are distinct.
+    """
+    chapter_columns = {
+        alias: Max('dokumen_mahasiswa__status', filter=Q(dokumen_mahasiswa__bab=bab))
+        for bab, alias in CHAPTER_ALIASES.items()
+    }
+    rows = (
+        Mahasiswa.objects
+        .filter(tugas_akhir__dosen_pembimbing_id=dosen_id)
+        .values('user_id', 'nim', 'user__first_name', 'user__last_name', 'program_studi__nama_prodi', 'tugas_akhir__judul')
+        .annotate(
+            latest_upload_at=Max('dokumen_mahasiswa__uploaded_at'),
+            pending_jadwal_count=Count(
+                'jadwal_bimbingan', filter=Q(jadwal_bimbingan__status='PENDING'), distinct=True
+            ),
+            **chapter_columns,
+        )
+        .order_by('user__first_name', 'nim')
+    )
+
+    students = []
+    for row in rows:
+        chapters = {bab: row[alias] for bab, alias in CHAPTER_ALIASES.items()}
+        status_counts = {status: 0 for status, _ in Dokumen.STATUS_CHOICES}
+        for status in chapters.values():
+            if status:
+                status_counts[status] += 1
+        students.append({
+            'user_id': row['user_id'],
+            'nim': row['nim'],
+            'nama_lengkap': full_name(row['user__first_name'], row['user__last_name']),
+            'program_studi': row['program_studi__nama_prodi'],
+            'judul_tugas_akhir': row['tugas_akhir__judul'],
+            'chapters': chapters,
+            'status_counts': status_counts,
+            'latest_upload_at': row['latest_upload_at'],
+            'pending_jadwal_count': row['pending_jadwal_count'],
+        })
+    return {'chapters': [bab for bab, _ in Dokumen.BAB_CHOICES], 'students': students}
+
+
+def get_supervision_progress(dosen_id):
+    """
+    `build_supervision_progress`, cached per Dosen for
+    SUPERVISION_PROGRESS_CACHE_TTL seconds (0 disables the cache). Entries
+    are not invalidated on writes; the TTL bounds how stale the dashboard
+    can be.
+    """
+    ttl = getattr(settings, 'SUPERVISION_PROGRESS_CACHE_TTL', 30)
+    if not ttl:
+        return build_supervision_progress(dosen_id)
+    key = supervision_progress_cache_key(dosen_id)
+    progress = cache.get(key)
+    if progress is None:
+        progress = build_supervision_progress(dosen_id)
+        cache.set(key, progress, ttl)
+    return progress
@@ -1,9 +1,14 @@
+from botocore.exceptions import ClientError
 from rest_framework import serializers
 from users.serializers import JurusanSerializer
 from users.models import Mahasiswa, Dosen, ProgramStudi
-from core.firebase_utils import send_notification_to_user
-from .models import RequestDosen, TugasAkhir, Dokumen, JadwalBimbingan, Ruangan
+from users.profiles import get_request_profile
+from core.outbox import enqueue_notification
+from core.s3 import get_presigned_url
+from core.utils import calculate_file_hash
+from .models import RequestDosen, Dokumen, JadwalBimbingan, Ruangan
 from django.urls import reverse
+from django.utils.text import get_valid_filename
 import datetime
 
 
@@ -130,6 +135,9 @@ class DokumenSerializer(serializers.ModelSerializer):
 
     # NEW: This field provides a secure API endpoint to get the file URL.
     file_url = serializers.SerializerMethodField()
+    # Pre-signed S3 URL, only filled in when the view enables inline-URL mode
+    # (`?inline_urls=1`), saving the client a call to 'access-file' per document.
+    presigned_url = serializers.SerializerMethodField()
 
     # Use write_only for the file upload field. The client won't receive this field on GET.
     file = serializers.FileField(write_only=True, required=False)
@@ -142,16 +150,19 @@ class DokumenSerializer(serializers.ModelSerializer):
             'bab_display',
             'nama_dokumen',
             'file',
+            'file_name',
             'file_url',
+            'presigned_url',
             'status',
             'status_display',
             'catatan_revisi', # Displays the revision notes
             'pemilik_info',
-            'uploaded_at'
+            'uploaded_at',
+            'updated_at'
         ]
         read_only_fields = [
-            'status', 'catatan_revisi', 'pemilik_info', 'uploaded_at',
-            'status_display', 'bab_display', 'file_url'
+            'status', 'catatan_revisi', 'pemilik_info', 'uploaded_at', 'updated_at',
+            'status_display', 'bab_display', 'file_name', 'file_url', 'presigned_url'
         ]
 
     def get_file_url(self, obj):
@@ -168,11 +179,23 @@ class DokumenSerializer(serializers.ModelSerializer):
             )
         return None
 
-    def create(self, validated_data):
-        mahasiswa = self.context['request'].user.mahasiswa_profile
+    def get_presigned_url(self, obj):
+        """
+        Return a pre-signed S3 URL for the file when inline-URL mode is enabled
+        in the serializer context, otherwise None.
+        """
+        if not self.context.get('inline_urls') or not obj.file:
+            return None
         try:
-            tugas_akhir = TugasAkhir.objects.get(mahasiswa=mahasiswa)
-        except TugasAkhir.DoesNotExist:
+            return get_presigned_url(obj.file.name, site='api.dokumen_inline')
+        except ClientError as e:
+            print(f"Error generating pre-signed URL: {e}")
+            return None
+
+    def create(self, validated_data):
+        mahasiswa = get_request_profile(self.context['request']).mahasiswa
+        tugas_akhir = getattr(mahasiswa, 'tugas_akhir', None)
+        if tugas_akhir is None:
             raise serializers.ValidationError("Anda tidak memiliki data Tugas Akhir yang aktif untuk mengunggah dokumen.")
 
         # Add validation to prevent duplicate BAB uploads
@@ -183,6 +206,9 @@ class DokumenSerializer(serializers.ModelSerializer):
         validated_data['pemilik'] = mahasiswa
         validated_data['tugas_akhir'] = tugas_akhir
         validated_data['status'] = 'Pending'
+        if validated_data.get('file') and not validated_data.get('file_hash'):
+            # Digest computed by the upload handler while the request was parsed
+            validated_data['file_hash'] = calculate_file_hash(validated_data['file'])
         return super().create(validated_data)
 
     def update(self, instance, validated_data):
@@ -194,6 +220,9 @@ class DokumenSerializer(serializers.ModelSerializer):
         # Capture the document's status before any changes are made.
         original_status = instance.status
 
+        if validated_data.get('file') and not validated_data.get('file_hash'):
+            validated_data['file_hash'] = calculate_file_hash(validated_data['file'])
+
         # Perform the default update for the fields provided in the request
         instance = super().update(instance, validated_data)
 
@@ -221,7 +250,7 @@ class DokumenSerializer(serializers.ModelSerializer):
                         'screen': 'document_detail'
                     }
 
-                    send_notification_to_user(
+                    enqueue_notification(
                         user=recipient_user,
                         title=title,
                         body=body,
@@ -235,6 +264,47 @@ class DokumenSerializer(serializers.ModelSerializer):
         return instance
 
 
+
+# --- Direct-to-S3 Upload Serializers ---
+class DokumenUploadInitiateSerializer(serializers.Serializer):
+    """
+    Validates a request to upload a chapter straight to S3. The client sends
+    the SHA-256 of the PDF so S3 can verify the upload against it.
+    """
+    bab = serializers.ChoiceField(choices=Dokumen.BAB_CHOICES)
+    file_name = serializers.CharField(max_length=200)
+    sha256 = serializers.RegexField(r'^[0-9a-fA-F]{64}$', error_messages={'invalid': "Checksum SHA-256 tidak valid."})
+
+    def validate_file_name(self, value):
+        if not value.lower().endswith('.pdf'):
+            raise serializers.ValidationError("File harus dalam format PDF.")
+        # Keep only the base name and drop characters that are awkward in S3 keys.
+        return get_valid_filename(value.replace('\\', '/').split('/')[-1])
+
+    def validate_sha256(self, value):
+        return value.lower()
+
+
+class DokumenUploadFinalizeSerializer(serializers.Serializer):
+    """
+    Validates the completion of a direct upload: the S3 key returned by
+    'initiate' plus the document details.
+    """
+    key = serializers.CharField(max_length=255)
+    bab = serializers.ChoiceField(choices=Dokumen.BAB_CHOICES)
+    nama_dokumen = serializers.CharField(max_length=255)
+
+    def validate_key(self, value):
+        user = self.context['request'].user
+        if not value.startswith(direct_upload_prefix(user)):
+            raise serializers.ValidationError("Key tidak valid untuk pengguna ini.")
+        return value
+
+
+def direct_upload_prefix(user):
+    """S3 prefix under which a user's direct uploads are stored."""
+    return f"dokumen_ta/{user.pk}/"
+
 # --- NEW: Serializers for Jadwal Bimbingan ---
 class RuanganSerializer(serializers.ModelSerializer):
     class Meta:
@@ -264,10 +334,9 @@ class JadwalBimbinganCreateSerializer(serializers.ModelSerializer):
         return value
 
     def create(self, validated_data):
-        mahasiswa = self.context['request'].user.mahasiswa_profile
-        try:
-            tugas_akhir = TugasAkhir.objects.get(mahasiswa=mahasiswa)
-        except TugasAkhir.DoesNotExist:
+        mahasiswa = get_request_profile(self.context['request']).mahasiswa
+        tugas_akhir = getattr(mahasiswa, 'tugas_akhir', None)
+        if tugas_akhir is None:
             raise serializers.ValidationError("Anda harus memiliki data Tugas Akhir untuk mengajukan bimbingan.")
 
         if not tugas_akhir.dosen_pembimbing:
@@ -293,7 +362,7 @@ class JadwalBimbinganCreateSerializer(serializers.ModelSerializer):
                 'screen': 'guidance_schedule_detail'
             }
 
-            send_notification_to_user(
+            enqueue_notification(
                 user=recipient_user,
                 title=title,
                 body=body,
@@ -1,4 +1,5 @@
 # tugas_akhir/test_api.py
+import base64
 import pytest
 from django.urls import reverse
 from rest_framework.test import APIClient
@@ -9,6 +10,8 @@ from .models import TugasAkhir, RequestDosen, Dokumen, JadwalBimbingan, Ruangan
 from django.utils import timezone
 from django.core.files.uploadedfile import SimpleUploadedFile
 from unittest.mock import patch
+from core.s3 import reset_s3_client
+from core.storage import blob_key
 
 pytestmark = pytest.mark.django_db
 
@@ -94,8 +97,8 @@ class TestSupervisionRequestAPI:
         url = reverse('supervision-request-list-create')
         response = api_client.get(url)
         assert response.status_code == status.HTTP_200_OK
-        assert len(response.data) == 1
-        assert response.data[0]['status'] == 'PENDING'
+        assert len(response.data['results']) == 1
+        assert response.data['results'][0]['status'] == 'PENDING'
 
     def test_dosen_respond_to_request_accept(self, api_client, dosen_user, mahasiswa, dosen):
         request_obj = RequestDosen.objects.create(mahasiswa=mahasiswa, dosen=dosen, status='PENDING', rencana_judul="Test", rencana_deskripsi="Test")
@@ -128,7 +131,7 @@ class TestDokumenAPI:
         url = reverse('dokumen-api-list')
         response = api_client.get(url)
         assert response.status_code == status.HTTP_200_OK
-        assert len(response.data) == 1
+        assert len(response.data['results']) == 1
 
     def test_dosen_update_document_status(self, api_client, dosen_user, tugas_akhir, mahasiswa):
         doc = Dokumen.objects.create(tugas_akhir=tugas_akhir, pemilik=mahasiswa, bab='BAB I', nama_dokumen='Doc 1')
@@ -189,3 +192,414 @@ class TestJadwalBimbinganAPI:
             assert response.status_code == status.HTTP_200_OK
             assert response.data['status'] == 'DONE'
             assert response.data['catatan_bimbingan'] == 'Sudah bagus, lanjutkan.'
+
+class TestNotificationEnqueue:
+    def test_document_status_update_enqueues_notification(self, api_client, dosen_user, tugas_akhir, mahasiswa):
+        from core.models import NotificationOutbox
+
+        doc = Dokumen.objects.create(tugas_akhir=tugas_akhir, pemilik=mahasiswa, bab='BAB I', nama_dokumen='Doc 1')
+        api_client.force_authenticate(user=dosen_user)
+        url = reverse('dokumen-api-update-status', kwargs={'pk': doc.pk})
+        with patch('core.firebase_utils.get_transport') as mock_transport:
+            response = api_client.patch(url, {'status': 'Disetujui'}, format='json')
+            # Delivery happens in the notification worker, never inside the request.
+            mock_transport.assert_not_called()
+
+        assert response.status_code == status.HTTP_200_OK
+        entry = NotificationOutbox.objects.get(user=mahasiswa.user)
+        assert entry.status == 'PENDING'
+        assert entry.data == {'document_id': str(doc.id), 'screen': 'document_detail'}
+
+
+class TestDokumenBatchAccess:
+    @pytest.fixture(autouse=True)
+    def mock_s3(self):
+        reset_s3_client()
+        with patch('core.s3.boto3.client') as mock_boto3_client:
+            mock_boto3_client.return_value.generate_presigned_url.side_effect = (
+                lambda op, Params, ExpiresIn: f"https://s3.example.com/{Params['Key']}"
+            )
+            yield mock_boto3_client.return_value
+        reset_s3_client()
+
+    def test_dosen_gets_urls_for_supervised_student(self, api_client, dosen_user, tugas_akhir, mahasiswa, another_dosen):
+        doc1 = Dokumen.objects.create(tugas_akhir=tugas_akhir, pemilik=mahasiswa, bab='BAB I', nama_dokumen='Doc 1', file='dokumen_ta/bab1.pdf')
+        doc2 = Dokumen.objects.create(tugas_akhir=tugas_akhir, pemilik=mahasiswa, bab='BAB II', nama_dokumen='Doc 2', file='dokumen_ta/bab2.pdf')
+        url = reverse('dokumen-api-access-files')
+
+        api_client.force_authenticate(user=dosen_user)
+        response = api_client.get(url, {'mahasiswa_id': mahasiswa.pk})
+        assert response.status_code == status.HTTP_200_OK
+        assert [item['id'] for item in response.data['results']] == [doc1.pk, doc2.pk]
+        assert response.data['results'][0]['url'] == 'https://s3.example.com/dokumen_ta/bab1.pdf'
+
+        # A Dosen who does not supervise the student gets nothing back.
+        api_client.force_authenticate(user=another_dosen.user)
+        response = api_client.post(url, {'ids': [doc1.pk, doc2.pk]}, format='json')
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['results'] == []
+        assert response.data['missing'] == [doc1.pk, doc2.pk]
+
+    def test_access_files_requires_ids_or_mahasiswa(self, api_client, mahasiswa):
+        api_client.force_authenticate(user=mahasiswa.user)
+        response = api_client.get(reverse('dokumen-api-access-files'))
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+        response = api_client.get(reverse('dokumen-api-access-files'), {'mahasiswa_id': 'abc'})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'mahasiswa_id' in response.data['error']
+
+    def test_status_checklist_inline_urls(self, api_client, tugas_akhir, mahasiswa):
+        Dokumen.objects.create(tugas_akhir=tugas_akhir, pemilik=mahasiswa, bab='BAB I', nama_dokumen='Doc 1', file='dokumen_ta/bab1.pdf')
+        api_client.force_authenticate(user=mahasiswa.user)
+        url = reverse('dokumen-api-status-checklist')
+
+        response = api_client.get(url)
+        assert response.data[0]['document_details']['presigned_url'] is None
+
+        response = api_client.get(url, {'inline_urls': '1'})
+        assert response.data[0]['document_details']['presigned_url'] == 'https://s3.example.com/dokumen_ta/bab1.pdf'
+
+    def test_status_checklist_without_shared_cache(self, api_client, tugas_akhir, mahasiswa, django_assert_num_queries):
+        """With the configured default cache (per-process), the checklist is rebuilt each time and never cached."""
+        url = reverse('dokumen-api-status-checklist')
+        api_client.force_authenticate(user=mahasiswa.user)
+        Dokumen.objects.create(tugas_akhir=tugas_akhir, pemilik=mahasiswa, bab='BAB I', nama_dokumen='BAB I', file='dokumen_ta/bab1.pdf')
+
+        with patch('tugas_akhir.checklist.cache') as mock_cache:
+            for _ in range(2):
+                with django_assert_num_queries(1):
+                    assert api_client.get(url).data[0]['is_uploaded'] is True
+        mock_cache.get.assert_not_called()
+        mock_cache.set.assert_not_called()
+
+    def test_status_checklist_query_count_is_constant_and_cached(self, api_client, settings, tugas_akhir, mahasiswa, django_assert_num_queries):
+        settings.STATUS_CHECKLIST_CACHE_TTL = 300  # As configured with a shared (Redis) cache
+        url = reverse('dokumen-api-status-checklist')
+        api_client.force_authenticate(user=mahasiswa.user)
+        for bab, _ in Dokumen.BAB_CHOICES[:4]:
+            Dokumen.objects.create(tugas_akhir=tugas_akhir, pemilik=mahasiswa, bab=bab, nama_dokumen=bab, file=f'dokumen_ta/{bab}.pdf')
+
+        # One joined query for all documents (the role is cached on the fixture's user).
+        with django_assert_num_queries(1):
+            response = api_client.get(url)
+        assert [item['is_uploaded'] for item in response.data] == [True] * 4 + [False] * 2
+        assert response.data[0]['document_details']['pemilik_info']['nim'] == mahasiswa.nim
+
+        with django_assert_num_queries(0):
+            api_client.get(url)
+
+        # Deleting a document drops the cached checklist.
+        Dokumen.objects.filter(bab='BAB I').first().delete()
+        with django_assert_num_queries(1):
+            response = api_client.get(url)
+        assert response.data[0]['is_uploaded'] is False
+
+
+class TestSupervisionProgress:
+    """The Dosen progress dashboard is one aggregate query, whatever the number of students."""
+
+    def _student(self, nim, first_name, prodi, dosen, statuses, pending_jadwal):
+        from datetime import date, time
+
+        user = User.objects.create_user(username=nim, password='pw', first_name=first_name)
+        student = Mahasiswa.objects.create(user=user, nim=nim, program_studi=prodi)
+        tugas_akhir = TugasAkhir.objects.create(mahasiswa=student, dosen_pembimbing=dosen, judul=f"TA {nim}")
+        for (bab, _), doc_status in zip(Dokumen.BAB_CHOICES, statuses):
+            Dokumen.objects.create(
+                tugas_akhir=tugas_akhir, pemilik=student, bab=bab, nama_dokumen=bab,
+                file=f'dokumen_ta/{nim}-{bab}.pdf', status=doc_status,
+            )
+        for day in range(pending_jadwal):
+            JadwalBimbingan.objects.create(
+                mahasiswa=student, dosen_pembimbing=dosen, judul_bimbingan="Bimbingan",
+                tanggal=date(2025, 1, day + 1), waktu=time(9, 0), lokasi_text="Online",
+            )
+        JadwalBimbingan.objects.create(
+            mahasiswa=student, dosen_pembimbing=dosen, judul_bimbingan="Selesai",
+            tanggal=date(2024, 12, 1), waktu=time(9, 0), lokasi_text="Online", status='DONE',
+        )
+        return student
+
+    def test_progress_matrix_in_one_query(self, api_client, settings, dosen, dosen_user, prodi, another_dosen, django_assert_num_queries):
+        settings.SUPERVISION_PROGRESS_CACHE_TTL = 0
+        self._student('201', 'Budi', prodi, dosen, ['Disetujui', 'Revisi', 'Pending'], pending_jadwal=2)
+        self._student('202', 'Ani', prodi, dosen, [], pending_jadwal=0)
+        self._student('203', 'Citra', prodi, another_dosen, ['Pending'], pending_jadwal=1)
+        url = reverse('dosen-supervision-progress')
+        api_client.force_authenticate(user=dosen_user)
+
+        with django_assert_num_queries(1):
+            response = api_client.get(url)
+
+        assert response.status_code == status.HTTP_200_OK
+        ani, budi = response.data['students']
+        assert ani['nama_lengkap'] == 'Ani'
+        assert ani['latest_upload_at'] is None
+        assert set(ani['chapters'].values()) == {None}
+        assert budi['chapters']['BAB I'] == 'Disetujui'
+        assert budi['chapters']['BAB III'] == 'Pending'
+        assert budi['chapters']['BAB IV'] is None
+        assert budi['status_counts'] == {'Pending': 1, 'Revisi': 1, 'Disetujui': 1}
+        assert budi['pending_jadwal_count'] == 2
+        assert budi['latest_upload_at'] is not None
+
+        for nim in range(204, 214):
+            self._student(str(nim), f'Mhs {nim}', prodi, dosen, ['Pending', 'Pending'], pending_jadwal=1)
+        with django_assert_num_queries(1):
+            response = api_client.get(url)
+        assert len(response.data['students']) == 12
+
+    def test_progress_is_cached_and_dosen_only(self, api_client, settings, dosen, dosen_user, mahasiswa, django_assert_num_queries):
+        settings.SUPERVISION_PROGRESS_CACHE_TTL = 30
+        url = reverse('dosen-supervision-progress')
+        api_client.force_authenticate(user=dosen_user)
+        api_client.get(url)
+        with django_assert_num_queries(0):
+            assert api_client.get(url).status_code == status.HTTP_200_OK
+
+        api_client.force_authenticate(user=mahasiswa.user)
+        assert api_client.get(url).status_code == status.HTTP_403_FORBIDDEN
+
+
+class TestDokumenDirectUpload:
+    SHA256 = 'ab' * 32
+
+    @pytest.fixture(autouse=True)
+    def mock_s3(self, settings):
+        settings.AWS_STORAGE_BUCKET_NAME = 'digita-test'
+        reset_s3_client()
+        with patch('core.s3.boto3.client') as mock_boto3_client:
+            s3 = mock_boto3_client.return_value
+            s3.generate_presigned_post.side_effect = lambda Bucket, Key, Fields, Conditions, ExpiresIn: {
+                'url': f'https://{Bucket}.s3.amazonaws.com/', 'fields': {**Fields, 'key': Key},
+            }
+            s3.head_object.return_value = {
+                'ContentLength': 1024,
+                'ContentType': 'application/pdf',
+                'ChecksumSHA256': base64.b64encode(bytes.fromhex(self.SHA256)).decode(),
+            }
+            yield s3
+        reset_s3_client()
+
+    def test_initiate_returns_restricted_presigned_post(self, api_client, tugas_akhir, mahasiswa, mock_s3):
+        api_client.force_authenticate(user=mahasiswa.user)
+        url = reverse('dokumen-api-upload-initiate')
+        response = api_client.post(url, {'bab': 'BAB I', 'file_name': 'bab 1.pdf', 'sha256': self.SHA256}, format='json')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['key'].startswith(f'dokumen_ta/{mahasiswa.user.pk}/')
+        assert response.data['fields']['Content-Type'] == 'application/pdf'
+        conditions = mock_s3.generate_presigned_post.call_args.kwargs['Conditions']
+        assert ['content-length-range', 1, 2 * 1024 * 1024] in conditions
+
+        response = api_client.post(url, {'bab': 'BAB I', 'file_name': 'bab1.docx', 'sha256': self.SHA256}, format='json')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_finalize_creates_then_updates_document(self, api_client, tugas_akhir, mahasiswa, mock_s3):
+        from core.models import NotificationOutbox, StoredBlob
+
+        api_client.force_authenticate(user=mahasiswa.user)
+        url = reverse('dokumen-api-upload-finalize')
+        key = f'dokumen_ta/{mahasiswa.user.pk}/abc/bab1.pdf'
+        response = api_client.post(url, {'key': key, 'bab': 'BAB I', 'nama_dokumen': 'Bab 1'}, format='json')
+
+        assert response.status_code == status.HTTP_201_CREATED
+        document = Dokumen.objects.get(pemilik=mahasiswa, bab='BAB I')
+        # The upload is copied server-side to its content-addressed key and recorded.
+        blob = blob_key(self.SHA256, key)
+        assert (document.file.name, document.file_name) == (blob, 'bab1.pdf')
+        mock_s3.copy_object.assert_called_once_with(
+            Bucket='digita-test', Key=blob, CopySource={'Bucket': 'digita-test', 'Key': key}
+        )
+        mock_s3.delete_object.assert_called_once_with(Bucket='digita-test', Key=key)
+        assert StoredBlob.objects.filter(key=blob).exists()
+        assert document.file_hash == self.SHA256
+        assert NotificationOutbox.objects.filter(user=tugas_akhir.dosen_pembimbing.user).count() == 1
+
+        Dokumen.objects.filter(pk=document.pk).update(status='Revisi')
+        new_key = f'dokumen_ta/{mahasiswa.user.pk}/def/bab1.pdf'
+        response = api_client.post(url, {'key': new_key, 'bab': 'BAB I', 'nama_dokumen': 'Bab 1 Revisi'}, format='json')
+
+        assert response.status_code == status.HTTP_200_OK
+        document.refresh_from_db()
+        assert (document.file.name, document.status, document.nama_dokumen) == (blob, 'Pending', 'Bab 1 Revisi')
+        # Identical content is already stored: the new upload is discarded without a copy.
+        assert mock_s3.copy_object.call_count == 1
+        mock_s3.delete_object.assert_called_with(Bucket='digita-test', Key=new_key)
+
+    def test_finalize_rejects_foreign_key_and_oversized_file(self, api_client, tugas_akhir, mahasiswa, mock_s3):
+        api_client.force_authenticate(user=mahasiswa.user)
+        url = reverse('dokumen-api-upload-finalize')
+
+        response = api_client.post(url, {'key': 'dokumen_ta/999/x/bab1.pdf', 'bab': 'BAB I', 'nama_dokumen': 'Bab 1'}, format='json')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+        mock_s3.head_object.return_value['ContentLength'] = 3 * 1024 * 1024
+        key = f'dokumen_ta/{mahasiswa.user.pk}/abc/bab1.pdf'
+        response = api_client.post(url, {'key': key, 'bab': 'BAB I', 'nama_dokumen': 'Bab 1'}, format='json')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert not Dokumen.objects.exists()
+
+
+class TestCursorPagination:
+    def _create_jadwal(self, mahasiswa, dosen, count):
+        today = timezone.now().date()
+        JadwalBimbingan.objects.bulk_create([
+            JadwalBimbingan(
+                mahasiswa=mahasiswa, dosen_pembimbing=dosen, judul_bimbingan=f'Bimbingan {i}',
+                tanggal=today - timezone.timedelta(days=i // 3), waktu=f'{8 + i % 3:02d}:00', lokasi_text='Online'
+            )
+            for i in range(count)
+        ])
+
+    def test_jadwal_pages_are_stable_and_complete(self, api_client, mahasiswa, dosen):
+        self._create_jadwal(mahasiswa, dosen, 12)
+        api_client.force_authenticate(user=mahasiswa.user)
+        url = reverse('jadwal-bimbingan-api-list')
+
+        seen, pages = [], 0
+        next_url = f'{url}?page_size=5'
+        while next_url:
+            response = api_client.get(next_url)
+            assert response.status_code == status.HTTP_200_OK
+            assert len(response.data['results']) <= 5
+            seen += [item['id'] for item in response.data['results']]
+            next_url = response.data['next']
+            pages += 1
+
+        expected = list(JadwalBimbingan.objects.order_by('-tanggal', '-waktu', '-id').values_list('id', flat=True))
+        assert seen == expected
+        assert pages == 3
+
+    def test_query_count_and_page_size_stay_flat(self, api_client, mahasiswa, dosen):
+        """Benchmark: a page costs the same queries and payload at 10 and 200 rows."""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        api_client.force_authenticate(user=mahasiswa.user)
+        url = reverse('jadwal-bimbingan-api-list') + '?page_size=10'
+        api_client.get(url)  # Warm up per-process caches
+        measurements = []
+        for total in (10, 200):
+            JadwalBimbingan.objects.all().delete()
+            self._create_jadwal(mahasiswa, dosen, total)
+            with CaptureQueriesContext(connection) as queries:
+                response = api_client.get(url)
+            measurements.append((len(queries), len(response.data['results'])))
+
+        assert measurements[0] == measurements[1]
+
+    def test_ruangan_is_not_paginated(self, api_client, mahasiswa, ruangan):
+        api_client.force_authenticate(user=mahasiswa.user)
+        response = api_client.get(reverse('ruangan-list-api'))
+        assert response.data[0]['nama_ruangan'] == ruangan.nama_ruangan
+
+    def test_ruangan_supports_conditional_get(self, api_client, mahasiswa, ruangan):
+        api_client.force_authenticate(user=mahasiswa.user)
+        url = reverse('ruangan-list-api')
+        response = api_client.get(url)
+        assert 'private' in response['Cache-Control']
+
+        assert api_client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code == 304
+        ruangan.delete()
+        assert api_client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code == 200
+
+
+class TestStatelessPermissions:
+    """Permission checks on a role-claims token cost no queries."""
+
+    def _login(self, api_client, user):
+        from users.api_views import get_tokens_for_user
+
+        api_client.credentials(HTTP_AUTHORIZATION=f"Bearer {get_tokens_for_user(user)['access']}")
+
+    def _request_for(self, user):
+        from rest_framework.request import Request
+        from rest_framework.test import APIRequestFactory
+        from users.api_views import get_tokens_for_user
+        from users.authentication import RoleClaimsJWTAuthentication
+
+        token = get_tokens_for_user(user)['access']
+        request = Request(APIRequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {token}'))
+        request.user = RoleClaimsJWTAuthentication().authenticate(request)[0]
+        return request
+
+    def test_object_permissions_run_without_queries(self, mahasiswa, dosen, another_dosen, tugas_akhir, ruangan, django_assert_num_queries):
+        from .permissions import (
+            IsDokumenOwner, IsJadwalOwnerOrDosen, IsMahasiswaOrDosen, IsOwnerOrRecipient,
+            IsOwnerOrSupervisingDosen, IsSupervisingDosen,
+        )
+
+        dokumen = Dokumen.objects.select_related('tugas_akhir').get(
+            pk=Dokumen.objects.create(tugas_akhir=tugas_akhir, pemilik=mahasiswa, bab='BAB I', nama_dokumen='Doc', file='dokumen_ta/doc.pdf').pk
+        )
+        jadwal = JadwalBimbingan.objects.create(
+            mahasiswa=mahasiswa, dosen_pembimbing=dosen, judul_bimbingan='Bimbingan',
+            tanggal=timezone.now().date(), waktu=timezone.now().time(), lokasi_ruangan=ruangan,
+        )
+        request_obj = RequestDosen.objects.create(mahasiswa=mahasiswa, dosen=dosen, rencana_judul='T', rencana_deskripsi='T')
+        as_mahasiswa = self._request_for(mahasiswa.user)
+        as_dosen = self._request_for(dosen.user)
+        as_other = self._request_for(another_dosen.user)
+
+        with django_assert_num_queries(0):
+            assert IsMahasiswaOrDosen().has_permission(as_mahasiswa, None)
+            assert IsDokumenOwner().has_object_permission(as_mahasiswa, None, dokumen)
+            assert not IsDokumenOwner().has_object_permission(as_dosen, None, dokumen)
+            assert IsSupervisingDosen().has_object_permission(as_dosen, None, dokumen)
+            assert not IsSupervisingDosen().has_object_permission(as_other, None, dokumen)
+            assert IsOwnerOrSupervisingDosen().has_object_permission(as_dosen, None, dokumen)
+            assert IsJadwalOwnerOrDosen().has_object_permission(as_mahasiswa, None, jadwal)
+            assert not IsJadwalOwnerOrDosen().has_object_permission(as_other, None, jadwal)
+            assert IsOwnerOrRecipient().has_object_permission(as_dosen, None, request_obj)
+
+    def test_document_detail_only_queries_the_document(self, api_client, dosen, mahasiswa, tugas_akhir, django_assert_num_queries):
+        dokumen = Dokumen.objects.create(tugas_akhir=tugas_akhir, pemilik=mahasiswa, bab='BAB I', nama_dokumen='Doc', file='dokumen_ta/doc.pdf')
+        self._login(api_client, dosen.user)
+
+        with django_assert_num_queries(1):
+            response = api_client.get(reverse('dokumen-api-detail', kwargs={'pk': dokumen.pk}))
+        assert response.status_code == status.HTTP_200_OK
+
+
+class TestRequestProfile:
+    """The requesting user's profile is loaded once and shared across the request."""
+
+    def test_profile_is_loaded_once_with_related_rows(self, mahasiswa, dosen, tugas_akhir, django_assert_num_queries):
+        from rest_framework.test import APIRequestFactory
+        from users.profiles import get_request_profile
+
+        request = APIRequestFactory().get('/')
+        request.user = User.objects.get(pk=mahasiswa.pk)
+
+        with django_assert_num_queries(1):
+            profile = get_request_profile(request)
+            assert profile.is_mahasiswa and not profile.is_dosen
+            assert get_request_profile(request) is profile
+            assert profile.mahasiswa.program_studi.jurusan.nama_jurusan == 'Teknik Informatika'
+            assert profile.mahasiswa.tugas_akhir.dosen_pembimbing.user.first_name == 'Candra'
+            assert request.user.mahasiswa_profile is profile.mahasiswa
+            assert not hasattr(request.user, 'dosen_profile')
+
+    def test_hot_endpoints_resolve_the_profile_once(self, api_client, mahasiswa, dosen, tugas_akhir, ruangan, django_assert_num_queries):
+        """Benchmark: profile (1) + page (1) for a list; creating a schedule no longer looks up the TA."""
+        Dokumen.objects.create(tugas_akhir=tugas_akhir, pemilik=mahasiswa, bab='BAB I', nama_dokumen='Doc', file='dokumen_ta/doc.pdf')
+
+        # Fresh user objects, so no profile is cached from the fixtures.
+        api_client.force_authenticate(user=User.objects.get(pk=dosen.pk))
+        with django_assert_num_queries(2):
+            response = api_client.get(reverse('dokumen-api-list'))
+        assert len(response.data['results']) == 1
+
+        api_client.force_authenticate(user=User.objects.get(pk=mahasiswa.pk))
+        data = {
+            'judul_bimbingan': 'Pembahasan Progres',
+            'tanggal': (timezone.now() + timezone.timedelta(days=3)).strftime('%Y-%m-%d'),
+            'waktu': '10:00:00',
+            'lokasi_ruangan_id': ruangan.pk
+        }
+        # profile, ruangan lookup, insert, notification outbox
+        with patch('core.firebase_utils.send_notification_to_user'), django_assert_num_queries(4):
+            response = api_client.post(reverse('jadwal-bimbingan-api-list'), data, format='json')
+        assert response.status_code == status.HTTP_201_CREATED
@@ -1,5 +1,8 @@
 # tugas_akhir/tests.py
+import csv
+import datetime
 import io
+import json
 import pytest
 from unittest.mock import patch, MagicMock
 from django.utils import timezone
@@ -12,6 +15,10 @@ from .models import TugasAkhir, RequestDosen, Dokumen, JadwalBimbingan, Ruangan
 from users.models import Mahasiswa, Dosen, Jurusan, ProgramStudi
 from django.contrib.auth.models import User
 from django.core.files.uploadedfile import SimpleUploadedFile
+from core.s3 import presigned_url_cache, reset_s3_client
+from core.storage import blob_key
+from core.utils import calculate_file_hash
+from .views import jadwal_export_queryset, jadwal_export_rows
 
 pytestmark = pytest.mark.django_db
 
@@ -63,8 +70,9 @@ def pdf_file():
 
 @pytest.fixture
 def document(tugas_akhir, mahasiswa, pdf_file):
-    # Mock the S3 storage
-    with patch('tugas_akhir.models.S3Boto3Storage'):
+    # Mock the S3 upload; the document still gets its content-addressed key
+    with patch('tugas_akhir.models.ContentAddressedS3Storage._save',
+               side_effect=lambda name, content: blob_key(calculate_file_hash(content), name)):
         doc = Dokumen.objects.create(
             tugas_akhir=tugas_akhir,
             pemilik=mahasiswa,
@@ -177,8 +185,9 @@ class TestDocumentListView:
         assert response.status_code == 200
         assert document not in response.context['documents']
 
-@patch('tugas_akhir.views.boto3.client')
+@patch('core.s3.boto3.client')
 def test_serve_document_file_view(mock_boto3_client, client, admin_user, document):
+    reset_s3_client()
     mock_s3 = MagicMock()
     mock_s3.generate_presigned_url.return_value = 'https://s3.amazonaws.com/some/presigned/url'
     mock_boto3_client.return_value = mock_s3
@@ -190,6 +199,12 @@ def test_serve_document_file_view(mock_boto3_client, client, admin_user, documen
     assert response.status_code == 302
     assert response.url == 'https://s3.amazonaws.com/some/presigned/url'
 
+    # A second request is served from the presigned URL cache
+    response = client.get(url)
+    assert response.url == 'https://s3.amazonaws.com/some/presigned/url'
+    assert mock_s3.generate_presigned_url.call_count == 1
+    assert presigned_url_cache.stats('web.serve_document_file') == {'hits': 1, 'misses': 1}
+
 class TestDocumentExportView:
     def test_export_view(self, client, admin_user, document):
         client.force_login(admin_user)
@@ -200,11 +215,25 @@ class TestDocumentExportView:
         assert response['Content-Type'] == 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
 
         # Check content
-        workbook = load_workbook(io.BytesIO(response.content))
+        workbook = load_workbook(io.BytesIO(response.getvalue()))
         sheet = workbook.active
         assert sheet['A1'].value == 'BAB'
         assert sheet['B2'].value == document.nama_dokumen
 
+    def test_export_is_streamed_with_frozen_header(self, client, admin_user, tugas_akhir, mahasiswa):
+        Dokumen.objects.create(
+            tugas_akhir=tugas_akhir, pemilik=mahasiswa, bab='BAB I',
+            nama_dokumen='Pendahuluan.pdf', file='dokumen_ta/pendahuluan.pdf'
+        )
+        client.force_login(admin_user)
+        response = client.get(reverse('tugas_akhir:document-export'), {'q': 'Pendahuluan'})
+
+        assert response.streaming
+        assert response['Content-Disposition'] == 'attachment; filename="documents_export.xlsx"'
+        sheet = load_workbook(io.BytesIO(response.getvalue())).active
+        assert sheet.freeze_panes == 'A2'
+        assert sheet.max_row == 2
+
 class TestDocumentCreateView:
     def test_create_document_success(self, client, admin_user, tugas_akhir, mahasiswa, pdf_file):
         client.force_login(admin_user)
@@ -285,10 +314,63 @@ class TestTugasAkhirExportView:
         response = client.get(url)
         assert response.status_code == 200
         assert response['Content-Type'] == 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        workbook = load_workbook(io.BytesIO(response.content))
+        workbook = load_workbook(io.BytesIO(response.getvalue()))
         sheet = workbook.active
         assert sheet['B2'].value == tugas_akhir.judul
 
+    def test_csv_export_matches_xlsx_columns(self, client, admin_user, tugas_akhir):
+        client.force_login(admin_user)
+        url = reverse('tugas_akhir:ta-export')
+        xlsx_rows = list(load_workbook(io.BytesIO(client.get(url).getvalue())).active.values)
+
+        response = client.get(url, {'format': 'csv', 'q': 'Rancang'})
+        assert response.streaming
+        assert response['Content-Disposition'] == 'attachment; filename="tugas_akhir_export.csv"'
+        rows = list(csv.reader(io.StringIO(response.getvalue().decode())))
+        assert rows == [list(row) for row in xlsx_rows]
+        assert rows[1][3:6] == ['Andi Wijaya', 'Budi Santoso', '54321']
+
+class TestJadwalBimbinganExportView:
+    @pytest.mark.parametrize('name', ['jadwal-export', 'document-export', 'ta-export'])
+    def test_export_requires_login(self, client, name):
+        response = client.get(reverse(f'tugas_akhir:{name}'), {'format': 'csv'})
+        assert response.status_code == 302
+        assert response.url.startswith(reverse('core:login'))
+
+    def test_ndjson_export_streams_values(self, client, admin_user, mahasiswa, dosen, ruangan, django_assert_num_queries):
+        JadwalBimbingan.objects.create(
+            mahasiswa=mahasiswa, dosen_pembimbing=dosen, judul_bimbingan="Diskusi Bab 1",
+            tanggal=datetime.date(2025, 3, 4), waktu=datetime.time(9, 30), lokasi_ruangan=ruangan, lokasi_text="-",
+        )
+        JadwalBimbingan.objects.create(
+            mahasiswa=mahasiswa, dosen_pembimbing=dosen, judul_bimbingan="Revisi Bab 2", status='DONE',
+            tanggal=datetime.date(2025, 3, 1), waktu=datetime.time(13, 0), lokasi_text="Online via Google Meet",
+        )
+        client.force_login(admin_user)
+        url = reverse('tugas_akhir:jadwal-export')
+
+        response = client.get(url, {'format': 'ndjson'})
+        records = [json.loads(line) for line in response.getvalue().decode().splitlines()]
+        assert response['Content-Type'] == 'application/x-ndjson'
+        assert records[0] == {
+            'mahasiswa': 'Budi Santoso', 'nim': '54321', 'dosen_pembimbing': 'Andi Wijaya',
+            'judul_bimbingan': 'Diskusi Bab 1', 'tanggal': '04 March 2025', 'waktu': '09:30',
+            'lokasi': 'Ruang Rapat 1', 'status': 'Menunggu Persetujuan',
+        }
+        assert records[1]['lokasi'] == 'Online via Google Meet'
+
+        filtered = client.get(url, {'format': 'csv', 'status': 'DONE'}).getvalue().decode().splitlines()
+        assert len(filtered) == 2 and 'Revisi Bab 2' in filtered[1]
+
+        with django_assert_num_queries(1):
+            rows = list(jadwal_export_rows(jadwal_export_queryset({}).iterator(chunk_size=100)))
+        assert len(rows) == 2
+
+    def test_unknown_format_is_rejected(self, client, admin_user):
+        client.force_login(admin_user)
+        response = client.get(reverse('tugas_akhir:jadwal-export'), {'format': 'pdf'})
+        assert response.status_code == 400
+
 class TestTugasAkhirDetailView:
     def test_detail_view_success(self, client, admin_user, tugas_akhir):
         client.force_login(admin_user)
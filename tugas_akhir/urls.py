@@ -30,4 +30,7 @@ urlpatterns = [
     path('documents/<int:pk>/edit/', views.edit_document_view, name='document-edit'),
     path('documents/create/', views.create_document_view, name='document-create'),
 
+    # URL for exporting Jadwal Bimbingan data
+    path('jadwal/export/', views.JadwalBimbinganExportView.as_view(), name='jadwal-export'),
+
 ]
\ No newline at end of file
@@ -2,24 +2,22 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.http import FileResponse, HttpResponse, JsonResponse
 from django.contrib.auth.decorators import login_required
+from django.contrib.auth.mixins import LoginRequiredMixin
 from django.views.decorators.http import require_POST
 from django.contrib import messages
 from django.db.models import Q
 from django.core.paginator import Paginator
 from django.views import View
 
-import boto3
 from botocore.exceptions import ClientError
 from django.conf import settings
-from django.http import HttpResponseRedirect, HttpResponseNotFound
-
-from openpyxl import Workbook
-from openpyxl.styles import Font, Alignment
-from openpyxl.utils import get_column_letter
+from django.http import HttpResponseBadRequest, HttpResponseRedirect, HttpResponseNotFound
 
 from digita_admin import settings
+from core.exports import EXPORT_CHUNK_SIZE, EXPORT_FORMATS, export_response, full_name
+from core.s3 import attachment_disposition, get_presigned_url
 from users.models import Mahasiswa, Dosen
-from .models import Dokumen, TugasAkhir
+from .models import Dokumen, JadwalBimbingan, TugasAkhir
 from .forms import DokumenEditForm, DokumenCreateForm, TugasAkhirEditForm
 
 
@@ -67,40 +65,18 @@ def serve_document_file_view(request, pk):
     if not document.file:
         return HttpResponseNotFound("File does not exist for this document.")
 
-    # Get the S3 client from boto3
-    s3_client = boto3.client(
-        's3',
-        region_name=settings.AWS_S3_REGION_NAME,
-        # The following are only needed if you are not using an IAM role
-        # aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-        # aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-    )
-
-    bucket_name = settings.AWS_STORAGE_BUCKET_NAME
     object_key = document.file.name
 
-    # Set an expiration time for the URL (e.g., 15 minutes)
-    expiration = 900  # Seconds
-
-    params = {
-        'Bucket': bucket_name,
-        'Key': object_key,
-    }
-
     # Check if a download is requested
+    disposition = ''
     action = request.GET.get('action')
     if action == 'download':
         # To force download, we override the Content-Disposition header
-        file_name = object_key.split('/')[-1]
-        params['ResponseContentDisposition'] = f'attachment; filename="{file_name}"'
+        disposition = attachment_disposition(document.file_name)
 
     try:
-        # Generate the pre-signed URL
-        url = s3_client.generate_presigned_url(
-            'get_object',
-            Params=params,
-            ExpiresIn=expiration
-        )
+        # Reuses the shared S3 client and a cached URL while it is still fresh
+        url = get_presigned_url(object_key, disposition, site='web.serve_document_file')
     except ClientError as e:
         # Handle potential errors (e.g., file not found on S3, permissions issue)
         print(f"Error generating pre-signed URL: {e}")
@@ -112,77 +88,73 @@ def serve_document_file_view(request, pk):
     return HttpResponseRedirect(url)
 
 
-class DocumentExportView(View):
+# (key, header) per column; XLSX/CSV use the headers, NDJSON the keys.
+DOCUMENT_EXPORT_COLUMNS = [
+    ('bab', 'BAB'),
+    ('nama_dokumen', 'Nama Dokumen'),
+    ('status', 'Status'),
+    ('pemilik', 'Pemilik'),
+    ('program_studi', 'Program Studi'),
+    ('judul_ta', 'Judul TA'),
+    ('uploaded_at', 'Waktu Upload'),
+]
+
+
+def document_export_queryset(params):
     """
-    Handles exporting the filtered document list to a polished Excel (.xlsx) file.
+    The documents matched by the list page's search (`params['q']`), as
+    flat dicts from `.values()`. Shared by the export view and background
+    export jobs (see core.export_jobs).
     """
-    def get(self, request, *args, **kwargs):
-        search_query = request.GET.get('q', '')
-
-        # Reuse the filtering logic from the document_list_view
-        document_queryset = Dokumen.objects.select_related(
-            'pemilik__user', 'pemilik__program_studi', 'tugas_akhir'
-        ).order_by('-uploaded_at')
-
-        if search_query:
-            document_queryset = document_queryset.filter(
-                Q(nama_dokumen__icontains=search_query) |
-                Q(pemilik__user__first_name__icontains=search_query) |
-                Q(pemilik__user__last_name__icontains=search_query)
-            )
-
-        # --- Create an in-memory Excel workbook ---
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Documents Export"
-
-        # Define headers and apply bold styling
-        headers = ['BAB', 'Nama Dokumen', 'Status', 'Pemilik', 'Program Studi', 'Judul TA', 'Waktu Upload']
-        ws.append(headers)
-        for cell in ws[1]:
-            cell.font = Font(bold=True)
-            cell.alignment = Alignment(horizontal='center')
-
-        # Write data rows
-        for doc in document_queryset:
-            row_data = [
-                doc.get_bab_display(),
-                doc.nama_dokumen,
-                doc.get_status_display(),
-                doc.pemilik.user.get_full_name(),
-                doc.pemilik.program_studi.nama_prodi,
-                doc.tugas_akhir.judul or "N/A",
-                doc.uploaded_at.strftime("%d %B %Y, %H:%M"),
-                ]
-            ws.append(row_data)
-
-        # --- Polishing Touches ---
-        # 1. Auto-adjust column widths
-        for i, column_cells in enumerate(ws.columns, 1):
-            max_length = 0
-            column_letter = get_column_letter(i)
-            for cell in column_cells:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
-            adjusted_width = (max_length + 2) if max_length < 40 else 40
-            ws.column_dimensions[column_letter].width = adjusted_width
-
-        # 2. Freeze the header row
-        ws.freeze_panes = 'A2'
-
-        # --- Prepare and return the HTTP response ---
-        response = HttpResponse(
-            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    search_query = params.get('q', '')
+
+    # Reuse the filtering logic from the document_list_view
+    document_queryset = Dokumen.objects.order_by('-uploaded_at')
+
+    if search_query:
+        document_queryset = document_queryset.filter(
+            Q(nama_dokumen__icontains=search_query) |
+            Q(pemilik__user__first_name__icontains=search_query) |
+            Q(pemilik__user__last_name__icontains=search_query)
         )
-        response['Content-Disposition'] = 'attachment; filename="documents_export.xlsx"'
+    return document_queryset.values(
+        'bab', 'nama_dokumen', 'status', 'pemilik__user__first_name', 'pemilik__user__last_name',
+        'pemilik__program_studi__nama_prodi', 'tugas_akhir__judul', 'uploaded_at',
+    )
+
 
-        # Save the workbook directly to the response
-        wb.save(response)
+def document_export_rows(documents):
+    """Yields one export row (matching DOCUMENT_EXPORT_COLUMNS) per document dict."""
+    bab_display = dict(Dokumen.BAB_CHOICES)
+    status_display = dict(Dokumen.STATUS_CHOICES)
+    for doc in documents:
+        yield [
+            bab_display.get(doc['bab'], doc['bab']),
+            doc['nama_dokumen'],
+            status_display.get(doc['status'], doc['status']),
+            full_name(doc['pemilik__user__first_name'], doc['pemilik__user__last_name']),
+            doc['pemilik__program_studi__nama_prodi'],
+            doc['tugas_akhir__judul'] or "N/A",
+            doc['uploaded_at'].strftime("%d %B %Y, %H:%M"),
+        ]
 
-        return response
+
+class DocumentExportView(LoginRequiredMixin, View):
+    """
+    Handles exporting the filtered document list to a polished Excel (.xlsx) file,
+    or streaming it as CSV/NDJSON with `?format=csv|ndjson`. Rows are read
+    with `.values()` in chunks, so memory stays flat for any list size.
+    """
+    def get(self, request, *args, **kwargs):
+        file_format = request.GET.get('format', 'xlsx')
+        if file_format not in EXPORT_FORMATS:
+            return HttpResponseBadRequest("Format export tidak valid.")
+
+        documents = document_export_queryset(request.GET).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+        return export_response(
+            file_format, document_export_rows(documents), DOCUMENT_EXPORT_COLUMNS, "Documents Export",
+            'documents_export', max_width=40,
+        )
 
 # --- VIEW for creating documents ---
 @require_POST
@@ -256,7 +228,7 @@ def edit_document_view(request, pk):
             'status': document.status,
             'pemilik': document.pemilik_id,
             'current_file_url': document.file.url if document.file else None,
-            'current_file_name': document.file.name.split('/')[-1] if document.file else 'No file uploaded',
+            'current_file_name': document.file_name if document.file else 'No file uploaded',
         }
         return JsonResponse(data)
 
@@ -293,72 +265,149 @@ def tugas_akhir_list_view(request):
     }
     return render(request, 'core/tugas_akhir.html', context)
 
-class TugasAkhirExportView(View):
+TUGAS_AKHIR_EXPORT_COLUMNS = [
+    ('id', 'ID'),
+    ('judul', 'Judul'),
+    ('deskripsi', 'Deskripsi'),
+    ('dosen_pembimbing', 'Dosen Pembimbing'),
+    ('mahasiswa', 'Mahasiswa'),
+    ('nim', 'NIM'),
+    ('created_at', 'Tanggal Dibuat'),
+]
+
+
+def tugas_akhir_export_queryset(params):
     """
-    Handles exporting the filtered Tugas Akhir list to a polished Excel (.xlsx) file.
+    The Tugas Akhir matched by the list page's search (`params['q']`), as
+    flat dicts from `.values()`. Shared by the export view and background
+    export jobs (see core.export_jobs).
+    """
+    search_query = params.get('q', '')
+
+    tugas_akhir_queryset = TugasAkhir.objects.order_by('-created_at')
+
+    if search_query:
+        tugas_akhir_queryset = tugas_akhir_queryset.filter(
+            Q(judul__icontains=search_query) |
+            Q(deskripsi__icontains=search_query) |
+            Q(mahasiswa__user__first_name__icontains=search_query) |
+            Q(mahasiswa__user__last_name__icontains=search_query) |
+            Q(dosen_pembimbing__user__first_name__icontains=search_query) |
+            Q(dosen_pembimbing__user__last_name__icontains=search_query)
+        )
+    return tugas_akhir_queryset.values(
+        'pk', 'judul', 'deskripsi', 'dosen_pembimbing_id',
+        'dosen_pembimbing__user__first_name', 'dosen_pembimbing__user__last_name',
+        'mahasiswa__user__first_name', 'mahasiswa__user__last_name', 'mahasiswa__nim', 'created_at',
+    )
+
+
+def tugas_akhir_export_rows(tugas_akhirs):
+    """Yields one export row (matching TUGAS_AKHIR_EXPORT_COLUMNS) per Tugas Akhir dict."""
+    for ta in tugas_akhirs:
+        yield [
+            f"TA{ta['pk']:03d}",
+            ta['judul'] or "-",
+            ta['deskripsi'] or "-",
+            full_name(ta['dosen_pembimbing__user__first_name'], ta['dosen_pembimbing__user__last_name'])
+            if ta['dosen_pembimbing_id'] else "Belum Ditentukan",
+            full_name(ta['mahasiswa__user__first_name'], ta['mahasiswa__user__last_name']),
+            ta['mahasiswa__nim'] or "N/A",
+            ta['created_at'].strftime("%d %B %Y, %H:%M"),
+        ]
+
+
+class TugasAkhirExportView(LoginRequiredMixin, View):
+    """
+    Handles exporting the filtered Tugas Akhir list to a polished Excel (.xlsx) file,
+    or streaming it as CSV/NDJSON with `?format=csv|ndjson`. Rows are read
+    with `.values()` in chunks, so memory stays flat for any list size.
     """
     def get(self, request, *args, **kwargs):
-        search_query = request.GET.get('q', '')
+        file_format = request.GET.get('format', 'xlsx')
+        if file_format not in EXPORT_FORMATS:
+            return HttpResponseBadRequest("Format export tidak valid.")
+
+        tugas_akhirs = tugas_akhir_export_queryset(request.GET).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+        return export_response(
+            file_format, tugas_akhir_export_rows(tugas_akhirs), TUGAS_AKHIR_EXPORT_COLUMNS, "Tugas Akhir Export",
+            'tugas_akhir_export', max_width=50,
+        )
 
-        tugas_akhir_queryset = TugasAkhir.objects.select_related(
-            'mahasiswa__user',
-            'dosen_pembimbing__user'
-        ).order_by('-created_at')
-
-        if search_query:
-            tugas_akhir_queryset = tugas_akhir_queryset.filter(
-                Q(judul__icontains=search_query) |
-                Q(deskripsi__icontains=search_query) |
-                Q(mahasiswa__user__first_name__icontains=search_query) |
-                Q(mahasiswa__user__last_name__icontains=search_query) |
-                Q(dosen_pembimbing__user__first_name__icontains=search_query) |
-                Q(dosen_pembimbing__user__last_name__icontains=search_query)
-            )
-
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Tugas Akhir Export"
-
-        headers = ['ID', 'Judul', 'Deskripsi', 'Dosen Pembimbing', 'Mahasiswa', 'NIM', 'Tanggal Dibuat']
-        ws.append(headers)
-        for cell in ws[1]:
-            cell.font = Font(bold=True)
-            cell.alignment = Alignment(horizontal='center')
-
-        for ta in tugas_akhir_queryset:
-            row_data = [
-                f"TA{ta.pk:03d}",
-                ta.judul or "-",
-                ta.deskripsi or "-",
-                ta.dosen_pembimbing.user.get_full_name() if ta.dosen_pembimbing and ta.dosen_pembimbing.user else "Belum Ditentukan",
-                ta.mahasiswa.user.get_full_name() if ta.mahasiswa and ta.mahasiswa.user else "N/A",
-                ta.mahasiswa.nim if ta.mahasiswa else "N/A",
-                ta.created_at.strftime("%d %B %Y, %H:%M"),
-                ]
-            ws.append(row_data)
-
-        for i, column_cells in enumerate(ws.columns, 1):
-            max_length = 0
-            column_letter = get_column_letter(i)
-            for cell in column_cells:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
-            adjusted_width = (max_length + 2) if max_length < 50 else 50
-            ws.column_dimensions[column_letter].width = adjusted_width
-
-        ws.freeze_panes = 'A2'
-
-        response = HttpResponse(
-            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+
+# --- Jadwal Bimbingan Export ---
+
+JADWAL_EXPORT_COLUMNS = [
+    ('mahasiswa', 'Mahasiswa'),
+    ('nim', 'NIM'),
+    ('dosen_pembimbing', 'Dosen Pembimbing'),
+    ('judul_bimbingan', 'Judul Bimbingan'),
+    ('tanggal', 'Tanggal'),
+    ('waktu', 'Waktu'),
+    ('lokasi', 'Lokasi'),
+    ('status', 'Status'),
+]
+
+
+def jadwal_export_queryset(params):
+    """
+    Guidance sessions, optionally filtered by `params['q']` (topic or
+    student/supervisor name) and `params['status']`, as flat dicts from
+    `.values()`. Shared by the export view and background export jobs.
+    """
+    search_query = params.get('q', '')
+    status_filter = params.get('status', '')
+
+    jadwal_queryset = JadwalBimbingan.objects.order_by('-tanggal', '-waktu')
+
+    if search_query:
+        jadwal_queryset = jadwal_queryset.filter(
+            Q(judul_bimbingan__icontains=search_query) |
+            Q(mahasiswa__user__first_name__icontains=search_query) |
+            Q(mahasiswa__user__last_name__icontains=search_query) |
+            Q(dosen_pembimbing__user__first_name__icontains=search_query) |
+            Q(dosen_pembimbing__user__last_name__icontains=search_query)
         )
-        response['Content-Disposition'] = 'attachment; filename="tugas_akhir_export.xlsx"'
+    if status_filter:
+        jadwal_queryset = jadwal_queryset.filter(status=status_filter)
+    return jadwal_queryset.values(
+        'mahasiswa__user__first_name', 'mahasiswa__user__last_name', 'mahasiswa__nim',
+        'dosen_pembimbing__user__first_name', 'dosen_pembimbing__user__last_name',
+        'judul_bimbingan', 'tanggal', 'waktu', 'lokasi_text', 'lokasi_ruangan__nama_ruangan', 'status',
+    )
+
+
+def jadwal_export_rows(jadwals):
+    """Yields one export row (matching JADWAL_EXPORT_COLUMNS) per Jadwal Bimbingan dict."""
+    status_display = dict(JadwalBimbingan.STATUS_CHOICES)
+    for jadwal in jadwals:
+        yield [
+            full_name(jadwal['mahasiswa__user__first_name'], jadwal['mahasiswa__user__last_name']),
+            jadwal['mahasiswa__nim'],
+            full_name(jadwal['dosen_pembimbing__user__first_name'], jadwal['dosen_pembimbing__user__last_name']),
+            jadwal['judul_bimbingan'],
+            jadwal['tanggal'].strftime("%d %B %Y"),
+            jadwal['waktu'].strftime("%H:%M"),
+            jadwal['lokasi_ruangan__nama_ruangan'] or jadwal['lokasi_text'],
+            status_display.get(jadwal['status'], jadwal['status']),
+        ]
 
-        wb.save(response)
 
-        return response
+class JadwalBimbinganExportView(LoginRequiredMixin, View):
+    """
+    Exports guidance sessions as Excel (.xlsx), or streams them as CSV/NDJSON
+    with `?format=csv|ndjson`.
+    """
+    def get(self, request, *args, **kwargs):
+        file_format = request.GET.get('format', 'xlsx')
+        if file_format not in EXPORT_FORMATS:
+            return HttpResponseBadRequest("Format export tidak valid.")
+
+        jadwals = jadwal_export_queryset(request.GET).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+        return export_response(
+            file_format, jadwal_export_rows(jadwals), JADWAL_EXPORT_COLUMNS, "Jadwal Bimbingan Export",
+            'jadwal_bimbingan_export', max_width=50,
+        )
 
 def tugas_akhir_detail_view(request, pk):
     """
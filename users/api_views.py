@@ -7,8 +7,10 @@ from rest_framework.views import APIView as DRFView
 from rest_framework_simplejwt.tokens import RefreshToken, TokenError
 
 from django.contrib.auth import authenticate
-from django.db.models import Count
+from django.db.models import Count, Value
+from django.db.models.functions import Concat
 
+from core.conditional import ConditionalGetMixin
 from .models import Dosen, Jurusan, Mahasiswa, ProgramStudi, User
 from .serializers import (
     DosenSerializer,
@@ -21,14 +23,16 @@ from .serializers import (
     RegisterDosenSerializer,
     RegisterMahasiswaSerializer,
 )
+from .tokens import RoleRefreshToken
 
 # --- Helper Functions ---
 
 def get_tokens_for_user(user: User) -> dict:
     """
-    Generates JWT refresh and access tokens for a given user.
+    Generates JWT refresh and access tokens for a given user. Both carry
+    the user's role claims (see users.tokens.role_claims).
     """
-    refresh = RefreshToken.for_user(user)
+    refresh = RoleRefreshToken.for_user(user)
     return {
         'refresh': str(refresh),
         'access': str(refresh.access_token),
@@ -36,25 +40,29 @@ def get_tokens_for_user(user: User) -> dict:
 
 # --- API Views for Core Models ---
 
-class JurusanViewSet(viewsets.ReadOnlyModelViewSet):
+class JurusanViewSet(ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
     """
     API endpoint that allows Jurusan to be viewed.
     - Provides `list` and `retrieve` actions.
     - Open to any user.
+    - Supports conditional GET (ETag/Last-Modified, see core.conditional).
     """
     queryset = Jurusan.objects.all().order_by('nama_jurusan')
     serializer_class = JurusanSerializer
     permission_classes = [AllowAny]
+    pagination_class = None  # Small lookup table, returned in full
 
 
-class ProgramStudiViewSet(viewsets.ReadOnlyModelViewSet):
+class ProgramStudiViewSet(ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
     """
     API endpoint that allows Program Studi to be viewed.
     - Provides `list` and `retrieve` actions.
     - Can be filtered by `jurusan_id` query parameter.
+    - Supports conditional GET (ETag/Last-Modified, see core.conditional).
     """
     serializer_class = ProgramStudiSerializer
     permission_classes = [AllowAny]
+    pagination_class = None  # Small lookup table, returned in full
 
     def get_queryset(self):
         """
@@ -76,6 +84,8 @@ class DosenViewSet(viewsets.ReadOnlyModelViewSet):
     """
     permission_classes = [IsAuthenticated]
     serializer_class = DosenSerializer
+    # Alphabetical by name; the primary key breaks ties between equal names.
+    cursor_ordering = ('nama_urut', 'pk')
 
     def get_queryset(self):
         """
@@ -83,8 +93,9 @@ class DosenViewSet(viewsets.ReadOnlyModelViewSet):
         annotating the student count, and ordering by name.
         """
         return Dosen.objects.select_related('user', 'jurusan').annotate(
-            jumlah_mahasiswa_aktif=Count('mahasiswa_binaan')
-        ).order_by('user__first_name', 'user__last_name')
+            jumlah_mahasiswa_aktif=Count('mahasiswa_binaan'),
+            nama_urut=Concat('user__first_name', Value(' '), 'user__last_name'),
+        ).order_by('nama_urut', 'pk')
 
 class MahasiswaViewSet(viewsets.ModelViewSet):
     """
@@ -95,6 +106,7 @@ class MahasiswaViewSet(viewsets.ModelViewSet):
     """
     permission_classes = [IsAuthenticated]
     serializer_class = MahasiswaDetailSerializer
+    cursor_ordering = ('nim',)  # Unique, so the cursor alone fixes the position
     queryset = Mahasiswa.objects.select_related(
         'user',
         'program_studi',
@@ -165,6 +177,8 @@ class LoginView(DRFView):
         user = authenticate(request, identifier=identifier, password=password, role=role)
 
         if user and user.is_active:
+            # NimNikAuthBackend returns the user with its profile already
+            # loaded, so the tokens and payload need no further queries.
             tokens = get_tokens_for_user(user)
             user_data = {
                 'id': user.id,
@@ -0,0 +1,28 @@
+# users/authentication.py
+
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+
+from .tokens import user_from_claims
+
+
+class RoleClaimsJWTAuthentication(JWTAuthentication):
+    """
+    Stateless JWT authentication: the request user is rebuilt from the
+    token's role claims (see `users.tokens.RoleRefreshToken`) instead of
+    being loaded from the database on every request.
+
+    Tokens issued before the role and `is_active` claims existed fall back
+    to the regular database lookup. Inactive users are rejected as simplejwt
+    does. A role change or deactivation takes effect once the access token
+    is refreshed or expires, so ACCESS_TOKEN_LIFETIME is kept to minutes;
+    refreshing is refused for inactive or deleted users.
+    """
+
+    def get_user(self, validated_token):
+        if 'role' not in validated_token or 'is_active' not in validated_token:
+            return super().get_user(validated_token)
+        if api_settings.CHECK_USER_IS_ACTIVE and not validated_token['is_active']:
+            raise AuthenticationFailed("User is inactive", code="user_inactive")
+        return user_from_claims(validated_token)
@@ -1,27 +1,62 @@
+from django.conf import settings
 from django.contrib.auth.backends import BaseBackend
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from .models import Mahasiswa, Dosen
 
+# role -> (profile model, identifier field, relation joined for the token claims)
+LOGIN_ROLES = {
+    'mahasiswa': (Mahasiswa, 'nim', 'program_studi'),
+    'dosen': (Dosen, 'nik', 'jurusan'),
+}
+
+
+def unknown_identifier_cache_key(role, identifier):
+    return f"auth:unknown:{role}:{identifier}"
+
+
+def forget_unknown_identifier(role, identifier):
+    """Drops a cached 'unknown NIM/NIK' entry, e.g. once that profile is created."""
+    cache.delete(unknown_identifier_cache_key(role, identifier))
+
+
 class NimNikAuthBackend(BaseBackend):
     """
     Authenticate using NIM (for Mahasiswa) or NIK (for Dosen).
+
+    The profile and its user are loaded with one `select_related` query, and
+    the returned user has both profile relations cached, so building the
+    login response costs no further queries. Identifiers that do not exist
+    are remembered for AUTH_NEGATIVE_CACHE_TTL seconds (0 disables this), so
+    repeated attempts with unknown NIM/NIKs do not reach the database.
     """
     def authenticate(self, request, identifier=None, password=None, role=None, **kwargs):
-        if role == 'mahasiswa':
-            try:
-                mahasiswa = Mahasiswa.objects.get(nim=identifier)
-                user = mahasiswa.user
-            except Mahasiswa.DoesNotExist:
-                return None
-        elif role == 'dosen':
-            try:
-                dosen = Dosen.objects.get(nik=identifier)
-                user = dosen.user
-            except Dosen.DoesNotExist:
-                return None
-        else:
+        if role not in LOGIN_ROLES or not identifier:
             return None # Invalid role
 
+        model, identifier_field, related = LOGIN_ROLES[role]
+        cache_key = unknown_identifier_cache_key(role, identifier)
+        negative_ttl = getattr(settings, 'AUTH_NEGATIVE_CACHE_TTL', 0)
+        if negative_ttl and cache.get(cache_key):
+            return None
+
+        profile = (
+            model.objects
+            .select_related('user', related)
+            .filter(**{identifier_field: identifier})
+            .first()
+        )
+        if profile is None:
+            if negative_ttl:
+                cache.set(cache_key, True, negative_ttl)
+            return None
+
+        user = profile.user
+        # The user logs in under this role only; mark the other profile as absent.
+        for other_model, _, _ in LOGIN_ROLES.values():
+            if other_model is not model:
+                other_model._meta.get_field('user').remote_field.set_cached_value(user, None)
+
         if user.check_password(password):
             return user # Authentication successful
         return None # Wrong password
@@ -5,6 +5,7 @@ from django.contrib.auth.models import User
 from django.db import transaction
 
 from core.models import ActivityLog
+from .hashers import hash_password
 from .models import Mahasiswa, Dosen, ProgramStudi, Jurusan
 
 class UserCreationAdminForm(forms.Form):
@@ -70,17 +71,24 @@ class UserCreationAdminForm(forms.Form):
         return cleaned_data
 
     @transaction.atomic
-    def save(self):
+    def save(self, temporary_password=False):
+        """
+        Creates the User and its profile. With `temporary_password=True` the
+        password is hashed with the cheap TemporaryPasswordHasher (for bulk
+        creation); it is rehashed with the configured policy on first login.
+        """
         data = self.cleaned_data
         role = data['role']
         username = data['nim'] if role == 'mahasiswa' else data['nik']
         full_name = data['nama_lengkap']
         first_name, last_name = (full_name.split(' ', 1) + [''])[:2] # Safely split name
 
-        user = User.objects.create_user(
-            username=username, email=data['email'], password=data['password'],
-            first_name=first_name, last_name=last_name
+        user = User(
+            username=User.normalize_username(username), email=User.objects.normalize_email(data['email']),
+            first_name=first_name, last_name=last_name,
+            password=hash_password(data['password'], temporary=temporary_password),
         )
+        user.save()
 
         if role == 'mahasiswa':
             Mahasiswa.objects.create(user=user, nim=data['nim'], program_studi=data['program_studi_id'])
@@ -0,0 +1,68 @@
+# users/hashers.py
+
+from django.conf import settings
+from django.contrib.auth.hashers import (
+    Argon2PasswordHasher,
+    PBKDF2PasswordHasher,
+    ScryptPasswordHasher,
+    make_password,
+)
+
+# Algorithm name of the cheap hasher used for admin-issued temporary passwords.
+TEMPORARY_PASSWORD_ALGORITHM = 'pbkdf2_sha256_temp'
+
+
+class TunedScryptPasswordHasher(ScryptPasswordHasher):
+    """
+    scrypt with cost parameters taken from settings (PASSWORD_SCRYPT_*).
+    Hashes made with other parameters are upgraded on the next login.
+    """
+
+    @property
+    def work_factor(self):
+        return getattr(settings, 'PASSWORD_SCRYPT_WORK_FACTOR', 2 ** 14)
+
+    @property
+    def block_size(self):
+        return getattr(settings, 'PASSWORD_SCRYPT_BLOCK_SIZE', 8)
+
+    @property
+    def parallelism(self):
+        return getattr(settings, 'PASSWORD_SCRYPT_PARALLELISM', 1)
+
+
+class TunedArgon2PasswordHasher(Argon2PasswordHasher):
+    """
+    Argon2id with cost parameters taken from settings (PASSWORD_ARGON2_*).
+    Requires the optional `argon2-cffi` package.
+    """
+
+    @property
+    def time_cost(self):
+        return getattr(settings, 'PASSWORD_ARGON2_TIME_COST', 2)
+
+    @property
+    def memory_cost(self):
+        return getattr(settings, 'PASSWORD_ARGON2_MEMORY_COST', 19456)
+
+    @property
+    def parallelism(self):
+        return getattr(settings, 'PASSWORD_ARGON2_PARALLELISM', 1)
+
+
+class TemporaryPasswordHasher(PBKDF2PasswordHasher):
+    """
+    Low-iteration PBKDF2 for temporary passwords set by an admin or a bulk
+    import. It is never the preferred hasher, so Django rehashes the password
+    with the configured policy on the user's first successful login.
+    """
+    algorithm = TEMPORARY_PASSWORD_ALGORITHM
+
+    @property
+    def iterations(self):
+        return getattr(settings, 'PASSWORD_TEMPORARY_ITERATIONS', 10000)
+
+
+def hash_password(raw_password, temporary=False):
+    """Hashes a password with the configured policy, or the temporary-password hasher."""
+    return make_password(raw_password, hasher=TEMPORARY_PASSWORD_ALGORITHM if temporary else 'default')
@@ -0,0 +1,288 @@
+# users/importer.py
+
+import csv
+import io
+import os
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.functions import Lower
+from openpyxl import load_workbook
+
+from core.models import ActivityLog
+from core.stats import adjust_stats
+from .backends import unknown_identifier_cache_key
+from .hashers import TEMPORARY_PASSWORD_ALGORITHM
+from .models import Dosen, Jurusan, Mahasiswa, ProgramStudi
+
+# Expected header row. 'program_studi'/'jurusan' accept an id or a name;
+# 'dosen_pembimbing' is the NIK of an existing Dosen or one in the same file.
+IMPORT_COLUMNS = ('role', 'nama_lengkap', 'email', 'password', 'nim', 'nik', 'program_studi', 'jurusan', 'dosen_pembimbing')
+REQUIRED_COLUMNS = ('role', 'nama_lengkap', 'email', 'password')
+
+
+class UserImportError(Exception):
+    """Raised when an import file cannot be read at all (bad format or header)."""
+
+
+@dataclass
+class ImportReport:
+    """
+    Outcome of a bulk user import. `errors` lists (row number, message)
+    pairs; row numbers match the spreadsheet (the header is row 1).
+    """
+    total_rows: int = 0
+    mahasiswa_count: int = 0
+    dosen_count: int = 0
+    errors: list = field(default_factory=list)
+    elapsed: float = 0.0
+
+    @property
+    def created(self):
+        return self.mahasiswa_count + self.dosen_count
+
+    @property
+    def rows_per_sec(self):
+        return self.created / self.elapsed if self.elapsed else 0.0
+
+
+# --- Reading ---
+
+def read_rows(file_obj, file_name):
+    """
+    Reads a CSV or XLSX upload into a list of dicts keyed by the lower-cased
+    header. Values are stripped strings ('' for empty cells).
+    """
+    if file_name.lower().endswith('.xlsx'):
+        workbook = load_workbook(file_obj, read_only=True, data_only=True)
+        rows = workbook.active.iter_rows(values_only=True)
+        try:
+            header = next(rows)
+        except StopIteration:
+            raise UserImportError("File kosong.")
+        records = [_record(header, row) for row in rows if any(cell is not None for cell in row)]
+        workbook.close()
+    elif file_name.lower().endswith('.csv'):
+        try:
+            text = file_obj.read().decode('utf-8-sig')
+        except UnicodeDecodeError:
+            raise UserImportError("File CSV harus menggunakan encoding UTF-8.")
+        reader = csv.reader(io.StringIO(text, newline=''))
+        header = next(reader, None)
+        if header is None:
+            raise UserImportError("File kosong.")
+        records = [_record(header, row) for row in reader if any(cell.strip() for cell in row)]
+    else:
+        raise UserImportError("Format file harus .csv atau .xlsx.")
+
+    missing = [column for column in REQUIRED_COLUMNS if column not in _normalize_header(header)]
+    if missing:
+        raise UserImportError(f"Kolom wajib tidak ditemukan: {', '.join(missing)}.")
+    return records
+
+
+def _normalize_header(header):
+    return [str(cell or '').strip().lower() for cell in header]
+
+
+def _record(header, row):
+    values = ['' if cell is None else str(cell).strip() for cell in row]
+    values += [''] * (len(header) - len(values))
+    return dict(zip(_normalize_header(header), values))
+
+
+# --- Validation ---
+
+def validate_rows(rows):
+    """
+    Validates every row against the database with a fixed number of queries
+    (existing usernames, emails, prodi, jurusan and supervisors are loaded
+    once for the whole file). Returns (valid rows, errors).
+    """
+    identifiers = {row.get('nim') or row.get('nik') for row in rows} - {''}
+    emails = {row.get('email', '').lower() for row in rows} - {''}
+    taken_usernames = set(User.objects.filter(username__in=identifiers).values_list('username', flat=True))
+    # Emails are compared case-insensitively; `email__in` is case-sensitive on Postgres.
+    taken_emails = set(
+        User.objects.annotate(email_lower=Lower('email')).filter(email_lower__in=emails)
+        .values_list('email_lower', flat=True)
+    )
+
+    prodi_lookup = _lookup(ProgramStudi.objects.all(), 'nama_prodi')
+    jurusan_lookup = _lookup(Jurusan.objects.all(), 'nama_jurusan')
+    supervisor_niks = {row.get('dosen_pembimbing') for row in rows} - {''}
+    existing_dosen = {dosen.nik: dosen for dosen in Dosen.objects.filter(nik__in=supervisor_niks)}
+    file_dosen_niks = {row.get('nik') for row in rows if row.get('role', '').lower() == 'dosen'}
+
+    valid, errors = [], []
+    seen_identifiers, seen_emails = set(), set()
+    for number, row in enumerate(rows, start=2):
+        role = row.get('role', '').lower()
+        identifier = row.get('nim') if role == 'mahasiswa' else row.get('nik')
+        email = row.get('email', '').lower()
+        problems = []
+
+        if role not in ('mahasiswa', 'dosen'):
+            problems.append("role harus 'mahasiswa' atau 'dosen'")
+        if not row.get('nama_lengkap'):
+            problems.append("nama_lengkap wajib diisi")
+        if not row.get('password'):
+            problems.append("password wajib diisi")
+        if not email:
+            problems.append("email wajib diisi")
+        elif email in taken_emails or email in seen_emails:
+            problems.append(f"email {email} sudah digunakan")
+
+        if role == 'mahasiswa':
+            if not identifier:
+                problems.append("nim wajib diisi untuk mahasiswa")
+            row['program_studi_obj'] = prodi_lookup.get(row.get('program_studi', '').lower())
+            if row['program_studi_obj'] is None:
+                problems.append("program_studi tidak ditemukan")
+            supervisor = row.get('dosen_pembimbing')
+            if supervisor and supervisor not in existing_dosen and supervisor not in file_dosen_niks:
+                problems.append(f"dosen pembimbing dengan NIK {supervisor} tidak ditemukan")
+        elif role == 'dosen':
+            if not identifier:
+                problems.append("nik wajib diisi untuk dosen")
+            row['jurusan_obj'] = jurusan_lookup.get(row.get('jurusan', '').lower())
+            if row['jurusan_obj'] is None:
+                problems.append("jurusan tidak ditemukan")
+
+        if identifier and (identifier in taken_usernames or identifier in seen_identifiers):
+            problems.append(f"user dengan NIM/NIK {identifier} sudah ada")
+
+        if problems:
+            errors.append((number, '; '.join(problems)))
+            continue
+        row['role'] = role
+        row['identifier'] = identifier
+        seen_identifiers.add(identifier)
+        seen_emails.add(email)
+        valid.append(row)
+
+    for row in valid:
+        row['existing_supervisor'] = existing_dosen.get(row.get('dosen_pembimbing'))
+    return valid, errors
+
+
+def _lookup(queryset, name_field):
+    """Maps both the id and the lower-cased name of each row to the instance."""
+    lookup = {}
+    for obj in queryset:
+        lookup[str(obj.pk)] = obj
+        lookup[getattr(obj, name_field).lower()] = obj
+    return lookup
+
+
+# --- Hashing ---
+
+def _hash_chunk(passwords, algorithm):
+    return [make_password(password, hasher=algorithm) for password in passwords]
+
+
+def _init_worker():
+    # Spawned (non-forked) workers start without Django configured.
+    import django
+    from django.apps import apps
+    if not apps.ready:
+        django.setup()
+
+
+def hash_passwords(passwords, workers=None, temporary=False):
+    """
+    Hashes passwords in a process pool (key stretching is CPU-bound, so
+    threads would serialize on the GIL). `workers=1` hashes in-process.
+    """
+    algorithm = TEMPORARY_PASSWORD_ALGORITHM if temporary else 'default'
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(passwords) < 2:
+        return _hash_chunk(passwords, algorithm)
+
+    chunk_size = max(1, len(passwords) // (workers * 4))
+    chunks = [passwords[i:i + chunk_size] for i in range(0, len(passwords), chunk_size)]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+        hashed = executor.map(_hash_chunk, chunks, [algorithm] * len(chunks))
+        return [encoded for chunk in hashed for encoded in chunk]
+
+
+# --- Import ---
+
+def import_users(rows, actor=None, source='', batch_size=500, workers=None, temporary_passwords=False, skip_invalid=False):
+    """
+    Validates and imports user rows (see `read_rows`). Users and profiles are
+    inserted with `bulk_create` in batches inside one transaction, so the
+    per-user creation signals do not fire; a single summarized ActivityLog
+    entry is written instead.
+
+    If any row is invalid nothing is imported, unless `skip_invalid` is set.
+    Returns an ImportReport.
+    """
+    started = time.perf_counter()
+    report = ImportReport(total_rows=len(rows))
+    valid, report.errors = validate_rows(rows)
+    if not valid or (report.errors and not skip_invalid):
+        report.elapsed = time.perf_counter() - started
+        return report
+
+    hashed = hash_passwords([row['password'] for row in valid], workers=workers, temporary=temporary_passwords)
+    users = []
+    for row, password in zip(valid, hashed):
+        first_name, last_name = (row['nama_lengkap'].split(' ', 1) + [''])[:2] # Safely split name
+        users.append(User(
+            username=User.normalize_username(row['identifier']),
+            email=User.objects.normalize_email(row['email']),
+            first_name=first_name, last_name=last_name, password=password,
+        ))
+
+    with transaction.atomic():
+        User.objects.bulk_create(users, batch_size=batch_size)
+        dosen_rows = [(row, user) for row, user in zip(valid, users) if row['role'] == 'dosen']
+        mahasiswa_rows = [(row, user) for row, user in zip(valid, users) if row['role'] == 'mahasiswa']
+
+        # Dosen first, so students in the same file can name them as supervisor.
+        new_dosen = Dosen.objects.bulk_create(
+            [Dosen(user=user, nik=row['nik'], jurusan=row['jurusan_obj']) for row, user in dosen_rows],
+            batch_size=batch_size,
+        )
+        dosen_by_nik = {dosen.nik: dosen for dosen in new_dosen}
+        Mahasiswa.objects.bulk_create(
+            [
+                Mahasiswa(
+                    user=user, nim=row['nim'], program_studi=row['program_studi_obj'],
+                    dosen_pembimbing=row['existing_supervisor'] or dosen_by_nik.get(row.get('dosen_pembimbing')),
+                )
+                for row, user in mahasiswa_rows
+            ],
+            batch_size=batch_size,
+        )
+        report.dosen_count, report.mahasiswa_count = len(dosen_rows), len(mahasiswa_rows)
+        # bulk_create skips the post_save receivers that keep the dashboard counters.
+        adjust_stats(
+            total_dosen=report.dosen_count, total_mahasiswa=report.mahasiswa_count,
+            prodi_deltas=Counter(row['program_studi_obj'].pk for row, _ in mahasiswa_rows),
+        )
+
+        actor = actor or User.objects.filter(is_superuser=True, is_active=True).first()
+        if actor:
+            ActivityLog.objects.create(
+                actor=actor,
+                verb="mengimpor pengguna",
+                description=(
+                    f"Mengimpor {report.created} pengguna ({report.mahasiswa_count} mahasiswa, "
+                    f"{report.dosen_count} dosen){f' dari {source}' if source else ''}"
+                ),
+            )
+
+    # bulk_create skips the post_save receiver that clears cached login misses.
+    cache.delete_many([
+        unknown_identifier_cache_key(row['role'], row['identifier']) for row in valid
+    ])
+    report.elapsed = time.perf_counter() - started
+    return report
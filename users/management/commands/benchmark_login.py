@@ -0,0 +1,65 @@
+# users/management/commands/benchmark_login.py
+
+import importlib.util
+import time
+
+from django.conf import settings
+from django.contrib.auth import authenticate
+from django.contrib.auth.hashers import check_password, get_hasher, make_password
+from django.core.management.base import BaseCommand, CommandError
+
+from users.hashers import TEMPORARY_PASSWORD_ALGORITHM
+
+
+class Command(BaseCommand):
+    """
+    Measures how many password verifications (the CPU cost of a login) one
+    core can do per second with each available hasher, using the cost
+    parameters from settings. Runs on a single thread, so the result is
+    logins/sec per core; multiply by the worker count for a capacity estimate.
+
+    With --role/--identifier/--password it also times full NIM/NIK logins
+    through the authentication backends (database lookup included).
+    """
+    help = "Benchmarks login throughput (logins/sec per core) for each password hasher."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seconds', type=float, default=2.0, help="Time spent per hasher.")
+        parser.add_argument('--role', choices=['mahasiswa', 'dosen'], help="Role of an existing user for a full login benchmark.")
+        parser.add_argument('--identifier', help="NIM/NIK of an existing user for a full login benchmark.")
+        parser.add_argument('--password', help="Password of that user.")
+
+    def handle(self, *args, **options):
+        algorithms = ['pbkdf2_sha256', 'scrypt', TEMPORARY_PASSWORD_ALGORITHM]
+        if importlib.util.find_spec('argon2') is not None:
+            algorithms.insert(2, 'argon2')
+
+        preferred = get_hasher('default').algorithm
+        self.stdout.write(f"Policy: {settings.PASSWORD_HASHER_POLICY} (new hashes use '{preferred}')")
+        for algorithm in algorithms:
+            encoded = make_password('benchmark-password', hasher=algorithm)
+            rate, latency = self._measure(lambda: check_password('benchmark-password', encoded), options['seconds'])
+            marker = ' *' if algorithm == preferred else ''
+            self.stdout.write(f"  {algorithm:<22} {rate:>9.1f} logins/sec/core  {latency:>8.1f} ms/login{marker}")
+
+        if options['identifier']:
+            if not (options['role'] and options['password']):
+                raise CommandError("--role dan --password wajib diisi bersama --identifier.")
+            credentials = {'identifier': options['identifier'], 'password': options['password'], 'role': options['role']}
+            if authenticate(None, **credentials) is None:
+                raise CommandError("Login gagal: periksa identifier, role dan password.")
+            rate, latency = self._measure(lambda: authenticate(None, **credentials), options['seconds'])
+            self.stdout.write(self.style.SUCCESS(
+                f"Full login ({options['role']}): {rate:.1f} logins/sec/core, {latency:.1f} ms/login"
+            ))
+
+    def _measure(self, func, seconds):
+        """Calls `func` repeatedly for about `seconds`; returns (calls/sec, ms per call)."""
+        func()  # Warm up (imports, lazy hasher setup)
+        count, started = 0, time.perf_counter()
+        while True:
+            func()
+            count += 1
+            elapsed = time.perf_counter() - started
+            if elapsed >= seconds:
+                return count / elapsed, elapsed * 1000 / count
@@ -0,0 +1,23 @@
+# Generated by Django 5.2 on 2026-10-18 17:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0004_remove_historicalmahasiswa_dosen_pembimbing_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jurusan',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='programstudi',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
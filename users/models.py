@@ -5,6 +5,7 @@ from django.contrib.auth.models import User
 
 class Jurusan(models.Model):
     nama_jurusan = models.CharField(max_length=255, unique=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.nama_jurusan
@@ -12,6 +13,7 @@ class Jurusan(models.Model):
 class ProgramStudi(models.Model):
     nama_prodi = models.CharField(max_length=255, unique=True)
     jurusan = models.ForeignKey(Jurusan, on_delete=models.PROTECT, related_name='program_studi')
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.nama_prodi
@@ -0,0 +1,113 @@
+# users/profiles.py
+
+from django.contrib.auth.models import User
+from django.utils.functional import cached_property
+
+from .models import Dosen, Mahasiswa
+from .tokens import ROLE_DOSEN, ROLE_MAHASISWA
+
+# Joined when the profile is loaded, so permissions, views and serializers
+# can follow these relations without further queries.
+PROFILE_RELATED = (
+    'mahasiswa_profile__program_studi__jurusan',
+    'mahasiswa_profile__dosen_pembimbing__user',
+    'mahasiswa_profile__tugas_akhir__dosen_pembimbing__user',
+    'dosen_profile__jurusan',
+)
+
+_UNKNOWN = object()
+
+
+class RequestProfile:
+    """
+    The requesting user's role and Mahasiswa/Dosen profile, resolved at most
+    once per request (see `get_request_profile`).
+
+    - `role` is free when the user came from a role-claims token (or the
+      profile relations were already cached); otherwise it loads the profile.
+    - `profile`, `mahasiswa` and `dosen` load the profile with its prodi,
+      jurusan, supervisor and tugas_akhir in a single query.
+    """
+
+    def __init__(self, user):
+        self.user = user
+
+    @property
+    def is_authenticated(self):
+        return bool(self.user and self.user.is_authenticated)
+
+    @cached_property
+    def role(self):
+        if not self.is_authenticated:
+            return None
+        role = _cached_role(self.user)
+        if role is _UNKNOWN:
+            role = _role_of(self.profile)
+        return role
+
+    @cached_property
+    def profile(self):
+        if not self.is_authenticated:
+            return None
+        loaded = User.objects.select_related(*PROFILE_RELATED).filter(pk=self.user.pk).first()
+        mahasiswa = getattr(loaded, 'mahasiswa_profile', None)
+        dosen = getattr(loaded, 'dosen_profile', None)
+
+        # Share the loaded profiles with request.user so plain attribute
+        # access elsewhere (e.g. `user.mahasiswa_profile`) is free as well.
+        for model, profile in ((Mahasiswa, mahasiswa), (Dosen, dosen)):
+            user_field = model._meta.get_field('user')
+            user_field.remote_field.set_cached_value(self.user, profile)
+            if profile is not None:
+                user_field.set_cached_value(profile, self.user)
+        return mahasiswa or dosen
+
+    @property
+    def is_mahasiswa(self):
+        return self.role == ROLE_MAHASISWA
+
+    @property
+    def is_dosen(self):
+        return self.role == ROLE_DOSEN
+
+    @property
+    def mahasiswa(self):
+        return self.profile if self.is_mahasiswa else None
+
+    @property
+    def dosen(self):
+        return self.profile if self.is_dosen else None
+
+
+def get_request_profile(request):
+    """
+    Returns the RequestProfile of `request.user`, memoized on the underlying
+    HttpRequest so a DRF view, its permissions and its serializers share it.
+    """
+    http_request = getattr(request, '_request', request)
+    resolved = getattr(http_request, '_request_profile', None)
+    if resolved is None or resolved.user is not request.user:
+        resolved = RequestProfile(request.user)
+        http_request._request_profile = resolved
+    return resolved
+
+
+def _cached_role(user):
+    """The role implied by already-cached profile relations, without a query."""
+    mahasiswa_rel = Mahasiswa._meta.get_field('user').remote_field
+    dosen_rel = Dosen._meta.get_field('user').remote_field
+    if mahasiswa_rel.is_cached(user) and mahasiswa_rel.get_cached_value(user) is not None:
+        return ROLE_MAHASISWA
+    if dosen_rel.is_cached(user) and dosen_rel.get_cached_value(user) is not None:
+        return ROLE_DOSEN
+    if mahasiswa_rel.is_cached(user) and dosen_rel.is_cached(user):
+        return None
+    return _UNKNOWN
+
+
+def _role_of(profile):
+    if isinstance(profile, Mahasiswa):
+        return ROLE_MAHASISWA
+    if isinstance(profile, Dosen):
+        return ROLE_DOSEN
+    return None
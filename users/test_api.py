@@ -4,6 +4,7 @@ from django.urls import reverse
 from rest_framework.test import APIClient
 from rest_framework import status
 from django.contrib.auth.models import User
+from unittest.mock import patch
 from .models import Jurusan, ProgramStudi, Dosen, Mahasiswa
 
 # Mark all tests in this module as needing database access
@@ -170,6 +171,49 @@ class TestAuthAPI:
         assert response.status_code == status.HTTP_401_UNAUTHORIZED
         assert response.data['status'] == 'error'
 
+    def test_login_loads_profile_and_user_in_one_query(self, api_client, mahasiswa, dosen, django_assert_num_queries):
+        """
+        Test that a login costs one SELECT plus the outstanding-token INSERT.
+        """
+        url = reverse('login')
+        for role, profile, identifier in (('mahasiswa', mahasiswa, mahasiswa.nim), ('dosen', dosen, dosen.nik)):
+            data = {'role': role, 'identifier': identifier, 'password': 'password123'}
+            with django_assert_num_queries(2):
+                response = api_client.post(url, data, format='json')
+            assert response.status_code == status.HTTP_200_OK
+            assert response.data['data']['user']['id'] == profile.pk
+
+    def test_unknown_identifier_is_not_cached_without_shared_cache(self, api_client, django_assert_num_queries):
+        """
+        Test that with the default (per-process) cache every unknown NIM is looked up,
+        and the miss is neither read from nor written to the cache.
+        """
+        url = reverse('login')
+        data = {'role': 'mahasiswa', 'identifier': '000111', 'password': 'password123'}
+        with patch('users.backends.cache') as mock_cache:
+            for _ in range(2):
+                with django_assert_num_queries(1):
+                    assert api_client.post(url, data, format='json').status_code == status.HTTP_401_UNAUTHORIZED
+        mock_cache.get.assert_not_called()
+        mock_cache.set.assert_not_called()
+
+    def test_unknown_identifier_is_negatively_cached(self, api_client, prodi, settings, django_assert_num_queries):
+        """
+        Test that a repeated unknown NIM is rejected without a query, and that
+        registering it clears the cached miss.
+        """
+        settings.AUTH_NEGATIVE_CACHE_TTL = 60  # As configured with a shared (Redis) cache
+        url = reverse('login')
+        data = {'role': 'mahasiswa', 'identifier': '000111', 'password': 'password123'}
+        assert api_client.post(url, data, format='json').status_code == status.HTTP_401_UNAUTHORIZED
+        with django_assert_num_queries(0):
+            response = api_client.post(url, data, format='json')
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+        user = User.objects.create_user(username='000111', password='password123')
+        Mahasiswa.objects.create(user=user, nim='000111', program_studi=prodi)
+        assert api_client.post(url, data, format='json').status_code == status.HTTP_200_OK
+
     def test_logout_success(self, api_client, mahasiswa):
         """
         Test successful logout by blacklisting the refresh token.
@@ -252,3 +296,155 @@ class TestProfileAPI:
         mahasiswa.user.refresh_from_db()
         assert mahasiswa.user.email == 'cinta.updated@test.com'
         assert mahasiswa.user.get_full_name() == 'Cinta Laura Updated'
+
+
+class TestDirectoryPagination:
+    """
+    Tests for cursor pagination on the Dosen and lookup endpoints.
+    """
+
+    def test_dosen_list_is_paginated_by_name(self, api_client, mahasiswa, jurusan):
+        """
+        Test that the Dosen list pages alphabetically with a cursor.
+        """
+        for i, name in enumerate(['Zaki', 'Andi', 'Maya']):
+            user = User.objects.create_user(username=f'dosen{i}', password='pw', first_name=name)
+            Dosen.objects.create(user=user, nik=f'nik{i}', jurusan=jurusan)
+        api_client.force_authenticate(user=mahasiswa.user)
+
+        response = api_client.get(reverse('dosen-list'), {'page_size': 2})
+        assert [item['nama_lengkap'] for item in response.data['results']] == ['Andi', 'Budi Darmawan']
+
+        response = api_client.get(response.data['next'])
+        assert [item['nama_lengkap'] for item in response.data['results']] == ['Maya', 'Zaki']
+        assert response.data['next'] is None
+
+    def test_lookup_tables_are_not_paginated(self, api_client, prodi):
+        """
+        Test that Jurusan and Program Studi are returned as plain lists.
+        """
+        response = api_client.get(reverse('jurusan-list'))
+        assert response.data[0]['nama_jurusan'] == 'Teknik Informatika'
+        response = api_client.get(reverse('program-studi-list'))
+        assert response.data[0]['nama_prodi'] == 'S1 Informatika'
+
+    def test_lookup_tables_support_conditional_get(self, api_client, prodi, django_assert_num_queries):
+        """
+        Test that an unchanged lookup table is revalidated with one query and a
+        304, and that filters and edits produce a new ETag.
+        """
+        url = reverse('program-studi-list')
+        response = api_client.get(url)
+        assert 'public' in response['Cache-Control']
+
+        with django_assert_num_queries(1):
+            not_modified = api_client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        assert not_modified.status_code == 304
+        filtered = api_client.get(url, {'jurusan_id': prodi.jurusan_id}, HTTP_IF_NONE_MATCH=response['ETag'])
+        assert filtered.status_code == 200
+
+        prodi.nama_prodi = 'S1 Teknik Informatika'
+        prodi.save()
+        assert api_client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code == 200
+
+        detail = api_client.get(reverse('jurusan-detail', args=[prodi.jurusan_id]))
+        assert api_client.get(
+            reverse('jurusan-detail', args=[prodi.jurusan_id]), HTTP_IF_NONE_MATCH=detail['ETag']
+        ).status_code == 304
+        assert api_client.get(reverse('jurusan-detail', args=[999])).status_code == 404
+
+
+class TestRoleClaimsTokens:
+    """
+    Tests for role claims in JWTs and the stateless authentication path.
+    """
+
+    def _authenticate(self, token):
+        from rest_framework.test import APIRequestFactory
+        from .authentication import RoleClaimsJWTAuthentication
+
+        request = APIRequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {token}')
+        return RoleClaimsJWTAuthentication().authenticate(request)[0]
+
+    def test_tokens_carry_role_claims(self, mahasiswa, prodi, dosen):
+        """
+        Test that both tokens carry the role, profile, prodi/jurusan and supervisor.
+        """
+        from rest_framework_simplejwt.tokens import AccessToken
+        from .api_views import get_tokens_for_user
+
+        access = AccessToken(get_tokens_for_user(mahasiswa.user)['access'])
+        assert access['role'] == 'mahasiswa'
+        assert access['profile_id'] == mahasiswa.pk
+        assert access['prodi_id'] == prodi.pk
+        assert access['jurusan_id'] == prodi.jurusan_id
+        assert access['dosen_pembimbing_id'] == dosen.pk
+
+    def test_user_is_rebuilt_from_claims_without_queries(self, mahasiswa, dosen, django_assert_num_queries):
+        """
+        Test that authenticating with a role token and checking roles costs no query.
+        """
+        from .api_views import get_tokens_for_user
+
+        mahasiswa_token = get_tokens_for_user(mahasiswa.user)['access']
+        dosen_token = get_tokens_for_user(dosen.user)['access']
+        with django_assert_num_queries(0):
+            user = self._authenticate(mahasiswa_token)
+            assert user.pk == mahasiswa.user.pk
+            assert user.get_full_name() == 'Cinta Laura'
+            assert hasattr(user, 'mahasiswa_profile')
+            assert not hasattr(user, 'dosen_profile')
+            assert user.mahasiswa_profile.pk == mahasiswa.pk
+
+            user = self._authenticate(dosen_token)
+            assert hasattr(user, 'dosen_profile')
+            assert not hasattr(user, 'mahasiswa_profile')
+
+    def test_token_without_role_claims_falls_back_to_database(self, mahasiswa):
+        """
+        Test that tokens issued before role claims still authenticate.
+        """
+        from rest_framework_simplejwt.tokens import RefreshToken
+
+        user = self._authenticate(str(RefreshToken.for_user(mahasiswa.user).access_token))
+        assert user == mahasiswa.user
+        assert user.mahasiswa_profile == mahasiswa
+
+    def test_inactive_user_is_rejected(self, api_client, mahasiswa, django_assert_num_queries):
+        """
+        Test that a deactivated user can neither use a fresh token nor refresh one.
+        """
+        from rest_framework_simplejwt.exceptions import AuthenticationFailed
+        from .api_views import get_tokens_for_user
+
+        tokens = get_tokens_for_user(mahasiswa.user)
+        with django_assert_num_queries(0):
+            assert self._authenticate(tokens['access']).is_active is True
+
+        mahasiswa.user.is_active = False
+        mahasiswa.user.save()
+        with pytest.raises(AuthenticationFailed):
+            self._authenticate(get_tokens_for_user(mahasiswa.user)['access'])
+
+        response = api_client.post(reverse('token_refresh'), {'refresh': tokens['refresh']}, format='json')
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+        mahasiswa.user.delete()
+        response = api_client.post(reverse('token_refresh'), {'refresh': tokens['refresh']}, format='json')
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_refresh_picks_up_a_new_supervisor(self, api_client, mahasiswa, jurusan):
+        """
+        Test that a refreshed access token carries the current supervisor.
+        """
+        from rest_framework_simplejwt.tokens import AccessToken
+        from .api_views import get_tokens_for_user
+
+        refresh = get_tokens_for_user(mahasiswa.user)['refresh']
+        new_user = User.objects.create_user(username='445566', password='pw')
+        new_dosen = Dosen.objects.create(user=new_user, nik='445566', jurusan=jurusan)
+        Mahasiswa.objects.filter(pk=mahasiswa.pk).update(dosen_pembimbing=new_dosen)
+
+        response = api_client.post(reverse('token_refresh'), {'refresh': refresh}, format='json')
+        assert response.status_code == status.HTTP_200_OK
+        assert AccessToken(response.data['access'])['dosen_pembimbing_id'] == new_dosen.pk
@@ -1,4 +1,7 @@
 # users/tests.py
+import csv
+import io
+import json
 import pytest
 from django.urls import reverse
 from django.contrib.auth.models import User
@@ -13,6 +16,8 @@ from django.utils.encoding import force_bytes
 from .models import Jurusan, ProgramStudi, Dosen, Mahasiswa
 from .forms import UserCreationAdminForm, UserEditForm
 from .backends import NimNikAuthBackend
+from .views import user_export_queryset, user_export_rows
+from openpyxl import load_workbook
 from tugas_akhir.models import TugasAkhir
 
 
@@ -125,6 +130,43 @@ def test_user_creation_form_valid_dosen(jurusan):
     assert user.username == '654321'
     assert hasattr(user, 'dosen_profile')
 
+def test_user_creation_form_temporary_password_is_upgraded_on_login(prodi):
+    """Test that a cheap temporary hash is replaced by the policy hasher at first login."""
+    form_data = {
+        'role': 'mahasiswa', 'nama_lengkap': 'Andi Budiman',
+        'email': 'andi.b@test.com', 'password': 'password123',
+        'password2': 'password123', 'nim': '123456',
+        'program_studi_id': prodi.id
+    }
+    form = UserCreationAdminForm(data=form_data)
+    assert form.is_valid(), form.errors
+    user = form.save(temporary_password=True)
+    assert user.password.startswith('pbkdf2_sha256_temp$')
+
+    assert authenticate(None, identifier='123456', password='password123', role='mahasiswa') is not None
+    user.refresh_from_db()
+    assert user.password.startswith('scrypt$')
+    assert user.check_password('password123')
+
+def test_changed_hasher_cost_is_rehashed_on_login(settings, mahasiswa):
+    """Test that tuning the scrypt cost upgrades existing hashes transparently."""
+    settings.PASSWORD_SCRYPT_WORK_FACTOR = 2 ** 12
+    assert authenticate(None, identifier=mahasiswa.nim, password='password123', role='mahasiswa') is not None
+    mahasiswa.user.refresh_from_db()
+    assert mahasiswa.user.password.startswith('scrypt$4096$')
+
+def test_benchmark_login_reports_rate_per_hasher(mahasiswa):
+    """Test that the login benchmark reports logins/sec per core for each hasher and a full login."""
+    from io import StringIO
+    from django.core.management import call_command
+
+    out = StringIO()
+    call_command('benchmark_login', seconds=0.01, role='mahasiswa', identifier=mahasiswa.nim, password='password123', stdout=out)
+    output = out.getvalue()
+    for algorithm in ('pbkdf2_sha256', 'scrypt', 'pbkdf2_sha256_temp'):
+        assert algorithm in output
+    assert 'Full login (mahasiswa)' in output
+
 def test_user_creation_form_password_mismatch(prodi):
     """Test that the form catches password mismatches."""
     form_data = {
@@ -319,6 +361,113 @@ def test_user_export_view(admin_client, mahasiswa):
     assert response['Content-Type'] == 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
     assert 'attachment; filename="users_export.xlsx"' in response['Content-Disposition']
 
+def test_user_export_formats_share_columns(admin_client, mahasiswa, django_assert_num_queries):
+    """Test that CSV and NDJSON exports stream the XLSX columns from one values() query."""
+    url = reverse('users:user_export')
+    xlsx_rows = list(load_workbook(io.BytesIO(admin_client.get(url).getvalue())).active.values)
+
+    response = admin_client.get(url, {'format': 'csv'})
+    content = response.getvalue().decode()
+    assert response.streaming
+    assert response['Content-Disposition'] == 'attachment; filename="users_export.csv"'
+    assert list(csv.reader(io.StringIO(content))) == [list(row) for row in xlsx_rows]
+
+    response = admin_client.get(url, {'format': 'ndjson', 'role': 'mahasiswa'})
+    records = [json.loads(line) for line in response.getvalue().decode().splitlines()]
+    assert response['Content-Type'] == 'application/x-ndjson'
+    assert records == [{
+        'full_name': 'Cinta Laura', 'email': 'mahasiswa.test@test.com', 'role': 'Mahasiswa',
+        'identifier': '998877', 'status': 'Active', 'details': 'S1 Informatika',
+        'advisor': 'Budi Darmawan (112233)',
+    }]
+
+    with django_assert_num_queries(1):
+        rows = list(user_export_rows(user_export_queryset({}).iterator(chunk_size=100)))
+    assert rows[0][3] == '112233' and rows[0][6] == '1 Mahasiswa'
+
+def test_user_export_rejects_unknown_format(admin_client):
+    response = admin_client.get(reverse('users:user_export'), {'format': 'pdf'})
+    assert response.status_code == 400
+
+
+## --- Bulk Import Tests ---
+
+IMPORT_HEADER = 'role,nama_lengkap,email,password,nim,nik,program_studi,jurusan,dosen_pembimbing\n'
+
+def test_import_users_command_bulk_creates_users(tmp_path, prodi, jurusan, dosen, admin_user):
+    """Test a CSV import with a process pool, one summarized log entry and working logins."""
+    from io import StringIO
+    from django.core.management import call_command
+    from core.models import ActivityLog
+
+    path = tmp_path / 'angkatan.csv'
+    path.write_text(
+        IMPORT_HEADER
+        + 'dosen,Rina Wati,rina@test.com,rahasia123,,778899,,Teknik Informatika,\n'
+        + f'mahasiswa,Adi Saputra,adi@test.com,rahasia123,220001,,{prodi.pk},,778899\n'
+        + 'mahasiswa,Bela Putri,bela@test.com,rahasia123,220002,,S1 Informatika,,112233\n'
+    )
+    logs_before = ActivityLog.objects.count()
+    out = StringIO()
+    call_command('import_users', str(path), workers=2, temporary_passwords=True, stdout=out)
+
+    assert 'Imported 3 of 3 rows' in out.getvalue() and 'rows/sec' in out.getvalue()
+    assert Mahasiswa.objects.get(nim='220001').dosen_pembimbing.nik == '778899'
+    assert Mahasiswa.objects.get(nim='220002').dosen_pembimbing == dosen
+    assert User.objects.get(username='220001').password.startswith('pbkdf2_sha256_temp$')
+    assert ActivityLog.objects.count() == logs_before + 1
+    assert ActivityLog.objects.latest('pk').verb == 'mengimpor pengguna'
+    assert authenticate(None, identifier='778899', password='rahasia123', role='dosen') is not None
+
+def test_import_users_rejects_file_with_invalid_rows(tmp_path, prodi, mahasiswa):
+    """Test that one invalid row aborts the whole import unless --skip-invalid is given."""
+    from io import StringIO
+    from django.core.management import call_command
+    from django.core.management.base import CommandError
+
+    path = tmp_path / 'angkatan.csv'
+    path.write_text(
+        IMPORT_HEADER
+        + f'mahasiswa,Adi Saputra,adi@test.com,rahasia123,220001,,{prodi.pk},,\n'
+        + f'mahasiswa,Duplikat,dup@test.com,rahasia123,{mahasiswa.nim},,{prodi.pk},,\n'
+    )
+    with pytest.raises(CommandError):
+        call_command('import_users', str(path), workers=1, stdout=StringIO(), stderr=StringIO())
+    assert not User.objects.filter(username='220001').exists()
+
+    call_command('import_users', str(path), workers=1, skip_invalid=True, stdout=StringIO(), stderr=StringIO())
+    assert User.objects.filter(username='220001').exists()
+
+def test_import_validation_matches_existing_emails_case_insensitively(prodi, mahasiswa):
+    """Test that an imported email differing only in case from an existing one is rejected."""
+    from .importer import validate_rows
+
+    User.objects.filter(pk=mahasiswa.user.pk).update(email='Mahasiswa.Test@Test.com')
+    rows = [{
+        'role': 'mahasiswa', 'nama_lengkap': 'Adi Saputra', 'email': 'mahasiswa.test@test.com',
+        'password': 'rahasia123', 'nim': '220001', 'program_studi': str(prodi.pk),
+    }]
+    valid, errors = validate_rows(rows)
+    assert valid == []
+    assert 'sudah digunakan' in str(errors)
+
+def test_user_import_view_accepts_xlsx(admin_client, prodi):
+    """Test that the admin upload imports an XLSX file and reports the result."""
+    from io import BytesIO
+    from django.core.files.uploadedfile import SimpleUploadedFile
+    from openpyxl import Workbook
+
+    wb = Workbook()
+    wb.active.append(IMPORT_HEADER.strip().split(','))
+    wb.active.append(['mahasiswa', 'Citra Dewi', 'citra@test.com', 'rahasia123', 220003, None, 'S1 Informatika', None, None])
+    buffer = BytesIO()
+    wb.save(buffer)
+    upload = SimpleUploadedFile('angkatan.xlsx', buffer.getvalue())
+
+    response = admin_client.post(reverse('users:user_import'), {'file': upload, 'temporary_passwords': 'on'})
+    assert response.status_code == 200
+    assert response.json()['created'] == 1
+    assert Mahasiswa.objects.filter(nim='220003', user__first_name='Citra').exists()
 
 ## --- Password Reset View Tests ---
 
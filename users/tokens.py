@@ -0,0 +1,127 @@
+# users/tokens.py
+
+from django.contrib.auth.models import User
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from .models import Dosen, Mahasiswa
+
+# User fields copied into the token so the request user can be rebuilt
+# without touching the database.
+USER_CLAIM_FIELDS = ('username', 'first_name', 'last_name', 'is_active', 'is_staff', 'is_superuser')
+
+ROLE_MAHASISWA = 'mahasiswa'
+ROLE_DOSEN = 'dosen'
+
+
+def role_claims(user):
+    """
+    Returns the role claims embedded in every token issued for `user`:
+    role, profile pk, prodi/jurusan and, for a Mahasiswa, the supervisor id.
+    """
+    claims = {field: getattr(user, field) for field in USER_CLAIM_FIELDS}
+    claims.update({
+        'role': '',
+        'profile_id': None,
+        'prodi_id': None,
+        'jurusan_id': None,
+        'dosen_pembimbing_id': None,
+    })
+
+    mahasiswa = getattr(user, 'mahasiswa_profile', None)
+    dosen = getattr(user, 'dosen_profile', None)
+    if mahasiswa is not None:
+        claims.update({
+            'role': ROLE_MAHASISWA,
+            'profile_id': mahasiswa.pk,
+            'prodi_id': mahasiswa.program_studi_id,
+            'jurusan_id': mahasiswa.program_studi.jurusan_id,
+            'dosen_pembimbing_id': mahasiswa.dosen_pembimbing_id,
+        })
+    elif dosen is not None:
+        claims.update({
+            'role': ROLE_DOSEN,
+            'profile_id': dosen.pk,
+            'jurusan_id': dosen.jurusan_id,
+        })
+    return claims
+
+
+class RoleRefreshToken(RefreshToken):
+    """
+    Refresh token carrying the user's role claims (see `role_claims`).
+    The access token derived from it copies every claim, so
+    `users.authentication.RoleClaimsJWTAuthentication` can authenticate
+    requests without loading the user or its profile.
+    """
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        for claim, value in role_claims(user).items():
+            token[claim] = value
+        return token
+
+
+class RoleTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Re-reads the role claims when a new access token is issued, so a changed
+    supervisor, role or staff flag is picked up at the next refresh instead
+    of living on for the refresh token's whole lifetime. A deleted or
+    inactive user gets no new access token.
+    """
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+        user = (
+            User.objects
+            .select_related('mahasiswa_profile__program_studi', 'dosen_profile')
+            .filter(pk=refresh.payload.get(api_settings.USER_ID_CLAIM), is_active=True)
+            .first()
+        )
+        if user is None:
+            raise AuthenticationFailed(self.error_messages['no_active_account'], 'no_active_account')
+
+        data = super().validate(attrs)
+        access = AccessToken(data['access'])
+        for claim, value in role_claims(user).items():
+            access[claim] = value
+        data['access'] = str(access)
+        return data
+
+
+def user_from_claims(token):
+    """
+    Builds a request user from a validated token's claims, without a query.
+
+    The result is a real `User` instance with only the claimed fields
+    loaded (the rest are deferred and fetched on access). Its
+    `mahasiswa_profile`/`dosen_profile` relations are pre-cached: the
+    matching profile is a pk-only instance and the other one is None, so
+    `hasattr(user, 'dosen_profile')` and `obj.pemilik_id == user.pk` style
+    checks never hit the database.
+    """
+    user_id = token[api_settings.USER_ID_CLAIM]
+    data = {'id': user_id}
+    data.update({field: token.get(field) for field in USER_CLAIM_FIELDS})
+    user = _instance_from_data(User, data)
+
+    role = token.get('role')
+    mahasiswa = _instance_from_data(Mahasiswa, {'user_id': user_id}) if role == ROLE_MAHASISWA else None
+    dosen = _instance_from_data(Dosen, {'user_id': user_id}) if role == ROLE_DOSEN else None
+
+    for model, profile in ((Mahasiswa, mahasiswa), (Dosen, dosen)):
+        user_field = model._meta.get_field('user')
+        user_field.remote_field.set_cached_value(user, profile)
+        if profile is not None:
+            user_field.set_cached_value(profile, user)
+    return user
+
+
+def _instance_from_data(model, data):
+    """`Model.from_db` expects the loaded values in concrete field order."""
+    field_names = [f.attname for f in model._meta.concrete_fields if f.attname in data]
+    return model.from_db(DEFAULT_DB_ALIAS, field_names, [data[name] for name in field_names])
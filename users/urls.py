@@ -13,6 +13,7 @@ urlpatterns = [
     path('<int:pk>/delete/', views.UserDeleteView.as_view(), name='user_delete'),
     path('<int:pk>/edit/', views.UserEditView.as_view(), name='user_edit'),
     path('create/', views.UserCreateView.as_view(), name='user_create'),
+    path('import/', views.UserImportView.as_view(), name='user_import'),
 
     # Template-based Password reset URLs from views
     path('auth/password-reset/', views.PasswordResetRequestView.as_view(), name='password_reset_request_form'),
@@ -2,15 +2,14 @@
 
 import json
 import csv
-from django.http import HttpResponse
 from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.auth.models import User
 from django.contrib.auth.tokens import default_token_generator
 from django.core.mail import EmailMultiAlternatives
-from django.db.models import Prefetch, Q
-from django.http import JsonResponse
+from django.db.models import Count, Prefetch, Q
+from django.http import HttpResponseBadRequest, JsonResponse
 from django.shortcuts import render, redirect, get_object_or_404
 from django.template.loader import render_to_string
 from django.urls import reverse
@@ -18,17 +17,15 @@ from django.utils.encoding import force_bytes, force_str
 from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
 from django.views.generic import ListView, View, TemplateView
 
+from core.exports import EXPORT_CHUNK_SIZE, EXPORT_FORMATS, export_response, full_name
 from tugas_akhir.models import TugasAkhir
 from .forms import UserCreationAdminForm, UserEditForm
+from .importer import IMPORT_COLUMNS, UserImportError, import_users, read_rows
 from .models import Mahasiswa, Dosen, ProgramStudi, Jurusan
 from .serializers import PasswordResetConfirmSerializer, PasswordResetRequestSerializer
 from django.db.models import Value
 from django.db.models.functions import Concat
 
-# openpyxl import
-from openpyxl import Workbook
-from openpyxl.styles import Font, Alignment, PatternFill
-from openpyxl.utils import get_column_letter
 
 # --- Template-Based Views (Password Reset & User Management) ---
 
@@ -137,6 +134,42 @@ class PasswordResetConfirmView(View):
         return render(request, self.form_template_name, context)
 
 
+def user_list_queryset(params):
+    """
+    Mahasiswa and Dosen users filtered by the management page's search
+    (`params['q']`) and role tab (`params['role']`), with the related data
+    the list, the export view and background export jobs need pre-loaded.
+    """
+    queryset = User.objects.filter(
+        Q(mahasiswa_profile__isnull=False) | Q(dosen_profile__isnull=False)
+    ).select_related(
+        'mahasiswa_profile__program_studi',
+        'dosen_profile__jurusan'
+    ).prefetch_related(
+        'mahasiswa_profile__dosen_pembimbing__user',
+        Prefetch(
+            'dosen_profile__mahasiswa_binaan',
+            queryset=Mahasiswa.objects.select_related('user'),
+            to_attr='mahasiswa_list'
+        )
+    )
+
+    search_query = params.get('q', None)
+    role_filter = params.get('role', None)
+
+    if search_query:
+        queryset = queryset.annotate(
+            full_name_search=Concat('first_name', Value(' '), 'last_name')
+        ).filter(full_name_search__icontains=search_query)
+
+    if role_filter == 'mahasiswa':
+        queryset = queryset.filter(mahasiswa_profile__isnull=False)
+    elif role_filter == 'dosen':
+        queryset = queryset.filter(dosen_profile__isnull=False)
+
+    return queryset.order_by('first_name', 'last_name')
+
+
 class UserManagementView(LoginRequiredMixin, ListView):
     """
     Displays a paginated list of all users and handles user creation.
@@ -148,34 +181,7 @@ class UserManagementView(LoginRequiredMixin, ListView):
     paginate_by = 5
 
     def get_queryset(self):
-        queryset = User.objects.filter(
-            Q(mahasiswa_profile__isnull=False) | Q(dosen_profile__isnull=False)
-        ).select_related(
-            'mahasiswa_profile__program_studi',
-            'dosen_profile__jurusan'
-        ).prefetch_related(
-            'mahasiswa_profile__dosen_pembimbing__user',
-            Prefetch(
-                'dosen_profile__mahasiswa_binaan',
-                queryset=Mahasiswa.objects.select_related('user'),
-                to_attr='mahasiswa_list'
-            )
-        )
-
-        search_query = self.request.GET.get('q', None)
-        role_filter = self.request.GET.get('role', None)
-
-        if search_query:
-            queryset = queryset.annotate(
-                full_name_search=Concat('first_name', Value(' '), 'last_name')
-            ).filter(full_name_search__icontains=search_query)
-
-        if role_filter == 'mahasiswa':
-            queryset = queryset.filter(mahasiswa_profile__isnull=False)
-        elif role_filter == 'dosen':
-            queryset = queryset.filter(dosen_profile__isnull=False)
-
-        return queryset.order_by('first_name', 'last_name')
+        return user_list_queryset(self.request.GET)
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -183,6 +189,7 @@ class UserManagementView(LoginRequiredMixin, ListView):
             context['creation_form'] = UserCreationAdminForm()
         if 'edit_form' not in kwargs:
             context['edit_form'] = UserEditForm(instance=User())
+        context['import_columns'] = ', '.join(IMPORT_COLUMNS)
         context['search_query'] = self.request.GET.get('q', '')
         context['role_filter'] = self.request.GET.get('role', 'all')
 
@@ -240,78 +247,85 @@ class UserManagementView(LoginRequiredMixin, ListView):
             for u in user_list if u.get('role') == 'Dosen'
         }
 
-class UserExportView(LoginRequiredMixin, View):
+# (key, header) per column; XLSX/CSV use the headers, NDJSON the keys.
+USER_EXPORT_COLUMNS = [
+    ('full_name', 'Full Name'),
+    ('email', 'Email'),
+    ('role', 'Role'),
+    ('identifier', 'NIM / NIK'),
+    ('status', 'Status'),
+    ('details', 'Details (Prodi/Jurusan)'),
+    ('advisor', 'Advisor / Supervised Students'),
+]
+USER_EXPORT_VALUES = (
+    'username', 'first_name', 'last_name', 'email', 'is_active',
+    'mahasiswa_profile__nim', 'mahasiswa_profile__program_studi__nama_prodi',
+    'mahasiswa_profile__dosen_pembimbing__nik',
+    'mahasiswa_profile__dosen_pembimbing__user__first_name',
+    'mahasiswa_profile__dosen_pembimbing__user__last_name',
+    'dosen_profile__nik', 'dosen_profile__jurusan__nama_jurusan',
+    'mahasiswa_binaan_count',
+)
+
+
+def user_export_queryset(params):
     """
-    Handles exporting the filtered user list to a polished Excel (.xlsx) file.
+    The users shown on the management page (same filters), as flat dicts
+    from `.values()`: one joined query per chunk and no model instances.
     """
-    def get(self, request, *args, **kwargs):
-        user_list_view = UserManagementView()
-        user_list_view.request = self.request
-
-        queryset = user_list_view.get_queryset().select_related(
-            'mahasiswa_profile__program_studi', 'dosen_profile__jurusan'
-        )
+    return (
+        user_list_queryset(params)
+        .prefetch_related(None)
+        .annotate(mahasiswa_binaan_count=Count('dosen_profile__mahasiswa_binaan'))
+        .values(*USER_EXPORT_VALUES)
+    )
+
+
+def user_export_rows(users):
+    """Yields one export row (matching USER_EXPORT_COLUMNS) per user dict."""
+    for user in users:
+        if user['mahasiswa_profile__nim'] is not None:
+            role, identifier = 'Mahasiswa', user['mahasiswa_profile__nim']
+            details = user['mahasiswa_profile__program_studi__nama_prodi']
+            dospem_nik = user['mahasiswa_profile__dosen_pembimbing__nik']
+            dospem_name = full_name(
+                user['mahasiswa_profile__dosen_pembimbing__user__first_name'],
+                user['mahasiswa_profile__dosen_pembimbing__user__last_name'],
+            )
+            advisor_info = f"{dospem_name} ({dospem_nik})" if dospem_nik else 'Not Set'
+        elif user['dosen_profile__nik'] is not None:
+            role, identifier = 'Dosen', user['dosen_profile__nik']
+            details = user['dosen_profile__jurusan__nama_jurusan']
+            advisor_info = f"{user['mahasiswa_binaan_count']} Mahasiswa"
+        else:
+            role, identifier, details, advisor_info = 'N/A', 'N/A', 'N/A', ''
+
+        yield [
+            full_name(user['first_name'], user['last_name']) or user['username'],
+            user['email'],
+            role,
+            identifier,
+            'Active' if user['is_active'] else 'Inactive',
+            details,
+            advisor_info
+        ]
 
-        # --- Create an in-memory Excel workbook ---
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "User Data Export"
-
-        headers = ['Full Name', 'Email', 'Role', 'NIM / NIK', 'Status', 'Details (Prodi/Jurusan)', 'Advisor / Supervised Students']
-        header_font = Font(name='Calibri', bold=True, color='FFFFFF')
-        header_fill = PatternFill(start_color='4F81BD', end_color='4F81BD', fill_type='solid')
-        header_alignment = Alignment(horizontal='center', vertical='center')
-
-        ws.append(headers)
-
-        for cell in ws[1]:
-            cell.font = Font(bold=True)
-            cell.alignment = Alignment(horizontal='center')
-
-        for user in queryset:
-            role_data = UserManagementView._get_user_role_data(user)
-            advisor_info = ''
-            if role_data.get('role') == 'Mahasiswa':
-                dospem = role_data.get('dosen_pembimbing')
-                advisor_info = f"{dospem['full_name']} ({dospem['nik']})" if dospem else 'Not Set'
-            elif role_data.get('role') == 'Dosen':
-                count = role_data.get('mahasiswa_binaan_count', 0)
-                advisor_info = f"{count} Mahasiswa"
-
-            row_data = [
-                user.get_full_name() or user.username,
-                user.email,
-                role_data.get('role', 'N/A'),
-                role_data.get('identifier', 'N/A'),
-                'Active' if user.is_active else 'Inactive',
-                role_data.get('details', 'N/A'),
-                advisor_info
-            ]
-            ws.append(row_data)
-
-
-        for i, column_cells in enumerate(ws.columns, 1):
-            max_length = 0
-            column_letter = get_column_letter(i)
-            for cell in column_cells:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
-            adjusted_width = (max_length + 2)
-            ws.column_dimensions[column_letter].width = adjusted_width
 
-        ws.freeze_panes = 'A2'
+class UserExportView(LoginRequiredMixin, View):
+    """
+    Handles exporting the filtered user list to a polished Excel (.xlsx) file,
+    or streaming it as CSV/NDJSON with `?format=csv|ndjson`. Rows are read
+    with `.values()` in chunks, so memory stays flat for any list size.
+    """
+    def get(self, request, *args, **kwargs):
+        file_format = request.GET.get('format', 'xlsx')
+        if file_format not in EXPORT_FORMATS:
+            return HttpResponseBadRequest("Format export tidak valid.")
 
-        response = HttpResponse(
-            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        users = user_export_queryset(request.GET).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+        return export_response(
+            file_format, user_export_rows(users), USER_EXPORT_COLUMNS, "User Data Export", 'users_export',
         )
-        response['Content-Disposition'] = 'attachment; filename="users_export.xlsx"'
-
-        wb.save(response)
-
-        return response
 
 class UserCreateView(LoginRequiredMixin, View):
     """
@@ -327,6 +341,42 @@ class UserCreateView(LoginRequiredMixin, View):
             return JsonResponse({'status': 'error', 'errors': form.errors}, status=400)
 
 
+class UserImportView(LoginRequiredMixin, View):
+    """
+    Handles bulk user import from an uploaded CSV/XLSX file via AJAX
+    (see users.importer). Returns a JSON summary including row errors.
+    """
+    def post(self, request, *args, **kwargs):
+        upload = request.FILES.get('file')
+        if not upload:
+            return JsonResponse({'status': 'error', 'message': 'Pilih file CSV atau XLSX untuk diimpor.'}, status=400)
+
+        try:
+            rows = read_rows(upload, upload.name)
+        except UserImportError as e:
+            return JsonResponse({'status': 'error', 'message': str(e)}, status=400)
+
+        report = import_users(
+            rows, actor=request.user, source=upload.name,
+            workers=getattr(settings, 'USER_IMPORT_WORKERS', None),
+            temporary_passwords=request.POST.get('temporary_passwords') == 'on',
+            skip_invalid=request.POST.get('skip_invalid') == 'on',
+        )
+        errors = [{'row': row_number, 'message': message} for row_number, message in report.errors]
+        if not report.created:
+            return JsonResponse({'status': 'error', 'message': 'Tidak ada user yang diimpor.', 'errors': errors}, status=400)
+
+        messages.success(request, f"Berhasil mengimpor {report.created} user ({report.rows_per_sec:.0f} baris/detik).")
+        return JsonResponse({
+            'status': 'success',
+            'created': report.created,
+            'mahasiswa': report.mahasiswa_count,
+            'dosen': report.dosen_count,
+            'rows_per_sec': round(report.rows_per_sec, 1),
+            'errors': errors,
+        })
+
+
 class UserEditView(LoginRequiredMixin, View):
     """
     Handles fetching user data for editing and processing the update.